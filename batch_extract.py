@@ -0,0 +1,170 @@
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from extract_pbi_model_info import PowerBIModelExtractor
+from extraction_filter import add_filter_arguments, filters_from_args
+
+OUTPUT_FILE_NAME = "pbi_model_info.json"
+# Written next to the model folders when there is no --summary and no console to print to
+SUMMARY_FILE_NAME = "batch_summary.json"
+
+# Folders that never contain further models
+_SKIP_DIRS = {"Model", "Mashup", "Report", ".git", "__pycache__", "node_modules"}
+
+
+def _model_folders_under(root):
+    """Folders under root (root included) that contain Model/, sorted; models are not searched further"""
+    folders = []
+    for dirpath, dirnames, _ in os.walk(root):
+        if os.path.isdir(os.path.join(dirpath, "Model")):
+            folders.append(Path(dirpath))
+            dirnames[:] = []
+            continue
+        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS and not d.startswith(".")]
+    return sorted(folders)
+
+
+def find_model_folders(patterns, recursive=False):
+    """
+    Expand folder paths and glob patterns into model folders (folders containing Model/), in order
+
+    Args:
+        recursive: Also search below each matched folder that is not a model itself
+    """
+    folders = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            candidates = _model_folders_under(match) if recursive else [Path(match)]
+            for candidate in candidates:
+                folder = candidate.resolve()
+                if folder not in seen and (folder / "Model").is_dir():
+                    seen.add(folder)
+                    folders.append(folder)
+    return folders
+
+
+def _source_bytes(folder):
+    total = 0
+    for subfolder in ("Model", "Mashup"):
+        for root, _, files in os.walk(folder / subfolder):
+            for name in files:
+                total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def extract_model_folder(folder, output_name=OUTPUT_FILE_NAME, compact=False, cache=False, filters=None):
+    """
+    Extract one model folder to <folder>/<output_name> and return its summary record
+
+    Args:
+        filters: Optional dict of PowerBIModelExtractor filter arguments (tables,
+                 exclude_tables, kinds, exclude_kinds)
+    """
+    folder = Path(folder)
+    output_file = folder / output_name
+    summary = {"model": str(folder), "output": str(output_file), "status": "ok"}
+    start = time.perf_counter()
+    try:
+        summary["inputBytes"] = _source_bytes(folder)
+
+        # Keep stdout free for the machine-readable summary
+        with contextlib.redirect_stdout(sys.stderr):
+            extractor = PowerBIModelExtractor(folder, cache=cache or None, **(filters or {}))
+            extractor.save(output_file, compact=compact)
+
+        summary["outputBytes"] = output_file.stat().st_size
+    except Exception as e:
+        summary["status"] = "error"
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary["durationSeconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def map_model_folders(func, folders, workers=1, *args):
+    """
+    Call func(folder, *args) for every folder, on a process pool when workers > 1; results in input order
+
+    Args:
+        func: Picklable module-level function, run in worker processes
+    """
+    if workers <= 1 or len(folders) < 2:
+        return [func(folder, *args) for folder in folders]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(min(workers, len(folders))) as pool:
+        return list(pool.map(func, folders, *([arg] * len(folders) for arg in args)))
+
+
+def run_batch(folders, workers=1, output_name=OUTPUT_FILE_NAME, compact=False, cache=False, filters=None):
+    """Extract every folder, on a process pool when workers > 1, returning summaries in input order"""
+    return map_model_folders(extract_model_folder, folders, workers, output_name, compact, cache, filters)
+
+
+def main(argv=None):
+    """
+    Headless batch extraction of many pbi-tools output folders.
+
+    Exit codes: 0 when every model was extracted, 1 when any model failed,
+    2 when no model folders matched.
+    """
+    parser = argparse.ArgumentParser(
+        description="Extract pbi_model_info.json for many extracted Power BI model folders."
+    )
+    parser.add_argument("paths", nargs="+", help="Model folders or glob patterns (e.g. 'reports/*')")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    parser.add_argument("--output-name", default=OUTPUT_FILE_NAME, help="Output file name inside each model folder")
+    parser.add_argument("--compact", action="store_true", help="Write the compact layout")
+    parser.add_argument("--cache", action="store_true", help="Use the incremental extraction cache")
+    parser.add_argument(
+        "--summary",
+        help=f"Write the JSON summary to this file instead of stdout (without a console: {SUMMARY_FILE_NAME})",
+    )
+    add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+
+    filters = filters_from_args(parser, args)
+
+    folders = find_model_folders(args.paths)
+    if not folders:
+        print("No model folders found (expected a Model/ subfolder)", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    results = run_batch(folders, args.workers, args.output_name, args.compact, args.cache, filters)
+    failed = [result for result in results if result["status"] != "ok"]
+
+    summary = {
+        "models": results,
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "durationSeconds": round(time.perf_counter() - start, 3),
+    }
+    summary_file = args.summary
+    if summary_file is None and sys.stdout is None:
+        # The windowed executable has no console; keep the summary next to the outputs
+        parent = os.path.commonpath([os.path.dirname(os.path.abspath(folder)) for folder in folders])
+        summary_file = os.path.join(parent, SUMMARY_FILE_NAME)
+    if summary_file:
+        with open(summary_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+    for result in failed:
+        print(f"Failed: {result['model']}: {result['error']}", file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Extractor throughput and memory benchmark with a stored baseline.
+
+Generates synthetic model trees (see synthetic_model.py) at several scales and times each
+extraction phase on a fresh PowerBIModelExtractor, keeping the best of several runs. Phases
+that finish in a millisecond or two are run several times per sample, so that each sample
+lasts at least MIN_SAMPLE_SECONDS and timer resolution and scheduling jitter average out.
+Throughput is source megabytes per second (output megabytes for serialization). Each phase
+is timed in turn with a reference workload, a plain Python line scan of the same source,
+and is compared by its throughput relative to that reference. The ratio is far less
+sensitive to the speed and load of the machine than absolute MB/s. Peak memory of
+extract_all() and of write_json() is measured separately with tracemalloc, so its overhead
+does not skew the timings.
+
+    python benchmarks/extractor.py [--scales small,medium] [--repeat 5] [--workers N]
+    python benchmarks/extractor.py --save-baseline
+
+Exit code 1 means a phase got slower relative to the reference, or peak memory grew, by more
+than --tolerance compared to benchmarks/extractor_baseline.json.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+
+from extract_pbi_model_info import PowerBIModelExtractor  # noqa: E402
+from synthetic_model import generate_model  # noqa: E402
+
+BASELINE_FILE = BENCHMARKS_DIR / "extractor_baseline.json"
+
+# Shortest timed sample; shorter phases are repeated within a sample and averaged
+MIN_SAMPLE_SECONDS = 0.05
+
+# name -> generate_model() arguments
+SCALES = {
+    "small": dict(tables=20, columns=15, measures=10, calculated_columns=2, queries=5, relationships="per-file"),
+    "medium": dict(tables=100, columns=25, measures=20, calculated_columns=3, queries=20, relationships="single-file"),
+    "large": dict(tables=400, columns=40, measures=40, calculated_columns=5, queries=50, relationships="per-file"),
+    # Section1.m dominated by an embedded Binary.FromText payload; try with --max-literal-bytes
+    "embedded": dict(tables=10, columns=10, measures=5, calculated_columns=1, queries=5, payload_bytes=20_000_000),
+}
+
+
+def _tree_bytes(*patterns, root):
+    return sum(path.stat().st_size for pattern in patterns for path in root.glob(pattern) if path.is_file())
+
+
+def _calls_per_sample(func):
+    """Number of calls of func that take at least MIN_SAMPLE_SECONDS (also warms func up)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+    return max(1, math.ceil(MIN_SAMPLE_SECONDS / max(elapsed, 1e-6)))
+
+
+def _best_times(funcs, repeat):
+    """
+    Best wall time per call of each function over repeat rounds, with the extractor's console output suppressed.
+
+    Each round takes one sample of every function, so a slow spell on the machine affects all of them.
+    A sample times enough calls to last MIN_SAMPLE_SECONDS and is divided by their number.
+    Returns (list of best times, list of the last results).
+    """
+    calls = [_calls_per_sample(func) for func in funcs]
+    best = [None] * len(funcs)
+    results = [None] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            gc.collect()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for _ in range(calls[index]):
+                    results[index] = func()
+                elapsed = (time.perf_counter() - start) / calls[index]
+            best[index] = elapsed if best[index] is None else min(best[index], elapsed)
+    return best, results
+
+
+def _reference_scan(paths):
+    """Reference workload: read, decode and split every line of the source files into words"""
+    words = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                words += len(line.strip().split())
+    return words
+
+
+def _peak_memory(func):
+    """Peak traced memory of func() in bytes"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return peak
+
+
+def run_scale(model_dir, repeat, workers, max_literal_bytes=None):
+    """Benchmark one generated model; returns {"phases": {...}, "peakMemory": {...}}"""
+    model_dir = Path(model_dir)
+
+    def extractor():
+        return PowerBIModelExtractor(model_dir, workers=workers, max_literal_bytes=max_literal_bytes)
+
+    def write_json():
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            extractor().write_json(f)
+
+    source_bytes = {
+        "extract_tables_and_columns": _tree_bytes("Model/tables/*.tmdl", root=model_dir),
+        "extract_relationships": _tree_bytes("Model/relationships.tmdl", "Model/relationships/*.tmdl", root=model_dir),
+        "extract_m_code": _tree_bytes("Mashup/Package/Formulas/*.m", root=model_dir),
+        "extract_all": _tree_bytes("Model/**/*.tmdl", "Mashup/Package/Formulas/*.m", root=model_dir),
+    }
+    source_files = [
+        path
+        for pattern in ("Model/**/*.tmdl", "Mashup/Package/Formulas/*.m")
+        for path in model_dir.glob(pattern)
+        if path.is_file()
+    ]
+
+    def reference():
+        return _reference_scan(source_files)
+
+    # Timed on a fresh extractor each run, so no phase reuses another's parsed objects
+    timed = {
+        phase: (lambda phase=phase: getattr(extractor(), phase)())
+        for phase in ("extract_tables_and_columns", "extract_relationships", "extract_m_code", "extract_all")
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        output = extractor().extract_all()
+    output_bytes = len(json.dumps(output, indent=2).encode("utf-8"))
+    timed["json.dumps"] = lambda: json.dumps(output, indent=2)
+    timed["write_json"] = write_json
+    sizes = dict(source_bytes, **{"json.dumps": output_bytes, "write_json": output_bytes})
+
+    phases = {}
+    reference_seconds = []
+    for phase, func in timed.items():
+        (base, seconds), _ = _best_times([reference, func], repeat)
+        reference_seconds.append(base)
+        phases[phase] = (seconds, sizes[phase], source_bytes["extract_all"] / 1e6 / base)
+    reference_mb_per_second = source_bytes["extract_all"] / 1e6 / min(reference_seconds)
+
+    return {
+        "sourceBytes": source_bytes["extract_all"],
+        "referenceMbPerSecond": round(reference_mb_per_second, 3),
+        "phases": {
+            phase: {
+                "seconds": round(seconds, 6),
+                "mbPerSecond": round(size / 1e6 / seconds, 3),
+                # Throughput relative to the reference measured alongside this phase
+                "relative": round(size / 1e6 / seconds / reference, 4),
+            }
+            for phase, (seconds, size, reference) in phases.items()
+        },
+        "peakMemory": {
+            "extract_all": _peak_memory(lambda: extractor().extract_all()),
+            "write_json": _peak_memory(write_json),
+        },
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages of results against baseline"""
+    regressions = []
+    for scale, result in results.items():
+        expected = baseline.get(scale)
+        if expected is None:
+            continue
+        for phase, stats in result["phases"].items():
+            base = expected["phases"].get(phase, {}).get("relative")
+            if base and stats["relative"] < base * (1 - tolerance):
+                regressions.append(
+                    f"{scale}/{phase}: {stats['relative']:.3f}x reference throughput, baseline {base:.3f}x"
+                )
+        for phase, peak in result["peakMemory"].items():
+            base = expected["peakMemory"].get(phase)
+            if base and peak > base * (1 + tolerance):
+                regressions.append(f"{scale}/{phase}: peak {peak / 1e6:.1f} MB, baseline {base / 1e6:.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated, from: {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per phase (best is kept)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker count passed to the extractor")
+    parser.add_argument(
+        "--max-literal-bytes", type=int, default=None, help="Hash M string literals longer than this"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative regression")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            model_dir = generate_model(Path(temp_dir) / scale, **SCALES[scale])
+            results[scale] = run_scale(model_dir, args.repeat, args.workers, args.max_literal_bytes)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for scale, result in results.items():
+            print(
+                f"{scale} ({result['sourceBytes'] / 1e6:.2f} MB of source, "
+                f"reference {result['referenceMbPerSecond']:.2f} MB/s)"
+            )
+            for phase, stats in result["phases"].items():
+                print(
+                    f"  {phase:<28} {stats['seconds'] * 1000:9.2f} ms  {stats['mbPerSecond']:8.2f} MB/s"
+                    f"  {stats['relative']:7.3f}x reference"
+                )
+            for phase, peak in result["peakMemory"].items():
+                print(f"  peak memory {phase:<16} {peak / 1e6:9.2f} MB")
+
+    baseline_file = Path(args.baseline)
+    if args.save_baseline:
+        baseline = json.loads(baseline_file.read_text(encoding="utf-8")) if baseline_file.exists() else {}
+        baseline.update(results)
+        baseline_file.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline saved to {baseline_file}")
+        return 0
+
+    if not baseline_file.exists():
+        print(f"No baseline at {baseline_file}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, json.loads(baseline_file.read_text(encoding="utf-8")), args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Wall time of pbix_pipeline.py against a strictly serial extract-then-parse loop.
+
+Runs the pipeline over dummy PBIX files with tests/fake_pbi_tools.py standing in for
+pbi-tools (a fixed delay plus a synthetic model per file), once with one extractor and one
+parser and once with the given worker counts. serialSeconds is the sum of every
+extraction and parse, i.e. what the old one-file-at-a-time flow would take.
+
+    python benchmarks/pipeline.py [--files 8] [--delay 1.0] [--tables 200] [--extractors 2] [--parsers 4] [--json]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from pbix_pipeline import PbixPipeline  # noqa: E402
+
+FAKE_PBI_TOOLS = REPO_ROOT / "tests" / "fake_pbi_tools.py"
+
+
+def _run(pbix_files, output_root, delay, tables, extractors, parsers, queue_size):
+    command = [sys.executable, str(FAKE_PBI_TOOLS), "extract", "{pbix}", "-extractFolder", "{folder}"]
+    command += ["--delay", str(delay), "--tables", str(tables)]
+    pipeline = PbixPipeline(
+        pbix_files,
+        command=command,
+        output_root=output_root,
+        extractors=extractors,
+        parsers=parsers,
+        queue_size=queue_size,
+    )
+    summary = pipeline.run()
+    if summary["failed"]:
+        errors = [record["error"] for record in summary["models"] if record["status"] != "ok"]
+        raise RuntimeError("Pipeline run failed:\n" + "\n".join(errors))
+    return {"durationSeconds": summary["durationSeconds"], **summary["stages"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipelined PBIX orchestrator.")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds each stand-in extraction takes")
+    parser.add_argument("--tables", type=int, default=200, help="Tables of each synthetic model")
+    parser.add_argument("--extractors", type=int, default=2)
+    parser.add_argument("--parsers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pbix_files = []
+        for i in range(args.files):
+            path = Path(tmp) / f"report{i}.pbix"
+            path.write_bytes(b"PK")
+            pbix_files.append(path)
+
+        results = {
+            "single": _run(pbix_files, Path(tmp) / "single", args.delay, args.tables, 1, 1, 1),
+            "pipelined": _run(
+                pbix_files, Path(tmp) / "pipelined", args.delay, args.tables, args.extractors, args.parsers,
+                args.queue_size,
+            ),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.files} files, {args.delay}s per extraction, {args.tables} tables each")
+        for name, result in results.items():
+            extract, parse = result["extract"], result["parse"]
+            print(
+                f"  {name:<10} {result['durationSeconds']:>7.2f} s (serial {result['serialSeconds']:.2f} s)"
+                f"  extract {extract['workers']}x {extract['itemsPerSecond']}/s, wait {extract['waitSeconds']} s"
+                f"  parse {parse['workers']}x {parse['itemsPerSecond']}/s, wait {parse['waitSeconds']} s"
+                f"  queue max {result['queue']['maxDepth']}/{result['queue']['size']}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Resident memory of extracted tables and relationships as dicts and as model_records records.
+
+Generates a large synthetic model (benchmarks/synthetic_model.py), parses it, and keeps the
+tables and relationships either as the parsed dicts or as the __slots__ records that
+PowerBIModelExtractor holds, measuring what stays allocated with tracemalloc. Both forms are
+checked to produce the same output.
+
+    python benchmarks/record_memory.py [--tables 400] [--columns 40] [--measures 40] [--json]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from extract_pbi_model_info import PowerBIModelExtractor  # noqa: E402
+from model_records import RelationshipRecord, TableRecord  # noqa: E402
+from synthetic_model import generate_model  # noqa: E402
+
+
+def _dicts(model_path):
+    extractor = PowerBIModelExtractor(model_path)
+    return list(extractor.iter_tables()), list(extractor.iter_relationships())
+
+
+def _records(model_path):
+    extractor = PowerBIModelExtractor(model_path)
+    tables = [TableRecord.from_dict(table_info) for table_info in extractor.iter_tables()]
+    relationships = [RelationshipRecord.from_dict(info) for info in extractor.iter_relationships()]
+    return tables, relationships
+
+
+def _retained(build):
+    """Build the objects under tracemalloc; return (objects, MB still allocated afterwards)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            objects = build()
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return objects, current / (1 << 20)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the memory of the extracted-object records.")
+    parser.add_argument("--tables", type=int, default=400)
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--measures", type=int, default=40)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = generate_model(
+            Path(tmp) / "model", tables=args.tables, columns=args.columns, measures=args.measures
+        )
+        (dict_tables, dict_relationships), dict_mb = _retained(lambda: _dicts(model_path))
+        (record_tables, record_relationships), record_mb = _retained(lambda: _records(model_path))
+
+    if [table.to_dict() for table in record_tables] != dict_tables or [
+        relationship.to_dict() for relationship in record_relationships
+    ] != dict_relationships:
+        print("Records do not round-trip to the parsed dicts", file=sys.stderr)
+        return 1
+
+    objects = len(dict_tables) + len(dict_relationships)
+    objects += sum(len(table["columns"]) + len(table["measures"]) for table in dict_tables)
+    results = {
+        "objects": objects,
+        "dictsMB": round(dict_mb, 2),
+        "recordsMB": round(record_mb, 2),
+        "reduction": round(1 - record_mb / dict_mb, 3),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['objects']} tables, columns, measures and relationships")
+        print(f"  dicts   {results['dictsMB']:>8.2f} MB")
+        print(f"  records {results['recordsMB']:>8.2f} MB ({results['reduction']:.1%} less)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Startup import-time benchmark with a regression budget.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters, takes the best
+cumulative import time of each entry module over several runs, and fails when a module
+exceeds its budget or loads a module it must not load (tkinter/requests on headless paths).
+
+    python benchmarks/startup.py [--runs 7] [--scale 1.5] [--json]
+
+Exit code 1 means the budget was exceeded.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# module -> (budget in milliseconds, modules that must not be imported)
+BUDGETS = {
+    "extract_pbi_model_info": (60, ("tkinter", "requests")),
+    "batch_extract": (90, ("tkinter", "requests")),
+    "main": (40, ("tkinter", "requests", "extract_pbi_model_info")),
+}
+
+
+def measure_import(module):
+    """Import a module in a fresh interpreter; return (cumulative microseconds, {module: cumulative us})"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            imported[name.strip()] = int(cumulative)
+    return imported.get(module, 0), imported
+
+
+def run(runs, scale):
+    """Measure every budgeted module, returning a list of result dicts"""
+    results = []
+    for module, (budget_ms, forbidden) in BUDGETS.items():
+        samples = []
+        imported = {}
+        for _ in range(runs):
+            total, imported = measure_import(module)
+            samples.append(total)
+
+        best_ms = min(samples) / 1000
+        loaded = sorted(name for name in forbidden if name in imported)
+        heaviest = sorted(
+            ((name, us) for name, us in imported.items() if name != module), key=lambda item: item[1], reverse=True
+        )[:5]
+        results.append(
+            {
+                "module": module,
+                "bestMs": round(best_ms, 2),
+                "medianMs": round(sorted(samples)[len(samples) // 2] / 1000, 2),
+                "budgetMs": budget_ms * scale,
+                "forbiddenLoaded": loaded,
+                "heaviest": [{"module": name, "ms": round(us / 1000, 2)} for name, us in heaviest],
+                "ok": best_ms <= budget_ms * scale and not loaded,
+            }
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per module (best is kept)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. for slow CI hosts")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.scale)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            status = "ok" if result["ok"] else "FAIL"
+            print(
+                f"{status:4} {result['module']:<26} best {result['bestMs']:7.2f} ms "
+                f"(median {result['medianMs']:.2f}, budget {result['budgetMs']:.0f})"
+            )
+            if result["forbiddenLoaded"]:
+                print(f"     loads forbidden modules: {', '.join(result['forbiddenLoaded'])}")
+            for item in result["heaviest"]:
+                print(f"     {item['ms']:7.2f} ms  {item['module']}")
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
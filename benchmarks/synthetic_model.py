@@ -0,0 +1,303 @@
+"""
+Synthetic pbi-tools extraction trees for benchmarking PowerBIModelExtractor.
+
+    python benchmarks/synthetic_model.py OUTPUT_DIR [--tables 100] [--columns 20] [--measures 20]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+DATA_TYPES = ("string", "int64", "double", "decimal", "dateTime", "boolean")
+BASE64_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+FORMAT_STRINGS = ("#,0", "#,0.00", "0.0%", "\\$#,0.00;(\\$#,0.00);\\$#,0.00")
+
+
+def _quote(name):
+    return f"'{name}'" if " " in name else name
+
+
+def _table_tmdl(rng, index, table_name, columns, measures, calculated_columns, table_names):
+    lines = [f"table {_quote(table_name)}", f"\tlineageTag: {rng.getrandbits(64):016x}", ""]
+
+    for c in range(columns):
+        lines += [
+            f"\tcolumn 'Column {c}'",
+            f"\t\tdataType: {DATA_TYPES[(index + c) % len(DATA_TYPES)]}",
+            f"\t\tlineageTag: {rng.getrandbits(64):016x}",
+            "\t\tsummarizeBy: none",
+            f"\t\tsourceColumn: Column {c}",
+            "",
+            "\t\tannotation SummarizationSetBy = Automatic",
+            "",
+        ]
+
+    for c in range(calculated_columns):
+        lines += [
+            f"\t/// Calculated column {c} of {table_name}",
+            f"\tcolumn 'Calc {c}' = '{table_name}'[Column {c % max(columns, 1)}] * {c + 2}",
+            "\t\tdataType: double",
+            f"\t\tlineageTag: {rng.getrandbits(64):016x}",
+            "\t\tsummarizeBy: sum",
+            "",
+        ]
+
+    for m in range(measures):
+        other = table_names[rng.randrange(len(table_names))]
+        if m % 3 == 0:
+            lines += [f"\tmeasure 'Measure {index}-{m}' = SUM('{table_name}'[Column {m % max(columns, 1)}])"]
+        else:
+            lines += [
+                f"\t/// Ratio measure {m}",
+                f"\tmeasure 'Measure {index}-{m}' =",
+                f"\t\t\tVAR current = [Measure {index}-{m - 1}]",
+                f"\t\t\tVAR total = CALCULATE([Measure {index}-{m - 1}], ALL('{other}'))",
+                "",
+                "\t\t\tRETURN",
+                "\t\t\t\tDIVIDE(current, total)",
+            ]
+        lines += [
+            f"\t\tformatString: {FORMAT_STRINGS[m % len(FORMAT_STRINGS)]}",
+            f"\t\tdisplayFolder: Folder {m % 5}",
+            f"\t\tlineageTag: {rng.getrandbits(64):016x}",
+            "",
+            '\t\tannotation PBI_FormatHint = {"isGeneralNumber":true}',
+            "",
+        ]
+
+    lines += [
+        f"\tpartition {_quote(table_name)} = m",
+        "\t\tmode: import",
+        "\t\tsource =",
+        "\t\t\t\tlet",
+        f'\t\t\t\t    Source = Sql.Database("server", "db"){{[Name="{table_name}"]}}[Data]',
+        "\t\t\t\tin",
+        "\t\t\t\t    Source",
+        "",
+        "\tannotation PBI_ResultType = Table",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _section(rng, table_names, extra_queries, payload_bytes):
+    lines = ["section Section1;", ""]
+    for table_name in table_names:
+        lines += [
+            f'shared #"{table_name}" = let',
+            f'    Source = Sql.Database("server", "db"),',
+            f'    Data = Source{{[Schema="dbo",Item="{table_name}"]}}[Data],',
+            '    Filtered = Table.SelectRows(Data, each [Status] <> "closed;archived")',
+            "in",
+            "    Filtered;",
+            "",
+        ]
+    for q in range(extra_queries):
+        lines += [
+            f'shared Parameter{q} = "value {q}" meta '
+            '[IsParameterQuery=true, Type="Text", IsParameterQueryRequired=true];',
+            "",
+        ]
+    if payload_bytes:
+        # Embedded data as Power BI stores an "Enter data" table
+        payload = "".join(rng.choice(BASE64_ALPHABET) for _ in range(1024))
+        payload = (payload * (payload_bytes // 1024 + 1))[:payload_bytes]
+        lines += [
+            "shared EmbeddedData = let",
+            f'    Encoded = Binary.FromText("{payload}", BinaryEncoding.Base64),',
+            "    Source = Table.FromRows(Json.Document(Binary.Decompress(Encoded, Compression.Deflate)))",
+            "in",
+            "    Source;",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def generate_model(
+    root,
+    tables=50,
+    columns=20,
+    measures=20,
+    calculated_columns=3,
+    queries=10,
+    relationships="per-file",
+    payload_bytes=0,
+    seed=0,
+):
+    """
+    Write a synthetic extracted-model tree under root and return its path.
+
+    Args:
+        relationships: "per-file" (Model/relationships/*.tmdl), "single-file"
+                       (Model/relationships.tmdl) or "both"
+        queries: Shared queries in Section1.m besides one per table
+        payload_bytes: Size of an embedded Binary.FromText literal in Section1.m (0 for none)
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    tables_path = root / "Model" / "tables"
+    relationships_path = root / "Model" / "relationships"
+    formulas_path = root / "Mashup" / "Package" / "Formulas"
+    for path in (tables_path, relationships_path, formulas_path):
+        path.mkdir(parents=True, exist_ok=True)
+
+    table_names = [f"Table {i}" if i % 2 else f"Table{i}" for i in range(tables)]
+    for index, table_name in enumerate(table_names):
+        content = _table_tmdl(rng, index, table_name, columns, measures, calculated_columns, table_names)
+        (tables_path / f"{table_name}.tmdl").write_text(content, encoding="utf-8")
+
+    # A star-ish layout: every table except the first points at an earlier one
+    pairs = [(table_names[i], table_names[rng.randrange(i)]) for i in range(1, tables)]
+    if relationships in ("per-file", "both"):
+        for i, (from_table, to_table) in enumerate(pairs):
+            content = "\n".join(
+                [
+                    f"relationship rel{i:05d}",
+                    f"\tfromTable: {_quote(from_table)}",
+                    "\tfromColumn: 'Column 0'",
+                    f"\ttoTable: {_quote(to_table)}",
+                    "\ttoColumn: 'Column 0'",
+                    "\tcrossFilteringBehavior: oneDirection" if i % 4 else "\tcrossFilteringBehavior: bothDirections",
+                    "",
+                ]
+            )
+            (relationships_path / f"rel{i:05d}.tmdl").write_text(content, encoding="utf-8")
+    if relationships in ("single-file", "both"):
+        lines = []
+        for i, (from_table, to_table) in enumerate(pairs):
+            lines += [
+                f"relationship {rng.getrandbits(128):032x}",
+                f"\tfromColumn: {_quote(from_table)}.'Column 0'",
+                f"\ttoColumn: {_quote(to_table)}.'Column 0'",
+            ]
+            if i % 5 == 0:
+                lines.append("\tisActive: false")
+            lines.append("")
+        (root / "Model" / "relationships.tmdl").write_text("\n".join(lines), encoding="utf-8")
+
+    (formulas_path / "Section1.m").write_text(_section(rng, table_names, queries, payload_bytes), encoding="utf-8")
+
+    expressions = []
+    for q in range(queries):
+        expressions += [
+            f'expression Parameter{q} = "value {q}" meta [IsParameterQuery=true, Type="Text"]',
+            f"\tlineageTag: {rng.getrandbits(64):016x}",
+            "",
+            "\tannotation PBI_ResultType = Text",
+            "",
+        ]
+    (root / "Model" / "expressions.tmdl").write_text("\n".join(expressions), encoding="utf-8")
+
+    return root
+
+
+def generate_tmsl_schema(path, tables=50, columns=20, measures=20, queries=10, seed=0):
+    """
+    Write a TMSL schema (as in DataModelSchema/model.json) with the same shape of tables,
+    M partitions, relationships and shared expressions, one table at a time.
+    """
+    import json
+
+    rng = random.Random(seed)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table_names = [f"Table {i}" if i % 2 else f"Table{i}" for i in range(tables)]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"name": "SemanticModel", "compatibilityLevel": 1567, "model": {"culture": "en-US", "tables": [')
+        for index, table_name in enumerate(table_names):
+            table = {
+                "name": table_name,
+                "lineageTag": f"{rng.getrandbits(64):016x}",
+                "columns": [
+                    {
+                        "name": f"Column {c}",
+                        "dataType": DATA_TYPES[(index + c) % len(DATA_TYPES)],
+                        "sourceColumn": f"Column {c}",
+                        "lineageTag": f"{rng.getrandbits(64):016x}",
+                        "summarizeBy": "none",
+                        "annotations": [{"name": "SummarizationSetBy", "value": "Automatic"}],
+                    }
+                    for c in range(columns)
+                ],
+                "partitions": [
+                    {
+                        "name": table_name,
+                        "mode": "import",
+                        "source": {
+                            "type": "m",
+                            "expression": [
+                                "let",
+                                f'    Source = Sql.Database("server", "db"){{[Name="{table_name}"]}}[Data]',
+                                "in",
+                                "    Source",
+                            ],
+                        },
+                    }
+                ],
+                "measures": [
+                    {
+                        "name": f"Measure {index}-{m}",
+                        "expression": [
+                            f"VAR current = SUM('{table_name}'[Column {m % max(columns, 1)}])",
+                            "RETURN",
+                            "    current",
+                        ],
+                        "formatString": FORMAT_STRINGS[m % len(FORMAT_STRINGS)],
+                        "displayFolder": f"Folder {m % 5}",
+                        "lineageTag": f"{rng.getrandbits(64):016x}",
+                    }
+                    for m in range(measures)
+                ],
+            }
+            f.write(("," if index else "") + json.dumps(table, indent=1))
+
+        relationships = [
+            {
+                "name": f"{rng.getrandbits(128):032x}",
+                "fromTable": table_names[i],
+                "fromColumn": "Column 0",
+                "toTable": table_names[rng.randrange(i)],
+                "toColumn": "Column 0",
+            }
+            for i in range(1, tables)
+        ]
+        expressions = [
+            {"name": f"Parameter{q}", "kind": "m", "expression": f'"value {q}" meta [IsParameterQuery=true]'}
+            for q in range(queries)
+        ]
+        f.write(f'], "relationships": {json.dumps(relationships)}, "expressions": {json.dumps(expressions)}}}}}')
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic extracted Power BI model tree.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--measures", type=int, default=20)
+    parser.add_argument("--calculated-columns", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--relationships", choices=("per-file", "single-file", "both"), default="per-file")
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generate_model(
+        args.output_dir,
+        tables=args.tables,
+        columns=args.columns,
+        measures=args.measures,
+        calculated_columns=args.calculated_columns,
+        queries=args.queries,
+        relationships=args.relationships,
+        payload_bytes=args.payload_bytes,
+        seed=args.seed,
+    )
+    print(f"Synthetic model written to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Peak memory and time of the incremental TMSL backend against a whole-file json.load.
+
+Generates a synthetic DataModelSchema/model.json (benchmarks/synthetic_model.py), then
+extracts it with TmslModelExtractor.write_json() and with json.load plus the pbix_reader
+converters, checking that both give the same model.
+
+    python benchmarks/tmsl_schema.py [--tables 400] [--columns 40] [--measures 40] [--json]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pbix_reader import tmsl_queries, tmsl_relationship_info, tmsl_table_info  # noqa: E402
+from synthetic_model import generate_tmsl_schema  # noqa: E402
+from tmsl_backend import TmslModelExtractor  # noqa: E402
+
+
+def _measure(func):
+    """Run func once for time and once under tracemalloc; return (result, seconds, peak MB)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak / (1 << 20)
+
+
+def _json_load(schema_file):
+    with open(schema_file, "r", encoding="utf-8") as f:
+        model = json.load(f)["model"]
+    return {
+        "tables": [tmsl_table_info(table) for table in model["tables"]],
+        "relationships": [tmsl_relationship_info(relationship) for relationship in model["relationships"]],
+        "queries": tmsl_queries(model["expressions"], model["tables"]),
+    }
+
+
+def _streamed(schema_file):
+    extractor = TmslModelExtractor(schema_file)
+    return {
+        "tables": list(extractor.iter_tables()),
+        "relationships": list(extractor.iter_relationships()),
+        "queries": list(extractor.iter_queries()),
+    }
+
+
+def _write_json(schema_file):
+    # Serialization streams tables one at a time, so only one is decoded at once
+    with open(os.devnull, "w", encoding="utf-8") as f:
+        TmslModelExtractor(schema_file).write_json(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the incremental TMSL backend.")
+    parser.add_argument("--tables", type=int, default=400)
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--measures", type=int, default=40)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        schema_file = generate_tmsl_schema(
+            Path(tmp) / "DataModelSchema" / "model.json", args.tables, args.columns, args.measures
+        )
+        expected, load_seconds, load_peak = _measure(lambda: _json_load(schema_file))
+        streamed, stream_seconds, stream_peak = _measure(lambda: _streamed(schema_file))
+        _, write_seconds, write_peak = _measure(lambda: _write_json(schema_file))
+        if streamed != expected:
+            print("Streamed extraction differs from json.load", file=sys.stderr)
+            return 1
+
+        results = {
+            "schemaMB": round(schema_file.stat().st_size / (1 << 20), 2),
+            "jsonLoad": {"seconds": round(load_seconds, 3), "peakMB": round(load_peak, 2)},
+            "streamed": {"seconds": round(stream_seconds, 3), "peakMB": round(stream_peak, 2)},
+            "writeJson": {"seconds": round(write_seconds, 3), "peakMB": round(write_peak, 2)},
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Schema: {results['schemaMB']} MB")
+        for name in ("jsonLoad", "streamed", "writeJson"):
+            print(f"  {name:<10} {results[name]['seconds']:>8.3f} s {results[name]['peakMB']:>10.2f} MB peak")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Crawl a directory tree for extracted models and build a deduplicated catalog.
+
+    python catalog_crawler.py ROOT [-o model_catalog.json] [-w WORKERS] [--cache]
+
+Every folder containing Model/ is extracted (concurrently on a process pool).
+Query and measure expressions are interned by content hash into one shared
+expressionStore, and the catalog lists which models use each unique query and measure.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from batch_extract import find_model_folders, map_model_folders
+from compact_layout import add_expression
+from extract_pbi_model_info import PowerBIModelExtractor
+
+CATALOG_FILE_NAME = "model_catalog.json"
+
+
+def find_models(root):
+    """Model folders under root (root included), sorted; models are not searched further"""
+    return find_model_folders([str(root)], recursive=True)
+
+
+def crawl_model(folder, cache=False):
+    """
+    Extract one model and reduce it to its catalog record plus the expressions it uses.
+
+    Returns (record, expressions) where expressions maps content hash -> text; runs in
+    worker processes.
+    """
+    folder = Path(folder)
+    record = {"path": folder.as_posix(), "name": folder.name, "status": "ok"}
+    expressions = {}
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            model_info = PowerBIModelExtractor(folder, cache=cache or None).extract_all()
+
+        record["tables"] = len(model_info["model"]["tables"])
+        record["queries"] = [
+            {"name": query["name"], "expressionRef": add_expression(query["expression"], expressions)}
+            for query in model_info["queries"]["powerQueries"]
+            # The whole Section1.m is listed as a query of its own
+            if not query.get("isSection")
+        ]
+        record["measures"] = [
+            {
+                "table": table["name"],
+                "name": measure["name"],
+                "expressionRef": add_expression(measure["expression"], expressions),
+            }
+            for table in model_info["model"]["tables"]
+            for measure in table.get("measures", [])
+        ]
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["durationSeconds"] = round(time.perf_counter() - start, 3)
+    return record, expressions
+
+
+def _usage(records, kind, keys):
+    """Unique expressions of one kind with the models and object names that use them"""
+    usage = {}
+    for record in records:
+        for obj in record.get(kind, []):
+            entry = usage.setdefault(obj["expressionRef"], {"expressionRef": obj["expressionRef"], "uses": []})
+            entry["uses"].append(dict({"model": record["path"]}, **{key: obj[key] for key in keys}))
+
+    entries = list(usage.values())
+    for entry in entries:
+        entry["models"] = len({use["model"] for use in entry["uses"]})
+    # Most shared first
+    entries.sort(key=lambda entry: (-entry["models"], -len(entry["uses"]), entry["expressionRef"]))
+    return entries
+
+
+def build_catalog(root, workers=None, cache=False):
+    """
+    Crawl root and return the catalog structure.
+
+    Args:
+        workers: Process pool size; None uses the CPU count, 1 runs serially
+        cache: Keep each model's incremental extraction cache (see extraction_cache.py)
+    """
+    folders = find_models(root)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    results = map_model_folders(crawl_model, folders, workers, cache)
+
+    # Intern in model order so the store is the same for every run and worker count
+    store = {}
+    records = []
+    for record, expressions in results:
+        for ref, expression in expressions.items():
+            store.setdefault(ref, expression)
+        records.append(record)
+
+    queries = _usage(records, "queries", ("name",))
+    measures = _usage(records, "measures", ("table", "name"))
+    return {
+        "metadata": {
+            "version": "1.0",
+            "root": Path(root).resolve().as_posix(),
+            "extractDate": datetime.datetime.now().isoformat(),
+            "models": len(records),
+            "failedModels": sum(record["status"] != "ok" for record in records),
+            "uniqueQueries": len(queries),
+            "uniqueMeasures": len(measures),
+            "queryUses": sum(len(entry["uses"]) for entry in queries),
+            "measureUses": sum(len(entry["uses"]) for entry in measures),
+        },
+        "models": records,
+        "queries": queries,
+        "measures": measures,
+        "expressionStore": store,
+    }
+
+
+def lookup_expression(catalog, ref):
+    """Text of an interned expression"""
+    return catalog["expressionStore"][ref]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build a deduplicated catalog of every extracted model under a folder."
+    )
+    parser.add_argument("root", help="Folder to search for extracted models (folders containing Model/)")
+    parser.add_argument("-o", "--output", default=None, help=f"Catalog file (default: ROOT/{CATALOG_FILE_NAME})")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Parallel extractions (default: CPU count)")
+    parser.add_argument("--cache", action="store_true", help="Reuse per-model extraction caches")
+    args = parser.parse_args(argv)
+
+    catalog = build_catalog(args.root, args.workers, args.cache)
+    output_file = Path(args.output) if args.output else Path(args.root) / CATALOG_FILE_NAME
+    temp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.tmp")
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2)
+    os.replace(temp_file, output_file)
+
+    metadata = catalog["metadata"]
+    print(
+        f"{metadata['models']} models, {metadata['uniqueQueries']} unique of {metadata['queryUses']} queries, "
+        f"{metadata['uniqueMeasures']} unique of {metadata['measureUses']} measures"
+    )
+    print(f"Catalog saved to {output_file}")
+    return 1 if metadata["failedModels"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import hashlib
+import json
+
+COMPACT_LAYOUT = "compact"
+
+
+def expression_hash(expression):
+    """Content address of an expression"""
+    return hashlib.sha256(expression.encode("utf-8")).hexdigest()
+
+
+def add_expression(expression, store):
+    """Add an expression to the store and return its reference"""
+    ref = expression_hash(expression)
+    store.setdefault(ref, expression)
+    return ref
+
+
+def _to_ref(obj, key, ref_key, store):
+    """Copy of obj with obj[key] moved into the store and replaced by a reference under ref_key"""
+    return {
+        (ref_key if k == key else k): (add_expression(v, store) if k == key else v) for k, v in obj.items()
+    }
+
+
+def _from_ref(obj, ref_key, key, store):
+    """Inverse of _to_ref"""
+    return {(key if k == ref_key else k): (store[v] if k == ref_key else v) for k, v in obj.items()}
+
+
+def compact_table(table_info, store):
+    """Table with its partition expressions replaced by references"""
+    if "partitions" not in table_info:
+        return table_info
+    partitions = [
+        dict(partition, source=_to_ref(partition["source"], "expression", "expressionRef", store))
+        for partition in table_info["partitions"]
+    ]
+    return dict(table_info, partitions=partitions)
+
+
+def compact_query(query_entry, store):
+    """model.expressions / queries.powerQueries entry with its expression replaced by a reference"""
+    return _to_ref(query_entry, "expression", "expressionRef", store)
+
+
+def compact_data_source(data_source, store):
+    """dataSources entry with its M code replaced by a reference"""
+    return dict(data_source, connectionDetails=_to_ref(data_source["connectionDetails"], "m", "mRef", store))
+
+
+def compact_model_info(model_info):
+    """
+    Convert extract_all() output to the compact layout.
+
+    Every M expression is stored once in a top-level expressionStore keyed by its
+    SHA-256, and model.expressions, dataSources, table partitions and
+    queries.powerQueries refer to it by hash.
+    """
+    store = {}
+    model = model_info["model"]
+
+    # Fill the store in query order, matching PowerBIModelExtractor.write_json(compact=True)
+    for entry in model["expressions"]:
+        add_expression(entry["expression"], store)
+
+    return {
+        "metadata": dict(model_info["metadata"], layout=COMPACT_LAYOUT),
+        "expressionStore": store,
+        "model": dict(
+            model,
+            tables=[compact_table(table, store) for table in model["tables"]],
+            expressions=[compact_query(entry, store) for entry in model["expressions"]],
+        ),
+        "dataSources": [compact_data_source(entry, store) for entry in model_info["dataSources"]],
+        "queries": dict(
+            model_info["queries"],
+            powerQueries=[compact_query(entry, store) for entry in model_info["queries"]["powerQueries"]],
+        ),
+    }
+
+
+def expand_model_info(data):
+    """Expand compact layout output back to the legacy layout; legacy input is returned unchanged"""
+    metadata = data.get("metadata", {})
+    if metadata.get("layout") != COMPACT_LAYOUT:
+        return data
+
+    store = data["expressionStore"]
+    model = data["model"]
+
+    tables = []
+    for table in model["tables"]:
+        if "partitions" in table:
+            partitions = [
+                dict(partition, source=_from_ref(partition["source"], "expressionRef", "expression", store))
+                for partition in table["partitions"]
+            ]
+            table = dict(table, partitions=partitions)
+        tables.append(table)
+
+    return {
+        "metadata": {k: v for k, v in metadata.items() if k != "layout"},
+        "model": dict(
+            model,
+            tables=tables,
+            expressions=[_from_ref(entry, "expressionRef", "expression", store) for entry in model["expressions"]],
+        ),
+        "dataSources": [
+            dict(entry, connectionDetails=_from_ref(entry["connectionDetails"], "mRef", "m", store))
+            for entry in data["dataSources"]
+        ],
+        "queries": dict(
+            data["queries"],
+            powerQueries=[
+                _from_ref(entry, "expressionRef", "expression", store) for entry in data["queries"]["powerQueries"]
+            ],
+        ),
+    }
+
+
+def load_model_info(path):
+    """Load a pbi_model_info.json file in either layout, returning the legacy layout"""
+    with open(path, "r", encoding="utf-8") as f:
+        return expand_model_info(json.load(f))
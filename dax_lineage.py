@@ -0,0 +1,267 @@
+import re
+import sys
+from collections import deque
+from pathlib import Path
+
+from compact_layout import load_model_info
+from extract_pbi_model_info import read_source_file
+from tmdl_parser import parse_tmdl
+
+# One left-to-right scan: string literals and comments are consumed (and ignored) so
+# brackets inside them are never mistaken for references
+_DAX_TOKEN = re.compile(
+    r"""
+    "[^"]*(?:""[^"]*)*"                                  # string literal
+    | //[^\n]* | --[^\n]*                                # line comments
+    | /\*(?:[^*]|\*(?!/))*(?:\*/|$)                      # block comment
+    | '(?P<quoted_table>[^']*(?:''[^']*)*)'\s*
+      \[(?P<quoted_column>[^\]]*(?:\]\][^\]]*)*)\]       # 'Table'[Column]
+    | (?<![\w.])(?P<table>[A-Za-z_][A-Za-z0-9_]*)\s*
+      \[(?P<column>[^\]]*(?:\]\][^\]]*)*)\]              # Table[Column]
+    | \[(?P<bracket>[^\]]*(?:\]\][^\]]*)*)\]             # [Measure] or [Column]
+    """,
+    re.VERBOSE,
+)
+
+
+def scan_dax_references(expression):
+    """
+    Return the object references in a DAX expression as (table, name) tuples in order.
+
+    table is None for bare [Name] references. Runs in linear time over the expression.
+    """
+    references = []
+    for match in _DAX_TOKEN.finditer(expression):
+        if match.group("quoted_column") is not None:
+            table = match.group("quoted_table").replace("''", "'")
+            references.append((table, match.group("quoted_column").replace("]]", "]")))
+        elif match.group("column") is not None:
+            references.append((match.group("table"), match.group("column").replace("]]", "]")))
+        elif match.group("bracket") is not None:
+            references.append((None, match.group("bracket").replace("]]", "]")))
+    return references
+
+
+def measure_key(name):
+    """Graph node key of a measure"""
+    return f"[{name}]"
+
+
+def column_key(table, column):
+    """Graph node key of a column"""
+    return f"'{table}'[{column}]"
+
+
+class DaxDependencyGraph:
+    """Dependency graph between measures and columns, built from their DAX expressions"""
+
+    def __init__(self):
+        self.nodes = {}  # key -> {"kind", "table", "name"}
+        self.dependencies = {}  # key -> keys it references (upstream)
+        self.dependents = {}  # key -> keys referencing it (downstream)
+        self.unresolved = {}  # key -> references that match no measure or column
+
+    @classmethod
+    def from_tables(cls, tables):
+        """Build the graph from table_info structures (extractor.tables_info or model.tables)"""
+        graph = cls()
+
+        # DAX names are case-insensitive
+        measures = {}
+        columns = {}
+        for table_info in tables:
+            for column_info in table_info.get("columns", []):
+                key = column_key(table_info["name"], column_info["name"])
+                graph._add_node(key, "column", table_info, column_info)
+                columns[(table_info["name"].casefold(), column_info["name"].casefold())] = key
+            for measure_info in table_info.get("measures", []):
+                key = measure_key(measure_info["name"])
+                graph._add_node(key, "measure", table_info, measure_info)
+                measures[measure_info["name"].casefold()] = key
+
+        for table_info in tables:
+            owner = table_info["name"].casefold()
+            objects = [(column_key(table_info["name"], c["name"]), c) for c in table_info.get("columns", [])]
+            objects += [(measure_key(m["name"]), m) for m in table_info.get("measures", [])]
+
+            for key, info in objects:
+                expression = info.get("expression")
+                if not expression:
+                    continue
+                for table, name in scan_dax_references(expression):
+                    folded = name.casefold()
+                    if table is None:
+                        # [Name] is a measure, or else a column of the table being evaluated
+                        target = measures.get(folded) or columns.get((owner, folded))
+                    else:
+                        target = columns.get((table.casefold(), folded)) or measures.get(folded)
+
+                    if target is None:
+                        graph.unresolved.setdefault(key, []).append(
+                            column_key(table, name) if table is not None else measure_key(name)
+                        )
+                    elif target not in graph.dependencies[key]:
+                        graph.dependencies[key].append(target)
+                        graph.dependents[target].append(key)
+
+        return graph
+
+    @classmethod
+    def from_model_info(cls, model_info):
+        """
+        Build the graph from extract_all() output.
+
+        Its expressions are joined onto one line, so a reference after a '//' comment is lost;
+        from_model_path() reads the original line breaks.
+        """
+        return cls.from_tables(model_info["model"]["tables"])
+
+    @classmethod
+    def from_model_path(cls, model_path):
+        """
+        Build the graph from the table .tmdl files of an extracted model folder.
+
+        pbi_model_info.json joins each expression onto one line, so a '//' comment there runs
+        to the end of the expression and hides any reference after it. The .tmdl files keep
+        the line breaks, so references are scanned from the DAX exactly as it was written.
+
+        Args:
+            model_path: Folder holding the extracted model (with Model/tables)
+        """
+        tables = []
+        for path in sorted((Path(model_path) / "Model" / "tables").glob("*.tmdl")):
+            for node in parse_tmdl(read_source_file(path)):
+                if node.kind != "table":
+                    continue
+                table_info = {"name": node.name, "measures": [], "columns": []}
+                for child in node.children:
+                    if child.kind == "measure":
+                        table_info["measures"].append({"name": child.name, "expression": child.expression or ""})
+                    elif child.kind == "column":
+                        column_info = {"name": child.name}
+                        if child.expression is not None:
+                            column_info["expression"] = child.expression
+                        table_info["columns"].append(column_info)
+                tables.append(table_info)
+        return cls.from_tables(tables)
+
+    def _add_node(self, key, kind, table_info, info):
+        self.nodes[key] = {"kind": kind, "table": table_info["name"], "name": info["name"]}
+        self.dependencies.setdefault(key, [])
+        self.dependents.setdefault(key, [])
+
+    def _reachable(self, key, edges):
+        seen = set()
+        queue = deque(edges.get(key, ()))
+        while queue:
+            current = queue.popleft()
+            if current in seen:
+                continue
+            seen.add(current)
+            queue.extend(edges[current])
+        seen.discard(key)
+        return seen
+
+    def upstream(self, key):
+        """All measures and columns the object depends on, directly or transitively"""
+        return self._reachable(key, self.dependencies)
+
+    def downstream(self, key):
+        """All measures and columns that depend on the object, directly or transitively"""
+        return self._reachable(key, self.dependents)
+
+    def topological_order(self):
+        """
+        Node keys with every object after its dependencies.
+
+        Objects on a cycle, and objects depending on one directly or transitively, have no
+        valid position and are left out (find_cycles() reports the cycles themselves).
+        """
+        remaining = {key: len(deps) for key, deps in self.dependencies.items()}
+        queue = deque(key for key, count in remaining.items() if count == 0)
+        order = []
+        while queue:
+            key = queue.popleft()
+            order.append(key)
+            for dependent in self.dependents[key]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+        return order
+
+    def find_cycles(self):
+        """Return circular dependencies as lists of node keys (Tarjan's algorithm, iterative)"""
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        cycles = []
+        counter = 0
+
+        for root in self.dependencies:
+            if root in index:
+                continue
+            work = [(root, iter(self.dependencies[root]))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.dependencies[child])))
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.dependencies[node]:
+                            cycles.append(component[::-1])
+
+        return cycles
+
+
+def main(argv=None):
+    """Print everything upstream and downstream of one object in a model folder or pbi_model_info.json file"""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python dax_lineage.py <model folder | pbi_model_info.json> \"'Table'[Column]\" | \"[Measure]\"")
+        return 2
+
+    if Path(argv[0]).is_dir():
+        graph = DaxDependencyGraph.from_model_path(argv[0])
+    else:
+        graph = DaxDependencyGraph.from_model_info(load_model_info(argv[0]))
+    key = argv[1]
+    if key not in graph.nodes:
+        print(f"Unknown object: {key}")
+        return 1
+
+    print("Upstream:")
+    for item in sorted(graph.upstream(key)):
+        print(f"  {item}")
+    print("Downstream:")
+    for item in sorted(graph.downstream(key)):
+        print(f"  {item}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
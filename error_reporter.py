@@ -0,0 +1,223 @@
+import atexit
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+
+ERROR_REPORT_URL = "https://app.enterprisedna.co/api/v1/extractor-error"
+
+
+def default_spool_dir():
+    """Per-user folder where unsent error reports are kept"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return Path(base) / "pbix-extractor" / "error-reports"
+
+
+class ErrorReporter:
+    """
+    Sends error reports from a background thread instead of blocking the caller.
+
+    report() only writes the payload to an on-disk spool (one JSON file per report) and
+    wakes the worker. The worker ships the oldest reports in batches over one HTTP
+    session, deletes each report once the server accepted it, and backs off
+    exponentially while the endpoint is unreachable. Reports that could not be sent stay
+    in the spool for the next run. close() (registered with atexit) gives the worker a
+    bounded time to drain.
+    """
+
+    def __init__(
+        self,
+        url=ERROR_REPORT_URL,
+        spool_dir=None,
+        batch_size=20,
+        request_timeout=5.0,
+        initial_backoff=1.0,
+        max_backoff=300.0,
+        drain_timeout=2.0,
+        session_factory=None,
+    ):
+        """
+        Args:
+            url: Endpoint that receives one JSON report per POST
+            spool_dir: Folder for unsent reports (default: per-user application data)
+            batch_size: Reports sent per wake-up before checking for shutdown
+            request_timeout: Timeout of a single POST in seconds
+            initial_backoff, max_backoff: Retry delay bounds in seconds after a failed send
+            drain_timeout: Time close() waits for pending reports at exit
+            session_factory: Callable returning an object with post(url, json=, timeout=)
+                             and close(); defaults to requests.Session
+        """
+        self.url = url
+        self.spool_dir = Path(spool_dir) if spool_dir else default_spool_dir()
+        self.batch_size = batch_size
+        self.request_timeout = request_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.drain_timeout = drain_timeout
+        self.session_factory = session_factory
+
+        self.sent = 0
+        self.failures = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._deadline = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._atexit_registered = False
+
+    def report(self, payload):
+        """Spool a report and make sure the worker is running; never blocks on the network"""
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex}"
+        temp_file = self.spool_dir / f"{name}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        # Only complete files carry the .json suffix the worker looks for
+        os.replace(temp_file, self.spool_dir / f"{name}.json")
+
+        self.start()
+
+    def pending(self):
+        """Spooled report files, oldest first"""
+        try:
+            return sorted(self.spool_dir.glob("*.json"))
+        except OSError:
+            return []
+
+    def start(self):
+        """Start the worker thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._deadline = None
+                self._thread = threading.Thread(target=self._run, name="ErrorReporter", daemon=True)
+                self._thread.start()
+                if not self._atexit_registered:
+                    atexit.register(self.close)
+                    self._atexit_registered = True
+        self._wake.set()
+        return self
+
+    def close(self, timeout=None):
+        """Let the worker send what it can within timeout seconds, then stop it"""
+        timeout = self.drain_timeout if timeout is None else timeout
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._deadline = time.monotonic() + timeout
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout)
+
+    def _remaining(self):
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+
+    def _open_session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+        # Imported here so that loading this module stays cheap
+        import requests
+
+        return requests.Session()
+
+    def _run(self):
+        backoff = 0.0
+        while True:
+            if backoff:
+                # While backing off only a shutdown request cuts the wait short
+                self._stop.wait(backoff)
+            else:
+                self._wake.wait(None if not self._stop.is_set() else 0)
+            self._wake.clear()
+
+            remaining = self._remaining()
+            if remaining is not None and remaining <= 0:
+                return
+
+            batch = self.pending()[: self.batch_size]
+            if not batch:
+                if self._stop.is_set():
+                    return
+                backoff = 0.0
+                continue
+
+            if self._send_batch(batch):
+                backoff = 0.0
+                # More reports may be waiting
+                self._wake.set()
+            else:
+                backoff = min(self.max_backoff, max(self.initial_backoff, backoff * 2))
+                backoff *= random.uniform(0.8, 1.2)
+                if self._stop.is_set():
+                    # Unreachable at shutdown: keep the rest spooled for the next run
+                    return
+
+    def _send_batch(self, batch):
+        """Send reports in order over one session; stop at the first failure"""
+        try:
+            session = self._open_session()
+        except Exception as e:
+            print(f"Failed to send error report: {str(e)}")
+            self.failures += 1
+            return False
+
+        try:
+            for report_file in batch:
+                timeout = self.request_timeout
+                remaining = self._remaining()
+                if remaining is not None:
+                    if remaining <= 0:
+                        return False
+                    timeout = min(timeout, remaining)
+
+                try:
+                    with open(report_file, "r", encoding="utf-8") as f:
+                        payload = json.load(f)
+                except FileNotFoundError:
+                    # Already sent by another running instance
+                    continue
+                except ValueError:
+                    # Unreadable report, drop it rather than retrying forever
+                    report_file.unlink(missing_ok=True)
+                    continue
+
+                try:
+                    response = session.post(self.url, json=payload, timeout=timeout)
+                except Exception as e:
+                    print(f"Failed to send error report: {str(e)}")
+                    self.failures += 1
+                    return False
+
+                if response.status_code >= 500 or response.status_code == 429:
+                    self.failures += 1
+                    return False
+
+                # Delivered, or rejected for good (4xx): either way it leaves the spool
+                report_file.unlink(missing_ok=True)
+                self.sent += 1
+            return True
+        finally:
+            session.close()
+
+
+_reporter = None
+
+
+def get_error_reporter():
+    """The process-wide ErrorReporter"""
+    global _reporter
+    if _reporter is None:
+        _reporter = ErrorReporter()
+    return _reporter
+
+
+def ship_pending_reports():
+    """Start sending reports left in the spool by earlier runs, if there are any"""
+    reporter = get_error_reporter()
+    if reporter.pending():
+        reporter.start()
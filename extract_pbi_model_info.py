@@ -4,34 +4,147 @@ import json
 from pathlib import Path
 import datetime
 import sys
+from collections.abc import Iterator
+from functools import partial
+
+from compact_layout import (
+    COMPACT_LAYOUT,
+    add_expression,
+    compact_data_source,
+    compact_model_info,
+    compact_query,
+    compact_table,
+)
+from extraction_cache import (
+    CACHE_FILE_NAME,
+    ExtractionCache,
+    fingerprint_file,
+    read_fingerprinted,
+    unchanged_since,
+)
+from extraction_filter import ExtractionFilter
+from extraction_stats import ExtractionStats, capture_profile
+from m_lexer import mapped_file, section_queries
+from model_index import ModelIndex
+from model_records import RelationshipRecord, TableRecord
+from tmdl_parser import parse_tmdl
+
+# metadata.version; 1.1 marks the Section1.m document in queries.powerQueries with isSection
+OUTPUT_VERSION = "1.1"
 
 
 class PowerBIModelExtractor:
-    def __init__(self, model_path):
+    def __init__(
+        self,
+        model_path,
+        workers=None,
+        cache=None,
+        progress=None,
+        stats_callback=None,
+        profile=None,
+        profile_mode="cprofile",
+        max_literal_bytes=None,
+        literal_mode="hash",
+        tables=None,
+        exclude_tables=None,
+        kinds=None,
+        exclude_kinds=None,
+    ):
+        """
+        Args:
+            model_path: Folder produced by pbi-tools extract (containing Model/ and Mashup/)
+            workers: Number of parallel workers for reading and parsing .tmdl files.
+                     None or 1 processes files serially on the calling thread.
+            cache: True to keep an incremental cache next to pbi_model_info.json, a cache
+                   file path, or an ExtractionCache instance. None disables caching.
+            progress: Optional callback progress(phase, done, total), called after each
+                      source file of the "tables", "relationships" and "queries" phases
+            stats_callback: Optional callback(phase, stats) called with the timing and
+                            counters of each phase as it completes (see extraction_stats.py)
+            profile: File to dump a profile of extract_all()/write_json() to; None disables it
+            profile_mode: "cprofile" for a cProfile stats file or "tracemalloc" for a
+                          tracemalloc snapshot
+            max_literal_bytes: String literals in Section1.m longer than this (embedded
+                               Binary.FromText data) are not copied into the output; None
+                               keeps them
+            literal_mode: What replaces such literals: "hash" (SHA-256 and size) or "elide"
+                          (size only)
+            tables, exclude_tables: Table name patterns (fnmatch style) to keep and to drop;
+                                    table files that cannot match are not read
+            kinds, exclude_kinds: Object kinds to keep and to drop, out of "columns",
+                                  "calculatedColumns", "measures", "relationships" and
+                                  "queries"; phases without a kept kind are skipped
+        """
         self.model_path = Path(model_path)
+        self.workers = workers
+        self.progress = progress
+        self.stats_callback = stats_callback
+        self.profile = profile
+        self.profile_mode = profile_mode
+        self.max_literal_bytes = max_literal_bytes
+        self.literal_mode = literal_mode
+        self.object_filter = ExtractionFilter(tables, exclude_tables, kinds, exclude_kinds)
+
+        if cache is True:
+            cache = self.model_path / CACHE_FILE_NAME
+        if cache and not isinstance(cache, ExtractionCache):
+            cache = ExtractionCache(cache, self.model_path)
+        self.cache = cache
         self.tables_path = self.model_path / "Model" / "tables"
         self.relationships_path = self.model_path / "Model" / "relationships"
         self.mashup_path = self.model_path / "Mashup" / "Package" / "Formulas"
 
-        # Initialize data structures
-        self.tables_info = []
-        self.relationships_info = []
+        # Extracted objects, kept as compact records (see model_records.py)
+        self.tables_info = []  # TableRecord objects
+        self.relationships_info = []  # RelationshipRecord objects
         self.measures_info = []
         self.m_code_info = []
 
-    def extract_all(self):
-        """Extract all model information"""
+        # Lookup indexes over the extracted objects, built by extract_all()/build_index()
+        self.index = None
+
+        # Per-phase timing and counters of the current run
+        self.stats = ExtractionStats(stats_callback)
+
+    def extract_all(self, workers=None, compact=False, include_stats=False):
+        """
+        Extract all model information
+
+        Args:
+            workers: Overrides the worker count given to the constructor
+            compact: Return the compact layout, where each M expression is stored once in
+                     expressionStore and referenced by hash (see compact_layout.py)
+            include_stats: Add per-phase timing and counters under metadata.stats
+        """
+        if workers is not None:
+            self.workers = workers
+        if self.cache:
+            self.cache.reset_counters()
+        self.stats = ExtractionStats(self.stats_callback)
+
+        with capture_profile(self.profile, self.profile_mode):
+            output = self._build_output()
+
+        if include_stats:
+            output["metadata"]["stats"] = self.stats.to_dict()
+        if compact:
+            return compact_model_info(output)
+        return output
+
+    def _build_output(self):
+        """Run the extraction phases and build the output structure"""
         self.extract_tables_and_columns()
         self.extract_relationships()
         self.extract_m_code()
+        self._save_cache()
 
         # Build the final output structure
         output = {
-            "metadata": {"version": "1.0", "source": "Power BI", "extractDate": datetime.datetime.now().isoformat()},
+            "metadata": self._metadata(),
             "model": {
                 "name": self.model_path.name,
-                "tables": self.tables_info,
-                "relationships": self.relationships_info,
+                "tables": [],
+                "relationships": [relationship.to_dict() for relationship in self.relationships_info],
                 "expressions": [],  # Add expressions at the model level
             },
             "dataSources": [],  # Add dataSources section
@@ -39,6 +152,16 @@ class PowerBIModelExtractor:
         }
 
         # Convert M code to the required format
+        with self.stats.measure("partitions"):
+            self.build_index()
+            self._add_queries(output)
+            # Tables are written out once their partitions are attached
+            output["model"]["tables"] = [table.to_dict() for table in self.tables_info]
+        self.stats.finish("partitions")
+        return output
+
+    def _add_queries(self, output):
+        """Add the M queries to the output, joining each onto its table's partitions"""
         for query_info in self.m_code_info:
             # Add to model.expressions
             output["model"]["expressions"].append({"name": query_info["name"], "expression": query_info["expression"]})
@@ -48,311 +171,574 @@ class PowerBIModelExtractor:
                 {"name": query_info["name"], "connectionDetails": {"m": query_info["expression"]}}
             )
 
-            # For tables that match query names, add the expression to the table's partitions
-            for table in output["model"]["tables"]:
-                if table["name"] == query_info["name"]:
-                    if "partitions" not in table:
-                        table["partitions"] = []
-
-                    table["partitions"].append(
-                        {
-                            "name": f"{query_info['name']} Partition",
-                            "source": {"type": "m", "expression": query_info["expression"]},
-                        }
-                    )
+            # For the table that matches the query name, add the expression to the table's partitions
+            table = self.index.tables.get(query_info["name"])
+            if table is not None:
+                table.add_partition(
+                    {
+                        "name": f"{query_info['name']} Partition",
+                        "source": {"type": "m", "expression": query_info["expression"]},
+                    }
+                )
 
             # Add to powerQueries
-            output["queries"]["powerQueries"].append(
-                {"name": query_info["name"], "expression": query_info["expression"]}
-            )
+            output["queries"]["powerQueries"].append(power_query_entry(query_info))
+
+    def build_index(self):
+        """Build the ModelIndex over the extracted tables and queries, available as self.index"""
+        self.index = ModelIndex(self.tables_info, self.m_code_info)
+        return self.index
+
+    def write_json(self, fp, indent=2, compact=False, include_stats=False):
+        """
+        Stream the extract_all() output structure to a text file object, one object at a time.
+
+        Tables and relationships are parsed and written one by one instead of being collected
+        first, so peak memory is bounded by the largest single object plus the M queries
+        (needed up front to attach table partitions). The JSON written is identical to
+        json.dump(extract_all(compact=compact), fp, indent=indent).
+
+        With include_stats, metadata (including metadata.stats) is written last instead of
+        first, as the stats are only complete once everything else has been written. The
+        "serialization" phase is still running at that point, so its stats are only
+        reported to stats_callback.
+        """
+        if self.cache:
+            self.cache.reset_counters()
+        self.stats = ExtractionStats(self.stats_callback)
+
+        with capture_profile(self.profile, self.profile_mode):
+            self._write_json(fp, indent, compact, include_stats)
+
+    def _write_json(self, fp, indent, compact, include_stats):
+        queries = list(self.stats.timed("queries", self.iter_queries()))
+
+        # Index partitions by table name so each table picks up its own while streaming
+        partitions = {}
+        with self.stats.measure("partitions"):
+            for query_info in queries:
+                partitions.setdefault(query_info["name"], []).append(
+                    {
+                        "name": f"{query_info['name']} Partition",
+                        "source": {"type": "m", "expression": query_info["expression"]},
+                    }
+                )
 
-        return output
+        def tables_with_partitions():
+            for table_info in self.stats.timed("tables", self.iter_tables()):
+                if table_info["name"] in partitions:
+                    table_info.setdefault("partitions", []).extend(partitions[table_info["name"]])
+                yield table_info
+
+        relationships = self.stats.timed("relationships", self.iter_relationships())
+
+        if compact:
+            # Every expression is in the store before anything referencing it is written
+            store = {}
+            for query_info in queries:
+                add_expression(query_info["expression"], store)
+
+            output = {
+                "metadata": dict(self._metadata(), layout=COMPACT_LAYOUT),
+                "expressionStore": store,
+                "model": {
+                    "name": self.model_path.name,
+                    "tables": (compact_table(table_info, store) for table_info in tables_with_partitions()),
+                    "relationships": relationships,
+                    "expressions": (
+                        compact_query({"name": q["name"], "expression": q["expression"]}, store) for q in queries
+                    ),
+                },
+                "dataSources": (
+                    compact_data_source({"name": q["name"], "connectionDetails": {"m": q["expression"]}}, store)
+                    for q in queries
+                ),
+                "queries": {"powerQueries": (compact_query(power_query_entry(q), store) for q in queries)},
+            }
+        else:
+            output = {
+                "metadata": self._metadata(),
+                "model": {
+                    "name": self.model_path.name,
+                    "tables": tables_with_partitions(),
+                    "relationships": relationships,
+                    "expressions": ({"name": q["name"], "expression": q["expression"]} for q in queries),
+                },
+                "dataSources": ({"name": q["name"], "connectionDetails": {"m": q["expression"]}} for q in queries),
+                "queries": {"powerQueries": (power_query_entry(q) for q in queries)},
+            }
+        if include_stats:
+            # Evaluated by write_json_stream only when reached, after everything else
+            metadata = output.pop("metadata")
+            output["metadata"] = lambda: dict(metadata, stats=self.stats.to_dict())
+
+        with self.stats.measure("serialization"):
+            write_json_stream(fp, output, indent)
+        self.stats.finish("serialization")
+        self._save_cache()
+
+    def save(self, output_file, indent=2, compact=False, include_stats=False):
+        """Stream the model information to output_file, replacing it atomically once complete"""
+        output_file = Path(output_file)
+        temp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                self.write_json(f, indent=indent, compact=compact, include_stats=include_stats)
+            os.replace(temp_file, output_file)
+        except BaseException:
+            temp_file.unlink(missing_ok=True)
+            raise
+        return output_file
+
+    def _metadata(self):
+        metadata = {"version": OUTPUT_VERSION, "source": "Power BI", "extractDate": datetime.datetime.now().isoformat()}
+        if self.object_filter.active:
+            metadata["filters"] = self.object_filter.to_dict()
+        return metadata
+
+    def _save_cache(self):
+        if self.cache:
+            # Files skipped by the filter keep their cache entries
+            self.cache.save(keep_unseen=self.object_filter.active)
+            print(f"Cache: {self.cache.hits} hits, {self.cache.misses} misses")
 
     def extract_tables_and_columns(self):
         """Extract tables and columns"""
-        print("Extracting tables and columns...")
-
-        # Process each table file
-        for table_file in self.tables_path.glob("*.tmdl"):
-            with open(table_file, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Extract table name - use the first line that defines the table
-            table_name_match = re.search(r"table\s+([^\n\{]+)", content)
-            if table_name_match:
-                table_name = table_name_match.group(1).strip()
-
-                # Remove quotes if present
-                if table_name.startswith("'") and table_name.endswith("'"):
-                    table_name = table_name[1:-1]
-                elif table_name.startswith("'"):
-                    table_name = table_name[1:]
-
-                # Initialize table info
-                table_info = {"name": table_name, "description": "", "measures": [], "columns": []}
-
-                # Extract columns
-                column_pattern = r"\n\tcolumn\s+([^\s]+)[^{]*\{[^}]*dataType:\s+([^,\s\}]+)"
-                column_matches = re.finditer(column_pattern, content, re.DOTALL)
-
-                for match in column_matches:
-                    column_name = match.group(1).strip()
-                    data_type = match.group(2).strip()
-
-                    # Remove quotes if present
-                    if column_name.startswith("'") and column_name.endswith("'"):
-                        column_name = column_name[1:-1]
-
-                    column_info = {"name": column_name, "dataType": data_type, "description": ""}
+        # Add to global tables collection
+        self.tables_info.extend(map(TableRecord.from_dict, self.stats.timed("tables", self.iter_tables())))
 
-                    table_info["columns"].append(column_info)
-
-                # Extract calculated columns
-                calc_column_pattern = (
-                    r"\n\tcolumn\s+([^\s]+)[^{]*\{[^}]*type:\s*calculated[^}]*expression:\s*\'([^\']+)"
-                )
-                calc_column_matches = re.finditer(calc_column_pattern, content, re.DOTALL)
-
-                for match in calc_column_matches:
-                    column_name = match.group(1).strip()
-                    expression = match.group(2).strip()
-
-                    # Remove quotes if present
-                    if column_name.startswith("'") and column_name.endswith("'"):
-                        column_name = column_name[1:-1]
-
-                    # Format the DAX expression
-                    expression = expression.replace("\\n", "\n").replace("\\r", "")
-                    expression = re.sub(r"\s+", " ", expression)
-
-                    column_info = {
-                        "name": column_name,
-                        "type": "calculated",
-                        "dataType": "calculated",
-                        "description": "",
-                        "expression": expression,
-                    }
+    def extract_relationships(self):
+        """Extract relationships"""
+        # Add to global relationships collection
+        relationships = self.stats.timed("relationships", self.iter_relationships())
+        self.relationships_info.extend(map(RelationshipRecord.from_dict, relationships))
 
-                    table_info["columns"].append(column_info)
+    def extract_m_code(self):
+        """Extract M/Power Query code"""
+        # Add to global M code collection
+        self.m_code_info.extend(self.stats.timed("queries", self.iter_queries()))
+
+    def iter_tables(self):
+        """Yield table_info structures one table file at a time"""
+        object_filter = self.object_filter
+        if not object_filter.wants_tables():
+            return
+        print("Extracting tables and columns...")
 
-                # Extract measures
-                measure_pattern = r"\n\tmeasure\s+\'?([^\']+?)\'?\s*=\s*([^;]+?)(?:\s*formatString|\s*\n\s*annotation)"
-                measure_matches = re.finditer(measure_pattern, content, re.DOTALL)
+        # Process each table file, skipping the ones the filter rules out by name
+        table_files = [file for file in self.tables_path.glob("*.tmdl") if object_filter.table_file_matches(file)]
+        yield from self._filter_tables(self._parse_files(table_files, parse_table_file, "tables"))
 
-                for match in measure_matches:
-                    measure_name = match.group(1).strip()
-                    measure_expression = match.group(2).strip()
+    def iter_relationships(self):
+        """Yield relationship_info structures"""
+        if not self.object_filter.wants("relationships"):
+            return
+        print("Extracting relationships...")
 
-                    # Preserve important line breaks in VAR statements
-                    measure_expression = re.sub(r"VAR\s+", "VAR ", measure_expression)
-                    measure_expression = re.sub(r"RETURN\s+", "RETURN ", measure_expression)
+        # Try to find a relationships.tmdl file in the Model directory
+        relationships_file = self.model_path / "Model" / "relationships.tmdl"
+        relationships = []
+        if relationships_file.exists():
+            relationships = self._parse_file(relationships_file, parse_relationships_file, "relationships")
 
-                    # Replace multiple spaces, tabs, and newlines with a single space
-                    measure_expression = re.sub(r"\s+", " ", measure_expression)
+        # If no relationships found in the main file, check for individual relationship files
+        if not relationships:
+            relationship_files = self.relationships_path.glob("*.tmdl")
+            relationships = self._parse_files(relationship_files, parse_relationship_file, "relationships")
+        yield from self._filter_relationships(relationships)
+
+    def _filter_tables(self, tables, to_table_info=None):
+        """
+        Yield the table_info structures of the tables the object filter keeps, without the
+        object kinds it drops. Every backend passes its tables through here.
+
+        Args:
+            tables: Parsed tables, each a dict with a "name"; None entries are skipped
+            to_table_info: Callable building the table_info structure of a kept table, for
+                           backends whose tables are in another format; None when they are
+                           table_info structures already
+        """
+        object_filter = self.object_filter
+        for table in tables:
+            if not table or not object_filter.table_matches(table["name"]):
+                continue
+            table_info = to_table_info(table) if to_table_info else table
+            yield object_filter.apply_to_table(table_info) if object_filter.active else table_info
+
+    def _filter_relationships(self, relationships):
+        """Yield the relationship_info structures whose tables are both kept; None entries are skipped"""
+        # Per-relationship pattern matching only when table patterns are set
+        matches = self.object_filter.relationship_matches if self.object_filter.filters_tables else None
+        for relationship_info in relationships:
+            if relationship_info and (matches is None or matches(relationship_info)):
+                yield relationship_info
+
+    def iter_queries(self):
+        """Yield query_info structures for the M/Power Query code"""
+        if not self.object_filter.wants("queries"):
+            return
+        print("Extracting M/Power Query code...")
 
-                    # Restore line breaks for VAR and RETURN statements for readability
-                    measure_expression = re.sub(r"VAR ", "\nVAR ", measure_expression)
-                    measure_expression = re.sub(r"RETURN ", "\nRETURN ", measure_expression)
-                    measure_expression = measure_expression.strip()
+        # First check for Section1.m in Mashup/Package/Formulas
+        section_file = self.mashup_path / "Section1.m"
+        if section_file.exists() and section_file.is_file():
+            # Section1.m is mapped into memory rather than read, as it can hold large embedded data
+            parse_func = partial(
+                parse_section_path, max_literal_bytes=self.max_literal_bytes, literal_mode=self.literal_mode
+            )
+            variant = f"{self.max_literal_bytes}:{self.literal_mode}" if self.max_literal_bytes is not None else None
+            section_queries = self._parse_file(section_file, parse_func, "queries", pass_path=True, variant=variant)
+            if section_queries:
+                yield from section_queries
 
-                    # Extract format string if available
-                    format_string = ""
-                    format_match = re.search(r'formatString:\s*"([^"]+)"', content)
-                    if format_match:
-                        format_string = format_match.group(1)
+                # No need to process other M files if we've found Section1.m
+                return
 
-                    measure_info = {
-                        "name": measure_name,
-                        "description": "",
-                        "expression": measure_expression,
-                        "formatString": format_string,
-                        "displayFolder": "",
-                    }
+        # Process each individual M code file if no Section1.m found, skipping Section1.m itself
+        found = False
+        m_files = sorted(
+            m_file
+            for m_file in self.model_path.glob("**/*.m")
+            if not (m_file.name == "Section1.m" and m_file.parent.name == "Formulas")
+        )
+        for m_file, content in zip(m_files, self._parse_files(m_files, parse_m_file, "queries")):
+            found = True
+            # Extract query name from filename
+            yield {"name": m_file.stem, "expression": content}
 
-                    table_info["measures"].append(measure_info)
+        # If no M files found, try to extract from expressions.tmdl
+        if not found:
+            expressions_file = self.model_path / "Model" / "expressions.tmdl"
+            if expressions_file.exists():
+                yield from self._parse_file(expressions_file, parse_expressions_file, "queries")
+
+    def _parse_files(self, files, parse_func, phase, pass_path=False, variant=None):
+        """
+        Read and parse files, yielding the results in sorted file order
+
+        Args:
+            pass_path: Hand parse_func the file path instead of the file's text
+            variant: Parser options the results depend on, recorded with cached results
+        """
+        files = sorted(files)
+
+        # Unchanged files come straight from the cache, only the rest are read and parsed
+        lookups = [self.cache.lookup(file, variant) if self.cache else (False, None) for file in files]
+        misses = [file for file, (hit, _) in zip(files, lookups) if not hit]
+        parsed = self._read_and_parse(misses, parse_func, pass_path, fingerprint=bool(self.cache))
+
+        for done, (file, (hit, fragment)) in enumerate(zip(files, lookups), 1):
+            if hit:
+                self.stats.add(phase, files=1, cacheHits=1)
+            else:
+                fragment, matches, fingerprint = next(parsed)
+                self.stats.add(phase, files=1, bytesRead=file.stat().st_size, regexMatches=matches)
+                # The fragment is cached under the fingerprint of the content it was parsed
+                # from, and not at all if the file changed while it was being parsed
+                if self.cache and unchanged_since(file, fingerprint):
+                    self.cache.store(file, fragment, variant, fingerprint)
+            if self.progress:
+                self.progress(phase, done, len(files))
+            yield fragment
+
+    def _parse_file(self, file, parse_func, phase, pass_path=False, variant=None):
+        """Read and parse a single file"""
+        return next(self._parse_files([file], parse_func, phase, pass_path, variant))
+
+    def _read_and_parse(self, files, parse_func, pass_path=False, fingerprint=False):
+        """
+        Read and parse files serially or on the worker pools, yielding (result, regex matches,
+        fingerprint) tuples in order
+
+        Args:
+            fingerprint: Also fingerprint the content that was parsed (see
+                         extraction_cache.read_fingerprinted); otherwise the fingerprint is None
+        """
+        read = partial(_read_for_parse, pass_path=pass_path, fingerprint=fingerprint)
+        if not self.workers or self.workers <= 1 or len(files) < 2:
+            for file in files:
+                content, file_fingerprint = read(file)
+                yield _parse_counted(parse_func, content) + (file_fingerprint,)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        # Reads overlap on a thread pool while parsing fans out to worker processes;
+        # Executor.map yields in submission order so the merge matches the serial path.
+        # Executor.map submits every input up front, so listing the reads costs no extra memory
+        chunksize = max(1, len(files) // (self.workers * 4))
+        with ThreadPoolExecutor(self.workers) as io_pool, ProcessPoolExecutor(self.workers) as cpu_pool:
+            reads = list(io_pool.map(read, files))
+            contents = (content for content, _ in reads)
+            results = cpu_pool.map(partial(_parse_counted, parse_func), contents, chunksize=chunksize)
+            for result, (_, file_fingerprint) in zip(results, reads):
+                yield result + (file_fingerprint,)
+
+
+def write_json_stream(fp, value, indent=2, level=0):
+    """
+    Write value as JSON formatted like json.dump(value, fp, indent=indent).
 
-                # Add to global tables collection
-                self.tables_info.append(table_info)
+    Dicts are written key by key and iterators (such as generators) item by item, so
+    objects produced lazily are serialized as they arrive. Callables are called when
+    reached and their result is written. Everything else is encoded in one piece.
+    """
+    if callable(value):
+        value = value()
 
-    def extract_relationships(self):
-        """Extract relationships"""
-        print("Extracting relationships...")
+    if isinstance(value, dict):
+        opening, closing, items = "{", "}", iter(value.items())
+    elif isinstance(value, Iterator):
+        opening, closing, items = "[", "]", value
+    else:
+        # JSON strings never contain raw newlines, so nested lines can be re-indented safely
+        fp.write(json.dumps(value, indent=indent).replace("\n", "\n" + " " * (indent * level)))
+        return
 
-        # Try to find a relationships.tmdl file in the Model directory
-        relationships_file = self.model_path / "Model" / "relationships.tmdl"
-        if relationships_file.exists():
-            with open(relationships_file, "r", encoding="utf-8") as f:
-                content = f.read()
+    prefix = "\n" + " " * (indent * (level + 1))
+    first = True
+    for item in items:
+        fp.write(opening + prefix if first else "," + prefix)
+        first = False
+        if closing == "}":
+            fp.write(json.dumps(item[0]) + ": ")
+            item = item[1]
+        write_json_stream(fp, item, indent, level + 1)
 
-            # Extract relationships
-            relationship_blocks = re.finditer(
-                r"relationship\s+([^\n]+)\s*\n\s*fromColumn:\s*([^\n]+)\s*\n\s*toColumn:\s*([^\n]+)", content
-            )
+    if first:
+        fp.write(opening + closing)
+    else:
+        fp.write("\n" + " " * (indent * level) + closing)
 
-            for match in relationship_blocks:
-                rel_id = match.group(1).strip()
-                from_column_full = match.group(2).strip()
-                to_column_full = match.group(3).strip()
-
-                # Parse table and column names
-                from_parts = from_column_full.split(".")
-                to_parts = to_column_full.split(".")
-
-                if len(from_parts) >= 2 and len(to_parts) >= 2:
-                    from_table = from_parts[0].strip("'")
-                    from_column = from_parts[1].strip("'")
-                    to_table = to_parts[0].strip("'")
-                    to_column = to_parts[1].strip("'")
-
-                    relationship_info = {
-                        "fromTable": from_table,
-                        "fromColumn": from_column,
-                        "toTable": to_table,
-                        "toColumn": to_column,
-                        "crossFilteringBehavior": "bothDirections",  # Default value
-                    }
 
-                    # Add to global relationships collection
-                    self.relationships_info.append(relationship_info)
+# Regex matches made by the parse functions in this process, see _parse_counted()
+_regex_matches = [0]
 
-        # If no relationships found in the main file, check for individual relationship files
-        if not self.relationships_info:
-            rel_files = list(self.relationships_path.glob("*.tmdl"))
-
-            for rel_file in rel_files:
-                with open(rel_file, "r", encoding="utf-8") as f:
-                    content = f.read()
-
-                # Extract relationship ID
-                rel_id_match = re.search(r"relationship\s+([^\s]+)", content)
-                if rel_id_match:
-                    rel_id = rel_id_match.group(1).strip()
-
-                    # Extract from table and column
-                    from_table_match = re.search(r"fromTable:\s+([^\s]+)", content)
-                    from_column_match = re.search(r"fromColumn:\s+([^\s]+)", content)
-
-                    # Extract to table and column
-                    to_table_match = re.search(r"toTable:\s+([^\s]+)", content)
-                    to_column_match = re.search(r"toColumn:\s+([^\s]+)", content)
-
-                    # Extract cross filter behavior if available
-                    cross_filter_match = re.search(r"crossFilteringBehavior:\s+([^\s]+)", content)
-                    cross_filter = "bothDirections"  # Default value
-                    if cross_filter_match:
-                        cross_filter = cross_filter_match.group(1).strip()
-
-                    if from_table_match and from_column_match and to_table_match and to_column_match:
-                        from_table = from_table_match.group(1).strip()
-                        from_column = from_column_match.group(1).strip()
-                        to_table = to_table_match.group(1).strip()
-                        to_column = to_column_match.group(1).strip()
-
-                        # Remove quotes if present
-                        if from_table.startswith("'") and from_table.endswith("'"):
-                            from_table = from_table[1:-1]
-                        if from_column.startswith("'") and from_column.endswith("'"):
-                            from_column = from_column[1:-1]
-                        if to_table.startswith("'") and to_table.endswith("'"):
-                            to_table = to_table[1:-1]
-                        if to_column.startswith("'") and to_column.endswith("'"):
-                            to_column = to_column[1:-1]
-
-                        relationship_info = {
-                            "fromTable": from_table,
-                            "fromColumn": from_column,
-                            "toTable": to_table,
-                            "toColumn": to_column,
-                            "crossFilteringBehavior": cross_filter,
-                        }
-
-                        # Add to global relationships collection
-                        self.relationships_info.append(relationship_info)
 
-    def extract_m_code(self):
-        """Extract M/Power Query code"""
-        print("Extracting M/Power Query code...")
+def _count_matches(count):
+    _regex_matches[0] += count
 
-        # First check for Section1.m in Mashup/Package/Formulas
-        section_file = self.mashup_path / "Section1.m"
-        if section_file.exists() and section_file.is_file():
-            with open(section_file, "r", encoding="utf-8") as f:
-                content = f.read()
 
-            # Extract the section declaration
-            section_match = re.search(r"section\s+([^;]+);", content)
-            if section_match:
-                section_name = section_match.group(1).strip()
+def _finditer(pattern, string, flags=0):
+    """re.finditer that counts its matches"""
+    matches = list(re.finditer(pattern, string, flags))
+    _count_matches(len(matches))
+    return matches
 
-                # Add the section as a query
-                query_info = {"name": section_name, "expression": content}
-                self.m_code_info.append(query_info)
 
-                # Extract individual shared queries
-                shared_blocks = re.finditer(r'shared\s+((?:#"[^"]+"|[^=\s]+))\s*=\s*([^;]+);', content, re.DOTALL)
+def _sub(pattern, repl, string):
+    """re.sub that counts its replacements"""
+    string, count = re.subn(pattern, repl, string)
+    _count_matches(count)
+    return string
 
-                for match in shared_blocks:
-                    query_name = match.group(1).strip()
-                    query_code = match.group(2).strip()
 
-                    # If query name is quoted, remove the quotes
-                    if query_name.startswith('#"') and query_name.endswith('"'):
-                        query_name = query_name[2:-1]
+def _parse_counted(parse_func, content):
+    """Run a parse function, returning (result, regex matches made); runs in worker processes too"""
+    before = _regex_matches[0]
+    result = parse_func(content)
+    return result, _regex_matches[0] - before
 
-                    # Create query info
-                    query_info = {"name": query_name, "expression": query_code}
 
-                    # Add to global M code collection
-                    self.m_code_info.append(query_info)
+def read_source_file(path):
+    """Read a model source file as text"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
 
-                # No need to process other M files if we've found Section1.m
-                return
 
-        # Process each individual M code file if no Section1.m found
-        for m_file in self.model_path.glob("**/*.m"):
-            # Skip Section1.m as we've already processed it
-            if m_file.name == "Section1.m" and m_file.parent.name == "Formulas":
-                continue
+def _decode_source(data):
+    """Decode source file bytes like read_source_file (UTF-8, universal newlines)"""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
 
-            with open(m_file, "r", encoding="utf-8") as f:
-                content = f.read()
 
-            # Extract query name from filename
-            query_name = m_file.stem
+def _read_for_parse(path, pass_path=False, fingerprint=False):
+    """
+    Content to hand a parse function and the fingerprint of that content (None unless
+    fingerprint is set): the file's text, or with pass_path the path itself
+    """
+    if pass_path:
+        return path, fingerprint_file(path) if fingerprint else None
+    if not fingerprint:
+        return read_source_file(path), None
+    data, file_fingerprint = read_fingerprinted(path)
+    return _decode_source(data), file_fingerprint
+
+
+def format_measure_expression(expression):
+    """Normalize whitespace in a DAX measure expression, keeping VAR/RETURN on their own lines"""
+    # Preserve important line breaks in VAR statements
+    expression = _sub(r"VAR\s+", "VAR ", expression)
+    expression = _sub(r"RETURN\s+", "RETURN ", expression)
+
+    # Replace multiple spaces, tabs, and newlines with a single space
+    expression = _sub(r"\s+", " ", expression)
+
+    # Restore line breaks for VAR and RETURN statements for readability
+    expression = _sub(r"VAR ", "\nVAR ", expression)
+    expression = _sub(r"RETURN ", "\nRETURN ", expression)
+    return expression.strip()
+
+
+def format_column_expression(expression):
+    """Collapse a calculated column DAX expression onto a single line"""
+    return _sub(r"\s+", " ", expression).strip()
+
+
+def _description(node):
+    """Description of a TMDL object from its '///' lines or a description property"""
+    return node.description or node.properties.get("description", "")
+
+
+def parse_table_file(content):
+    """Build the table_info structure from the contents of a table .tmdl file"""
+    table_node = next((node for node in parse_tmdl(content) if node.kind == "table"), None)
+    if table_node is None:
+        return None
+    return table_info_from_node(table_node)
+
+
+def table_info_from_node(table_node):
+    """Build the table_info structure from a parsed TMDL table object"""
+    table_info = {"name": table_node.name, "description": _description(table_node), "measures": [], "columns": []}
+
+    for child in table_node.children:
+        if child.kind == "column":
+            if child.expression is None:
+                column_info = {
+                    "name": child.name,
+                    "dataType": child.properties.get("dataType", ""),
+                    "description": _description(child),
+                }
+            else:
+                # Columns defined with '=' are calculated columns
+                column_info = {
+                    "name": child.name,
+                    "type": "calculated",
+                    "dataType": child.properties.get("dataType", "calculated"),
+                    "description": _description(child),
+                    "expression": format_column_expression(child.expression),
+                }
+            table_info["columns"].append(column_info)
+
+        elif child.kind == "measure":
+            measure_info = {
+                "name": child.name,
+                "description": _description(child),
+                "expression": format_measure_expression(child.expression or ""),
+                "formatString": child.properties.get("formatString", ""),
+                "displayFolder": child.properties.get("displayFolder", ""),
+            }
+            table_info["measures"].append(measure_info)
+
+    return table_info
+
+
+# A relationship object with its indented lines, and one property line directly inside it
+_RELATIONSHIP_BLOCK = re.compile(r"^relationship[ \t]+[^\n]*\n((?:[ \t]+[^\n]*\n?|\n)*)", re.M)
+_RELATIONSHIP_PROPERTY = re.compile(r"^(?:\t| {4})(\w+)[ \t]*(?::[ \t]*([^\n]*))?$", re.M)
+# Unquoted table names cannot contain dots, quoted ones escape quotes by doubling them
+_COLUMN_REFERENCE = re.compile(r"('(?:[^']|'')*'|[^.']+)\.(.+)$")
+
+
+def _unquote_name(name):
+    """TMDL name without its optional single quotes"""
+    if name[:1] == "'" and name[-1:] == "'" and len(name) >= 2:
+        return name[1:-1].replace("''", "'")
+    return name
+
+
+def relationship_info_from_properties(properties):
+    """Build the relationship_info structure from a relationship's properties, or None"""
+    if "fromTable" in properties and "toTable" in properties:
+        # Per-file layout: tables and columns as separate properties
+        ends = (
+            properties["fromTable"],
+            properties.get("fromColumn", ""),
+            properties["toTable"],
+            properties.get("toColumn", ""),
+        )
+    else:
+        # relationships.tmdl layout: fromColumn: Table.Column
+        from_match = _COLUMN_REFERENCE.match(properties.get("fromColumn", ""))
+        to_match = _COLUMN_REFERENCE.match(properties.get("toColumn", ""))
+        if from_match is None or to_match is None:
+            return None
+        ends = from_match.groups() + to_match.groups()
+
+    from_table, from_column, to_table, to_column = map(_unquote_name, ends)
+    if not (from_table and from_column and to_table and to_column):
+        return None
+    return {
+        "fromTable": from_table,
+        "fromColumn": from_column,
+        "toTable": to_table,
+        "toColumn": to_column,
+        # TMDL omits properties that have their default value
+        "crossFilteringBehavior": properties.get("crossFilteringBehavior", "oneDirection"),
+        "isActive": properties.get("isActive", "true") != "false",
+    }
+
+
+def parse_relationships_file(content):
+    """Build relationship_info structures from a relationships.tmdl or a per-relationship .tmdl file"""
+    relationships = []
+    for block in _finditer(_RELATIONSHIP_BLOCK, content):
+        # A bare flag such as 'isActive' has no value
+        properties = {name: value.rstrip() or "true" for name, value in _RELATIONSHIP_PROPERTY.findall(block.group(1))}
+        relationship_info = relationship_info_from_properties(properties)
+        if relationship_info:
+            relationships.append(relationship_info)
+    return relationships
+
+
+def parse_relationship_file(content):
+    """Build the relationship_info structure from the contents of a relationship .tmdl file"""
+    relationships = parse_relationships_file(content)
+    return relationships[0] if relationships else None
+
+
+def parse_section_file(content, max_literal_bytes=None, literal_mode="hash"):
+    """
+    Build query_info structures from Section1.m: the section itself followed by each shared query
 
-            # Create query info
-            query_info = {"name": query_name, "expression": content}
+    Args:
+        content: Section document as str, bytes or a memory map
+        max_literal_bytes, literal_mode: Replace longer string literals instead of copying
+                                         them (see m_lexer.section_queries)
+    """
+    queries = section_queries(content, max_literal_bytes, literal_mode)
+    _count_matches(len(queries))
+    return queries
 
-            # Add to global M code collection
-            self.m_code_info.append(query_info)
 
-        # If no M files found, try to extract from expressions.tmdl
-        if not self.m_code_info:
-            expressions_file = self.model_path / "Model" / "expressions.tmdl"
-            if expressions_file.exists():
-                with open(expressions_file, "r", encoding="utf-8") as f:
-                    content = f.read()
+def power_query_entry(query_info):
+    """queries.powerQueries entry for a query_info; the whole section document keeps its isSection marker"""
+    entry = {"name": query_info["name"], "expression": query_info["expression"]}
+    if query_info.get("isSection"):
+        entry["isSection"] = True
+    return entry
 
-                # Extract expressions
-                expression_blocks = re.finditer(r"expression\s+([^\s]+)\s*\{([^}]+)\}", content, re.DOTALL)
 
-                for match in expression_blocks:
-                    query_name = match.group(1).strip()
-                    query_content = match.group(2).strip()
+def parse_section_path(path, max_literal_bytes=None, literal_mode="hash"):
+    """parse_section_file for a Section1.m path, mapped into memory instead of read"""
+    with mapped_file(path) as content:
+        return parse_section_file(content, max_literal_bytes, literal_mode)
 
-                    # Extract expression
-                    expression_match = re.search(r'Value:\s*"([^"]+)"', query_content)
-                    if expression_match:
-                        expression = expression_match.group(1).strip()
 
-                        # Unescape special characters
-                        expression = expression.replace("\\n", "\n").replace('\\"', '"').replace("\\\\", "\\")
+def parse_m_file(content):
+    """A standalone .m file holds a single query expression"""
+    return content
 
-                        # Create query info
-                        query_info = {"name": query_name, "expression": expression}
 
-                        # Add to global M code collection
-                        self.m_code_info.append(query_info)
+def parse_expressions_file(content):
+    """Build query_info structures from the shared expressions in expressions.tmdl"""
+    queries = [
+        {"name": node.name, "expression": node.expression or ""}
+        for node in parse_tmdl(content)
+        if node.kind == "expression"
+    ]
+    _count_matches(len(queries))
+    return queries
 
 
 def main(target_dir=None):
@@ -362,7 +748,8 @@ def main(target_dir=None):
         target_dir: Optional path to the directory containing the model files.
                    If None, uses the current directory.
     Returns:
-        dict: The extracted model information
+        dict: The extracted model information (None when run as a script, where it is
+              streamed to pbi_model_info.json instead)
     """
     # Use provided directory or fallback to current directory
     working_dir = target_dir if target_dir else os.path.dirname(os.path.abspath(__file__))
@@ -370,18 +757,17 @@ def main(target_dir=None):
     # Create extractor
     extractor = PowerBIModelExtractor(working_dir)
 
-    # Extract all model information
-    model_info = extractor.extract_all()
-
-    # If running as script (not imported), save to file
+    # If running as script (not imported), stream straight to file
     if __name__ == "__main__":
         output_file = os.path.join(working_dir, "pbi_model_info.json")
         with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(model_info, f, indent=2)
+            extractor.write_json(f, indent=2)
         print(f"Model information saved to {os.path.basename(output_file)}")
         print("Extraction complete!")
+        return None
 
-    return model_info
+    # Extract all model information
+    return extractor.extract_all()
 
 
 if __name__ == "__main__":
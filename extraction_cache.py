@@ -0,0 +1,169 @@
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Bump whenever a parser change alters the fragments produced for the same source file
+CACHE_VERSION = 7
+
+CACHE_FILE_NAME = "pbi_model_info.cache.json"
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_fingerprinted(path):
+    """
+    Read a file's bytes together with the fingerprint of exactly those bytes, as
+    (data, (size, mtime_ns, sha256)). The stat is taken before reading, so a file written
+    while it is read is caught by a later stat; the fingerprint is None when the size read
+    does not match it.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) != stat.st_size:
+        return data, None
+    return data, (stat.st_size, stat.st_mtime_ns, hashlib.sha256(data).hexdigest())
+
+
+def fingerprint_file(path):
+    """Fingerprint of a file that is parsed from its path, or None when it changed while being hashed"""
+    stat = os.stat(path)
+    digest = hash_file(path)
+    if not unchanged_since(path, (stat.st_size, stat.st_mtime_ns, digest)):
+        return None
+    return stat.st_size, stat.st_mtime_ns, digest
+
+
+def unchanged_since(path, fingerprint):
+    """Whether a file still has the size and modification time of a fingerprint"""
+    if fingerprint is None:
+        return False
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns) == fingerprint[:2]
+
+
+class ExtractionCache:
+    """Parsed per-file fragments keyed on source file fingerprints (size, mtime, content hash)"""
+
+    def __init__(self, cache_file, root):
+        """
+        Args:
+            cache_file: Path of the sidecar cache file; None keeps the cache in memory only
+            root: Model folder; cache keys are source paths relative to it
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.root = Path(root)
+        self.entries = {}
+        self.seen = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Load the cache file, discarding it when missing, unreadable or from another cache version"""
+        self.entries = {}
+        if self.cache_file is None:
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(data, dict) and data.get("cacheVersion") == CACHE_VERSION:
+            self.entries = data.get("files", {})
+
+    def _key(self, path):
+        path = Path(path)
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def lookup(self, path, variant=None):
+        """
+        Return (True, fragment) when path is unchanged since it was cached, otherwise (False, None)
+
+        Args:
+            variant: Parser options the fragment depends on; an entry stored with other
+                     options is a miss
+        """
+        key = self._key(path)
+        entry = self.entries.get(key)
+        stat = os.stat(path)
+
+        if entry is not None and entry.get("variant") == variant and entry["size"] == stat.st_size:
+            # Same size and mtime is trusted; a touched file is confirmed by its content hash
+            if entry["mtime"] != stat.st_mtime_ns:
+                if entry["sha256"] != hash_file(path):
+                    entry = None
+                else:
+                    entry = dict(entry, mtime=stat.st_mtime_ns)
+        else:
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        self.seen[key] = entry
+        return True, copy.deepcopy(entry["fragment"])
+
+    def store(self, path, fragment, variant=None, fingerprint=None):
+        """
+        Record the parsed fragment for a source file
+
+        Args:
+            fingerprint: (size, mtime_ns, sha256) of the content the fragment was parsed
+                         from (see read_fingerprinted); taken from the file as it is now when
+                         omitted, which is only safe if the file cannot have changed since
+        """
+        if fingerprint is None:
+            stat = os.stat(path)
+            fingerprint = (stat.st_size, stat.st_mtime_ns, hash_file(path))
+        size, mtime, sha256 = fingerprint
+        entry = {
+            "size": size,
+            "mtime": mtime,
+            "sha256": sha256,
+            "fragment": copy.deepcopy(fragment),
+        }
+        if variant is not None:
+            entry["variant"] = variant
+        self.seen[self._key(path)] = entry
+
+    def save(self, keep_unseen=False):
+        """
+        Write the entries used in this run; files that were removed from the model drop out
+
+        Args:
+            keep_unseen: Also keep entries of files that still exist but were not looked up,
+                         for runs that skip part of the model
+        """
+        if keep_unseen:
+            for key, entry in self.entries.items():
+                if key not in self.seen and (self.root / key).exists():
+                    self.seen[key] = entry
+        if self.cache_file is not None:
+            data = {"cacheVersion": CACHE_VERSION, "files": self.seen}
+            temp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+
+        self.entries = self.seen
+        self.seen = {}
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
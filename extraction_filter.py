@@ -0,0 +1,119 @@
+from fnmatch import fnmatchcase
+from pathlib import Path
+from urllib.parse import unquote
+
+# Object kinds that can be included or excluded
+OBJECT_KINDS = ("columns", "calculatedColumns", "measures", "relationships", "queries")
+
+# Kinds read from the table files
+TABLE_KINDS = ("columns", "calculatedColumns", "measures")
+
+
+class ExtractionFilter:
+    """
+    Which tables and object kinds an extraction keeps.
+
+    The filter is pushed down: table files whose name does not match are never read, and
+    the tables, relationships and queries phases are skipped when none of their kinds is
+    kept. Table files are matched on their file name, which pbi-tools derives from the
+    table name (escaping characters such as '/' as %XX); the parsed name is checked again.
+    """
+
+    def __init__(self, tables=None, exclude_tables=None, kinds=None, exclude_kinds=None):
+        """
+        Args:
+            tables: Table name patterns (fnmatch style, case-sensitive) to keep; None keeps all
+            exclude_tables: Table name patterns to drop, applied after tables
+            kinds: Object kinds to keep (see OBJECT_KINDS); None keeps all
+            exclude_kinds: Object kinds to drop, applied after kinds
+        """
+        for kind in tuple(kinds or ()) + tuple(exclude_kinds or ()):
+            if kind not in OBJECT_KINDS:
+                raise ValueError(f"Unknown object kind {kind!r}, expected one of {', '.join(OBJECT_KINDS)}")
+
+        self.tables = list(tables) if tables is not None else None
+        self.exclude_tables = list(exclude_tables or ())
+        selected = set(kinds) if kinds is not None else set(OBJECT_KINDS)
+        self.kinds = selected - set(exclude_kinds or ())
+
+    @property
+    def active(self):
+        """Whether anything is filtered out"""
+        return self.filters_tables or self.kinds != set(OBJECT_KINDS)
+
+    @property
+    def filters_tables(self):
+        """Whether any table pattern is set, i.e. whether table_matches() can return False"""
+        return self.tables is not None or bool(self.exclude_tables)
+
+    def wants(self, kind):
+        """Whether objects of a kind are kept"""
+        return kind in self.kinds
+
+    def wants_tables(self):
+        """Whether the table files need to be read at all"""
+        return any(kind in self.kinds for kind in TABLE_KINDS)
+
+    def table_matches(self, name):
+        """Whether a table name passes the table patterns"""
+        if self.tables is not None and not any(fnmatchcase(name, pattern) for pattern in self.tables):
+            return False
+        return not any(fnmatchcase(name, pattern) for pattern in self.exclude_tables)
+
+    def table_file_matches(self, path):
+        """Whether a table file may hold a kept table, judged from its file name only"""
+        return self.table_matches(unquote(Path(path).stem))
+
+    def relationship_matches(self, relationship_info):
+        """Relationships are kept when both of their tables are"""
+        return self.table_matches(relationship_info["fromTable"]) and self.table_matches(relationship_info["toTable"])
+
+    def apply_to_table(self, table_info):
+        """Copy of table_info without the columns and measures of dropped kinds"""
+        keep_columns = self.wants("columns")
+        keep_calculated = self.wants("calculatedColumns")
+        table_info = dict(table_info)
+        table_info["columns"] = [
+            column
+            for column in table_info.get("columns", [])
+            if (keep_calculated if column.get("type") == "calculated" else keep_columns)
+        ]
+        if not self.wants("measures"):
+            table_info["measures"] = []
+        return table_info
+
+    def to_dict(self):
+        """Description of the filter for the output metadata"""
+        filters = {"kinds": [kind for kind in OBJECT_KINDS if kind in self.kinds]}
+        if self.tables is not None:
+            filters["tables"] = self.tables
+        if self.exclude_tables:
+            filters["excludeTables"] = self.exclude_tables
+        return filters
+
+
+def add_filter_arguments(parser):
+    """Add the --tables, --exclude-tables, --kinds and --exclude-kinds options to an argparse parser"""
+    parser.add_argument("--tables", action="append", help="Only extract tables matching this pattern (repeatable)")
+    parser.add_argument("--exclude-tables", action="append", help="Skip tables matching this pattern (repeatable)")
+    parser.add_argument("--kinds", help=f"Comma-separated object kinds to extract ({', '.join(OBJECT_KINDS)})")
+    parser.add_argument("--exclude-kinds", help="Comma-separated object kinds to skip")
+
+
+def filters_from_args(parser, args):
+    """
+    Filter keyword arguments for PowerBIModelExtractor from options added by add_filter_arguments().
+
+    Unknown kinds are reported through parser.error() before any extraction starts.
+    """
+    filters = {
+        "tables": args.tables,
+        "exclude_tables": args.exclude_tables,
+        "kinds": args.kinds.split(",") if args.kinds else None,
+        "exclude_kinds": args.exclude_kinds.split(",") if args.exclude_kinds else None,
+    }
+    try:
+        ExtractionFilter(**filters)
+    except ValueError as e:
+        parser.error(str(e))
+    return filters
@@ -0,0 +1,159 @@
+import os
+import queue
+import subprocess
+import threading
+
+from extract_pbi_model_info import PowerBIModelExtractor
+
+OUTPUT_FILE_NAME = "pbi_model_info.json"
+
+
+class JobCancelled(Exception):
+    """Raised inside the worker thread when the job is cancelled"""
+
+
+class ExtractionJob:
+    """
+    Runs pbi-tools and the metadata extraction on a background thread.
+
+    Progress is reported as event dicts on a queue that the caller drains with poll(),
+    e.g. from a Tk root.after() loop, so no UI code runs on the worker thread:
+
+        {"type": "output", "line": ...}                         a pbi-tools stdout/stderr line
+        {"type": "phase", "phase": ...}                         "pbi-tools", "metadata" or "saving"
+        {"type": "progress", "phase": ..., "done": n, "total": m}  source files parsed
+        {"type": "done", "extraction_dir": ..., "output_file": ...}
+        {"type": "error", "kind": ..., "message": ...}          kind: "pbi-tools", "model-not-found",
+                                                                "metadata" or "unexpected"
+        {"type": "cancelled"}
+
+    Exactly one of done, error or cancelled is the last event of a job.
+    """
+
+    def __init__(self, command, model_dirs, output_dir=None, extractor_factory=PowerBIModelExtractor):
+        """
+        Args:
+            command: pbi-tools command line as a list, or None when the PBIX is already extracted
+            model_dirs: Candidate extraction folders; the first one containing Model/ is used
+            output_dir: Folder for pbi_model_info.json; defaults to the extraction folder
+            extractor_factory: Callable(model_path, progress=...) returning the extractor
+        """
+        self.command = command
+        self.model_dirs = list(model_dirs)
+        self.output_dir = output_dir
+        self.extractor_factory = extractor_factory
+
+        self.events = queue.Queue()
+        self._cancelled = threading.Event()
+        self._process = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the job on a daemon thread and return immediately"""
+        self._thread = threading.Thread(target=self._run, name="ExtractionJob", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Request cancellation; a running pbi-tools process is killed"""
+        self._cancelled.set()
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns False if the timeout expired first"""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def poll(self):
+        """Return all events queued since the last call, without blocking"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _emit(self, event_type, **data):
+        self.events.put(dict(type=event_type, **data))
+
+    def _check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def _run(self):
+        try:
+            if self.command:
+                self._check_cancelled()
+                self._emit("phase", phase="pbi-tools")
+                if not self._run_command():
+                    return
+
+            extraction_dir = next((d for d in self.model_dirs if os.path.exists(os.path.join(d, "Model"))), None)
+            if extraction_dir is None:
+                locations = "\n".join(f"- {d}" for d in self.model_dirs)
+                self._emit(
+                    "error",
+                    kind="model-not-found",
+                    message=f"Could not find Model folder in expected locations:\n{locations}",
+                )
+                return
+            extraction_dir = os.path.normpath(extraction_dir)
+
+            self._check_cancelled()
+            self._emit("phase", phase="metadata")
+            try:
+                extractor = self.extractor_factory(extraction_dir, progress=self._on_progress)
+                save_dir = os.path.normpath(self.output_dir or extraction_dir)
+                output_file = os.path.join(save_dir, OUTPUT_FILE_NAME)
+                extractor.save(output_file)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                self._emit("error", kind="metadata", message=str(e), extraction_dir=extraction_dir)
+                return
+
+            self._emit("done", extraction_dir=extraction_dir, output_file=output_file)
+        except JobCancelled:
+            self._emit("cancelled")
+        except Exception as e:
+            self._emit("error", kind="unexpected", message=str(e))
+
+    def _run_command(self):
+        """Run pbi-tools, streaming its output lines; returns True on success"""
+        with self._lock:
+            self._check_cancelled()
+            self._process = subprocess.Popen(
+                self.command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+
+        lines = []
+        for line in self._process.stdout:
+            line = line.rstrip("\r\n")
+            lines.append(line)
+            self._emit("output", line=line)
+        returncode = self._process.wait()
+
+        self._check_cancelled()
+        if returncode != 0:
+            self._emit("error", kind="pbi-tools", message="\n".join(lines), returncode=returncode)
+            return False
+        return True
+
+    def _on_progress(self, phase, done, total):
+        self._check_cancelled()
+        self._emit("progress", phase=phase, done=done, total=total)
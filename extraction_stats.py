@@ -0,0 +1,147 @@
+import time
+from contextlib import contextmanager
+
+# Counters kept per phase next to wallSeconds/cpuSeconds
+PHASE_COUNTERS = ("files", "bytesRead", "cacheHits", "objects", "regexMatches")
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+class ExtractionStats:
+    """
+    Wall time, CPU time and counters per extraction phase.
+
+    Phases ("tables", "relationships", "queries", "partitions", "serialization") are
+    measured exclusively: time spent in a phase nested inside another one (such as
+    parsing a table while the JSON is being written) only counts for the inner phase.
+    cpuSeconds is the CPU time of this process, so work done in worker processes shows
+    up in wallSeconds only.
+    """
+
+    def __init__(self, callback=None):
+        """
+        Args:
+            callback: Optional callable(phase, stats) called with a copy of the phase's
+                      stats dict each time a phase completes
+        """
+        self.callback = callback
+        self.phases = {}
+        # One [wall start, cpu start, nested wall, nested cpu] frame per open measurement
+        self._stack = []
+
+    def phase(self, name):
+        """The stats dict of a phase, created on first use"""
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = _empty_stats()
+        return stats
+
+    def add(self, name, **counters):
+        """Add to the counters of a phase"""
+        stats = self.phase(name)
+        for counter, value in counters.items():
+            stats[counter] += value
+
+    @contextmanager
+    def measure(self, name):
+        """Add the wall and CPU time spent in the with block to a phase"""
+        frame = self._open()
+        try:
+            yield
+        finally:
+            self._close(frame, self.phase(name))
+
+    def timed(self, name, iterable):
+        """Yield from iterable, timing each step as the phase and counting the objects emitted"""
+        iterator = iter(iterable)
+        stats = self.phase(name)
+        while True:
+            # Inlined rather than using measure(), as this runs once per emitted object
+            frame = self._open()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                self._close(frame, stats)
+            stats["objects"] += 1
+            yield item
+        self.finish(name)
+
+    def _open(self):
+        frame = [time.perf_counter(), time.process_time(), 0.0, 0.0]
+        self._stack.append(frame)
+        return frame
+
+    def _close(self, frame, stats):
+        self._stack.pop()
+        wall = time.perf_counter() - frame[0]
+        cpu = time.process_time() - frame[1]
+        stats["wallSeconds"] += wall - frame[2]
+        stats["cpuSeconds"] += cpu - frame[3]
+        if self._stack:
+            self._stack[-1][2] += wall
+            self._stack[-1][3] += cpu
+
+    def finish(self, name):
+        """Report a completed phase to the callback"""
+        if self.callback:
+            self.callback(name, dict(self.phase(name)))
+
+    def to_dict(self):
+        """Stats of every phase plus their totals, as stored under metadata.stats"""
+        phases = {name: _rounded(stats) for name, stats in self.phases.items()}
+        total = _empty_stats()
+        for stats in self.phases.values():
+            for key in total:
+                total[key] += stats[key]
+        return {"phases": phases, "total": _rounded(total)}
+
+
+def _empty_stats():
+    return dict({"wallSeconds": 0.0, "cpuSeconds": 0.0}, **dict.fromkeys(PHASE_COUNTERS, 0))
+
+
+def _rounded(stats):
+    return {key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}
+
+
+@contextmanager
+def capture_profile(path, mode="cprofile"):
+    """
+    Profile the with block and dump the result to path; does nothing when path is None.
+
+    Modes:
+        cprofile: cProfile stats, readable with pstats.Stats(path)
+        tracemalloc: a tracemalloc snapshot taken at the end of the block, readable with
+                     tracemalloc.Snapshot.load(path)
+    """
+    if not path:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}, expected one of {', '.join(PROFILE_MODES)}")
+
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(path))
+    else:
+        import tracemalloc
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(25)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            if started:
+                tracemalloc.stop()
+            snapshot.dump(str(path))
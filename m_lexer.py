@@ -0,0 +1,209 @@
+"""
+Streaming lexer for Power Query M section documents (Section1.m).
+
+The section is scanned in place, over an mmap of the file or an in-memory str/bytes
+buffer, jumping from one significant token to the next. String literals, quoted
+identifiers (#"...") and comments are skipped as units, so semicolons and equals signs
+inside them do not split members. Only the member expressions are copied out of the
+buffer. String literals longer than a limit (embedded Binary.FromText payloads) can be
+elided or replaced by their hash instead of being copied.
+"""
+
+import hashlib
+import mmap
+import re
+from collections import namedtuple
+from contextlib import contextmanager
+
+LITERAL_MODES = ("elide", "hash")
+
+_STRING = r'#?"[^"]*(?:""[^"]*)*"?'
+_COMMENT = r"//[^\n]*|/\*[^*]*(?:\*(?!/)[^*]*)*(?:\*/)?"
+# Member header tokens: 1 string or quoted identifier, 2 comment, 3 '=', 4 '[', 5 ']', 6 ';'
+_HEADER_TOKEN = rf"({_STRING})|({_COMMENT})|(=)|(\[)|(\])|(;)"
+# A whole member body up to its ';', written as normal* (special normal*)* so that it
+# matches in linear time: every special token starts with a character normal excludes
+_BODY = (
+    r'[^";/#]*(?:(?:"[^"]*(?:""[^"]*)*"|#"[^"]*(?:""[^"]*)*"|#(?!")'
+    r'|//[^\n]*|/\*[^*]*(?:\*(?!/)[^*]*)*\*/|/(?![/*]))[^";/#]*)*;'
+)
+# Strings and comments inside a member body, to find its long literals
+_BODY_TOKEN = rf"({_STRING})|{_COMMENT}"
+# The usual header without comments or attributes, matched directly: 1 shared, 2 name
+_SIMPLE_HEADER = r'\s*(shared\s+)?(#"[^"]*(?:""[^"]*)*"|[A-Za-z_][\w.]*)\s*='
+
+_PATTERN_SOURCES = (_HEADER_TOKEN, _BODY, _BODY_TOKEN, _SIMPLE_HEADER)
+_PATTERNS = {
+    str: tuple(re.compile(pattern, re.DOTALL) for pattern in _PATTERN_SOURCES),
+    bytes: tuple(re.compile(pattern.encode(), re.DOTALL) for pattern in _PATTERN_SOURCES),
+}
+_QUOTE = {str: '"', bytes: b'"'}
+_BOM = b"\xef\xbb\xbf"
+_HASH_CHUNK = 1 << 20
+
+_HEADER_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_SECTION_HEADER = re.compile(r"\s*section\s+([^;]+?)\s*$", re.DOTALL)
+_MEMBER_HEADER = re.compile(r'\s*(?:\[.*\]\s*)?(shared\s+)?(#"(?:[^"]|"")*"|\S+)\s*$', re.DOTALL)
+
+# name: section name or None; members: (name, shared, start, end) expression spans;
+# literals: (start, end) content spans of long string literals; tokens: tokens matched
+SectionScan = namedtuple("SectionScan", "name members literals tokens")
+
+
+def _decode(chunk):
+    if isinstance(chunk, str):
+        return chunk
+    # Same newline handling as reading the file in text mode
+    return chunk.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def unquote_identifier(name):
+    """Member name without #"..." quoting"""
+    if name.startswith('#"') and name.endswith('"'):
+        return name[2:-1].replace('""', '"')
+    return name
+
+
+def scan_section(buffer, max_literal_bytes=None):
+    """
+    Find the section name, the member expression spans and the long string literals of
+    an M section document held in a str, bytes or mmap buffer.
+
+    Args:
+        max_literal_bytes: String literals with longer content are listed in literals;
+                           None lists none
+    """
+    kind = str if isinstance(buffer, str) else bytes
+    header_token, body, body_token, simple_header = _PATTERNS[kind]
+    quote = _QUOTE[kind]
+
+    section_name = None
+    members = []
+    literals = []
+    token_count = 0
+
+    position = 3 if kind is bytes and buffer[:3] == _BOM else 0
+    segment_start = position
+    depth = 0
+    while True:
+        simple = simple_header.match(buffer, position) if position == segment_start else None
+        if simple:
+            token_count += 1
+            token = 3
+            position = simple.end()
+        else:
+            match = header_token.search(buffer, position)
+            if match is None:
+                break
+            token_count += 1
+            token = match.lastindex
+            position = match.end()
+
+        if token == 3 and not depth:
+            # The first '=' outside an attribute record separates name and expression
+            if simple:
+                member = (_decode(simple.group(2)), bool(simple.group(1)))
+            else:
+                header = _HEADER_COMMENT.sub("", _decode(buffer[segment_start : match.start()]))
+                member_match = _MEMBER_HEADER.match(header)
+                member = (member_match.group(2), bool(member_match.group(1))) if member_match else None
+            body_match = body.match(buffer, position)
+            end = body_match.end() - 1 if body_match else len(buffer)
+            if member:
+                members.append(member + (position, end))
+
+            # Only a member longer than the limit can hold a long literal
+            if max_literal_bytes is not None and end - position > max_literal_bytes:
+                for literal in body_token.finditer(buffer, position, end):
+                    token_count += 1
+                    literal_start, literal_end = literal.span(1)
+                    if buffer[literal_start : literal_start + 1] == quote:
+                        if literal_end - literal_start - 2 > max_literal_bytes:
+                            literals.append((literal_start + 1, literal_end - 1))
+
+            if body_match is None:
+                break
+            token_count += 1
+            position = segment_start = body_match.end()
+            depth = 0
+        elif token == 4:
+            depth += 1
+        elif token == 5:
+            depth -= 1
+        elif token == 6:
+            # A declaration without '=', such as "section Section1;"
+            header = _HEADER_COMMENT.sub("", _decode(buffer[segment_start : match.start()]))
+            section_match = _SECTION_HEADER.match(header)
+            if section_match and section_name is None:
+                section_name = section_match.group(1)
+            segment_start = position
+            depth = 0
+
+    return SectionScan(section_name, members, literals, token_count)
+
+
+def literal_placeholder(buffer, start, end, literal_mode="hash"):
+    """Replacement content for the long string literal at buffer[start:end]"""
+    if literal_mode not in LITERAL_MODES:
+        raise ValueError(f"Unknown literal mode {literal_mode!r}, expected one of {', '.join(LITERAL_MODES)}")
+    if literal_mode == "elide":
+        return f"<literal elided: {end - start} bytes>"
+
+    digest = hashlib.sha256()
+    for offset in range(start, end, _HASH_CHUNK):
+        chunk = buffer[offset : min(end, offset + _HASH_CHUNK)]
+        digest.update(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    return f"<literal sha256:{digest.hexdigest()} {end - start} bytes>"
+
+
+def render_span(buffer, start, end, literals=(), literal_mode="hash"):
+    """Text of buffer[start:end] with the long literals inside it replaced by placeholders"""
+    pieces = []
+    for literal_start, literal_end in literals:
+        if literal_end <= start or literal_start >= end:
+            continue
+        pieces.append(_decode(buffer[start:literal_start]))
+        pieces.append(literal_placeholder(buffer, literal_start, literal_end, literal_mode))
+        start = literal_end
+    pieces.append(_decode(buffer[start:end]))
+    return "".join(pieces)
+
+
+def section_queries(buffer, max_literal_bytes=None, literal_mode="hash"):
+    """
+    Build query_info structures from an M section document: the section itself, marked
+    with "isSection": True, followed by each shared member. Returns [] when the buffer
+    has no section declaration.
+
+    Args:
+        max_literal_bytes: Replace the content of longer string literals according to
+                           literal_mode instead of copying it; None keeps everything
+        literal_mode: "elide" (size only) or "hash" (SHA-256 and size)
+    """
+    scan = scan_section(buffer, max_literal_bytes)
+    if scan.name is None:
+        return []
+
+    start = 3 if not isinstance(buffer, str) and buffer[:3] == _BOM else 0
+    section = render_span(buffer, start, len(buffer), scan.literals, literal_mode)
+    queries = [{"name": scan.name, "expression": section, "isSection": True}]
+    for name, shared, expression_start, expression_end in scan.members:
+        if shared:
+            expression = render_span(buffer, expression_start, expression_end, scan.literals, literal_mode)
+            queries.append({"name": unquote_identifier(name), "expression": expression.strip()})
+    return queries
+
+
+@contextmanager
+def mapped_file(path):
+    """Map a file read-only; yields b"" for an empty file, which cannot be mapped"""
+    with open(path, "rb") as f:
+        try:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+        try:
+            yield view
+        finally:
+            view.close()
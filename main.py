@@ -1,15 +1,20 @@
-import json
 import os
 import platform
-import requests
-import socket
-import subprocess
 import sys
-import tkinter as tk
-from tkinter import ttk
-from tkinter import filedialog, messagebox
-import uuid
-from extract_pbi_model_info import PowerBIModelExtractor
+
+# tkinter is imported by load_tkinter() so headless runs never load it
+tk = ttk = filedialog = messagebox = None
+
+# Seconds to wait for a cancelled extraction to stop when the window is closed
+JOB_CLOSE_TIMEOUT = 10
+
+
+def load_tkinter():
+    """Import tkinter on first use"""
+    global tk, ttk, filedialog, messagebox
+    import tkinter as tk
+    from tkinter import ttk
+    from tkinter import filedialog, messagebox
 
 
 def get_base_path():
@@ -20,8 +25,13 @@ def get_base_path():
 
 
 def send_error_report(error_message, error_type, additional_info=None):
-    """Send error report to the logging website"""
+    """Queue an error report for the logging website; it is sent in the background"""
     try:
+        import socket
+        import uuid
+
+        from error_reporter import get_error_reporter
+
         system_info = {
             "os": platform.system(),
             "os_version": platform.version(),
@@ -38,19 +48,16 @@ def send_error_report(error_message, error_type, additional_info=None):
             "additional_info": additional_info or {},
         }
 
-        response = requests.post(
-            "https://app.enterprisedna.co/api/v1/extractor-error",
-            json=payload,
-            timeout=5,
-        )
-        return response.status_code == 200
+        get_error_reporter().report(payload)
+        return True
     except Exception as e:
-        print(f"Failed to send error report: {str(e)}")
+        print(f"Failed to queue error report: {str(e)}")
         return False
 
 
 class PBIX_Extractor:
     def __init__(self):
+        load_tkinter()
         self.root = tk.Tk()
         self.root.title("EDNAHQ PBIX Model Extractor")
 
@@ -68,10 +75,12 @@ class PBIX_Extractor:
         self.file_path = None
         self.output_path = None
         self.output_path_manually_set = False
+        self.job = None
 
         self.create_widgets()
 
         self.button_OK["state"] = "disabled"
+        self.root.protocol("WM_DELETE_WINDOW", self.close_window)
 
         self.root.mainloop()
 
@@ -127,6 +136,10 @@ class PBIX_Extractor:
         )
         self.powered_by_label.place(relx=0.02, rely=0.93)
 
+        # Progress of a running extraction
+        self.status_label = tk.Label(self.root, text="", font=("Segoe UI", 8), fg="#3d4244", bg="#f3f0ea", anchor="w")
+        self.status_label.place(relx=0.1, rely=0.8, relwidth=0.6)
+
     def show_output_path_info(self):
         info_text = (
             "Extraction works best for 'V3' PBIX files (created with Power BI Desktop from September 2020 or newer).\n\n"
@@ -155,9 +168,21 @@ class PBIX_Extractor:
                 self.button_OK["state"] = "normal"
 
     def cancel(self):
+        # A running extraction is stopped first; poll_job closes the window once it has
+        if self.job is not None and self.job.is_running():
+            self.status_label.config(text="Cancelling...")
+            self.job.cancel()
+            return
         self.root.destroy()
         exit()
 
+    def close_window(self):
+        """Closing the window stops a running extraction, so pbi-tools is not left running"""
+        if self.job is not None and self.job.is_running():
+            self.job.cancel()
+            self.job.wait(timeout=JOB_CLOSE_TIMEOUT)
+        self.root.destroy()
+
     def extract_model(self):
         try:
             # Check if running on Windows
@@ -270,57 +295,23 @@ class PBIX_Extractor:
             if self.output_path_manually_set:
                 cmd.extend(["-extractFolder", os.path.normpath(self.output_path)])
 
-            pbi_tools_result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if pbi_tools_result.returncode == 0:
-                extraction_dir = ""
-                if self.output_path_manually_set and os.path.exists(os.path.join(effective_output_path, "Model")):
-                    extraction_dir = os.path.normpath(effective_output_path)
-                else:
-                    pbix_filename_no_ext = os.path.splitext(os.path.basename(self.file_path))[0]
-                    potential_path = os.path.join(os.path.dirname(self.file_path), pbix_filename_no_ext)
-                    if os.path.exists(os.path.join(potential_path, "Model")):
-                        extraction_dir = os.path.normpath(potential_path)
-                    else:
-                        messagebox.showerror(
-                            "Extraction Error",
-                            "Could not find Model folder in expected locations:\n"
-                            f"- {effective_output_path}\n"
-                            f"- {potential_path}",
-                            parent=self.root,
-                        )
-                        return
-                try:
-                    extractor = PowerBIModelExtractor(extraction_dir)
-                    model_info = extractor.extract_all()
-
-                    save_dir = os.path.normpath(
-                        effective_output_path if self.output_path_manually_set else extraction_dir
-                    )
-                    output_json_path = os.path.join(save_dir, "pbi_model_info.json")
-                    with open(output_json_path, "w", encoding="utf-8") as f:
-                        json.dump(model_info, f, indent=2)
-
-                    messagebox.showinfo(
-                        "Success",
-                        f"PBIX files extracted to:\n{extraction_dir}\n\n"
-                        f"Model metadata successfully processed and saved to:\n{output_json_path}",
-                        parent=self.root,
-                    )
-                except Exception as e_meta:
-                    messagebox.showerror(
-                        "Metadata Processing Error",
-                        f"PBIX files extracted to:\n{extraction_dir}\n\n"
-                        f"An error occurred while processing the metadata:\n{str(e_meta)}",
-                        parent=self.root,
-                    )
-            else:
-                print(str(pbi_tools_result))
+            pbix_filename_no_ext = os.path.splitext(os.path.basename(self.file_path))[0]
+            potential_path = os.path.join(os.path.dirname(self.file_path), pbix_filename_no_ext)
+            model_dirs = [potential_path]
+            if self.output_path_manually_set:
+                model_dirs.insert(0, effective_output_path)
 
-                error_output = pbi_tools_result.stderr if pbi_tools_result.stderr else pbi_tools_result.stdout
-                messagebox.showerror(
-                    "PBI-Tools Extraction Error", f"Failed to extract PBIX file:\n\n{error_output}", parent=self.root
-                )
+            # pbi-tools and the metadata parse run on a worker thread; poll_job picks up its events
+            from extraction_job import ExtractionJob
+
+            self.job = ExtractionJob(
+                cmd,
+                model_dirs,
+                output_dir=effective_output_path if self.output_path_manually_set else None,
+            ).start()
+            self.button_OK["state"] = "disabled"
+            self.status_label.config(text="Running pbi-tools...")
+            self.root.after(100, self.poll_job)
 
         except Exception as e:
             error_info = {
@@ -331,12 +322,92 @@ class PBIX_Extractor:
             send_error_report(str(e), "extraction_error", error_info)
             messagebox.showerror("Error", str(e))
         finally:
-            self.root.destroy()
+            if self.job is None:
+                self.root.destroy()
+
+    def poll_job(self):
+        """Show progress from the extraction job and report its outcome once it finishes"""
+        for event in self.job.poll():
+            if event["type"] == "output":
+                self.status_label.config(text=event["line"][:110])
+            elif event["type"] == "phase" and event["phase"] == "metadata":
+                self.status_label.config(text="Processing model metadata...")
+            elif event["type"] == "progress":
+                self.status_label.config(text=f"Parsing {event['phase']}: {event['done']} / {event['total']}")
+            elif event["type"] == "done":
+                messagebox.showinfo(
+                    "Success",
+                    f"PBIX files extracted to:\n{event['extraction_dir']}\n\n"
+                    f"Model metadata successfully processed and saved to:\n{event['output_file']}",
+                    parent=self.root,
+                )
+                self.root.destroy()
+                return
+            elif event["type"] == "error":
+                self.show_job_error(event)
+                self.root.destroy()
+                return
+            elif event["type"] == "cancelled":
+                self.root.destroy()
+                return
 
+        self.root.after(100, self.poll_job)
+
+    def show_job_error(self, event):
+        if event["kind"] == "pbi-tools":
+            print(event["message"])
+            messagebox.showerror(
+                "PBI-Tools Extraction Error", f"Failed to extract PBIX file:\n\n{event['message']}", parent=self.root
+            )
+        elif event["kind"] == "model-not-found":
+            messagebox.showerror("Extraction Error", event["message"], parent=self.root)
+        elif event["kind"] == "metadata":
+            messagebox.showerror(
+                "Metadata Processing Error",
+                f"PBIX files extracted to:\n{event['extraction_dir']}\n\n"
+                f"An error occurred while processing the metadata:\n{event['message']}",
+                parent=self.root,
+            )
+        else:
+            error_info = {
+                "file_path": self.file_path,
+                "output_path": self.output_path,
+                "operation": "extract_model",
+            }
+            send_error_report(event["message"], "extraction_error", error_info)
+            messagebox.showerror("Error", event["message"])
+
+
+def main(argv=None):
+    """
+    Start the GUI, or run headless when command line arguments are given.
+
+    Headless runs are handed to batch_extract (e.g. `pbix-extractor.exe "reports/*" --workers 4`)
+    and never import tkinter or requests.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from batch_extract import main as batch_main
+
+        return batch_main(argv)
 
-if __name__ == "__main__":
     try:
+        # Reports spooled while offline in earlier runs go out in the background
+        from error_reporter import ship_pending_reports
+
+        ship_pending_reports()
         PBIX_Extractor()
     except Exception as e:
+        load_tkinter()
         messagebox.showerror("Fatal Error", f"Application failed to start: {str(e)}")
-        sys.exit(1)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Worker processes of the headless batch mode re-enter the frozen executable
+        import multiprocessing
+
+        multiprocessing.freeze_support()
+    sys.exit(main())
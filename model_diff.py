@@ -0,0 +1,300 @@
+"""
+Structural diff between two extractions of the same model.
+
+Every table, column, measure, relationship and query gets a content hash, and the hashes
+roll up Merkle-style: columns and measures into their table, tables, relationships and
+queries into the model. Collections are split into a fixed number of buckets with a hash
+each, so comparing two versions only descends into buckets and tables whose hashes
+differ and the work done is proportional to the size of the change.
+
+    python model_diff.py old/pbi_model_info.json new/pbi_model_info.json [--json]
+"""
+
+import hashlib
+import json
+import sys
+
+from compact_layout import expand_model_info, load_model_info
+
+DEFAULT_FANOUT = 64
+
+CHANGE_KINDS = ("table", "partitions", "column", "measure", "relationship", "query")
+
+
+def content_hash(obj):
+    """Stable SHA-256 of a JSON-compatible object (independent of key order)"""
+    text = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _combine(*hashes):
+    return hashlib.sha256("".join(hashes).encode("ascii")).hexdigest()
+
+
+def _bucket(key, fanout):
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:8], 16) % fanout
+
+
+def relationship_key(relationship):
+    """Identity of a relationship: its from and to columns"""
+    return (
+        f"'{relationship['fromTable']}'[{relationship['fromColumn']}] -> "
+        f"'{relationship['toTable']}'[{relationship['toColumn']}]"
+    )
+
+
+class MerkleCollection:
+    """Child hashes keyed by name, grouped into buckets with one hash per bucket and one for all"""
+
+    def __init__(self, children, fanout=DEFAULT_FANOUT):
+        """
+        Args:
+            children: Mapping of child key -> content hash
+            fanout: Number of buckets; trees are only compared bucket-wise with equal fanouts
+        """
+        self.fanout = fanout
+        self.buckets = {}
+        for key, child_hash in children.items():
+            self.buckets.setdefault(_bucket(key, fanout), {})[key] = child_hash
+        self.bucket_hashes = {
+            index: _combine(*(_combine(key, bucket[key]) for key in sorted(bucket)))
+            for index, bucket in self.buckets.items()
+        }
+        self.hash = _combine(*(f"{index}:{self.bucket_hashes[index]}" for index in sorted(self.bucket_hashes)))
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def children(self):
+        """All child key -> hash pairs"""
+        return {key: child_hash for bucket in self.buckets.values() for key, child_hash in bucket.items()}
+
+    def diff(self, other):
+        """Yield (key, "added" | "removed" | "modified") going from self to other"""
+        if self.hash == other.hash:
+            return
+        if self.fanout != other.fanout:
+            pairs = [(self.children(), other.children())]
+        else:
+            indexes = set(self.bucket_hashes) | set(other.bucket_hashes)
+            pairs = [
+                (self.buckets.get(index, {}), other.buckets.get(index, {}))
+                for index in sorted(indexes)
+                if self.bucket_hashes.get(index) != other.bucket_hashes.get(index)
+            ]
+
+        for old, new in pairs:
+            for key in sorted(old.keys() - new.keys()):
+                yield key, "removed"
+            for key in sorted(new.keys() - old.keys()):
+                yield key, "added"
+            for key in sorted(old.keys() & new.keys()):
+                if old[key] != new[key]:
+                    yield key, "modified"
+
+
+class TableHash:
+    """Hashes of one table: its own properties, partitions, columns and measures"""
+
+    def __init__(self, properties, partitions, columns, measures, fanout=DEFAULT_FANOUT):
+        """
+        Args:
+            properties, partitions: Content hashes
+            columns, measures: Mappings of name -> content hash
+        """
+        self.properties = properties
+        self.partitions = partitions
+        self.columns = MerkleCollection(columns, fanout)
+        self.measures = MerkleCollection(measures, fanout)
+        self.hash = _combine(properties, partitions, self.columns.hash, self.measures.hash)
+
+    @classmethod
+    def from_table_info(cls, table_info, fanout=DEFAULT_FANOUT):
+        properties = {k: v for k, v in table_info.items() if k not in ("columns", "measures", "partitions")}
+        return cls(
+            content_hash(properties),
+            content_hash(table_info.get("partitions", [])),
+            {column["name"]: content_hash(column) for column in table_info.get("columns", [])},
+            {measure["name"]: content_hash(measure) for measure in table_info.get("measures", [])},
+            fanout,
+        )
+
+    def to_dict(self):
+        return {
+            "hash": self.hash,
+            "properties": self.properties,
+            "partitions": self.partitions,
+            "columns": self.columns.children(),
+            "measures": self.measures.children(),
+        }
+
+
+class ModelHashTree:
+    """Merkle tree of content hashes over one extraction"""
+
+    def __init__(self, tables, relationships, queries, fanout=DEFAULT_FANOUT, model_info=None):
+        """
+        Args:
+            tables: Mapping of table name -> TableHash
+            relationships, queries: Mappings of key -> content hash
+            model_info: The expanded extract_all() output the hashes were computed from,
+                        used to include the objects themselves in change sets
+        """
+        self.fanout = fanout
+        self.table_hashes = tables
+        self.tables = MerkleCollection({name: table.hash for name, table in tables.items()}, fanout)
+        self.relationships = MerkleCollection(relationships, fanout)
+        self.queries = MerkleCollection(queries, fanout)
+        self.hash = _combine(self.tables.hash, self.relationships.hash, self.queries.hash)
+
+        self.model_info = model_info
+        self._lookups = None
+
+    @classmethod
+    def from_model_info(cls, model_info, fanout=DEFAULT_FANOUT):
+        """Hash extract_all() output (legacy or compact layout)"""
+        if model_info.get("metadata", {}).get("layout"):
+            model_info = expand_model_info(model_info)
+        model = model_info["model"]
+
+        tables = {table["name"]: TableHash.from_table_info(table, fanout) for table in model.get("tables", [])}
+        relationships = {
+            key: content_hash(relationship) for key, relationship in _keyed_relationships(model).items()
+        }
+        queries = {
+            query["name"]: content_hash(query) for query in model_info.get("queries", {}).get("powerQueries", [])
+        }
+        return cls(tables, relationships, queries, fanout, model_info)
+
+    def to_dict(self):
+        """Hashes only, e.g. to keep next to pbi_model_info.json and diff against later"""
+        return {
+            "hash": self.hash,
+            "fanout": self.fanout,
+            "tables": {name: table.to_dict() for name, table in self.table_hashes.items()},
+            "relationships": self.relationships.children(),
+            "queries": self.queries.children(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        fanout = data.get("fanout", DEFAULT_FANOUT)
+        tables = {
+            name: TableHash(table["properties"], table["partitions"], table["columns"], table["measures"], fanout)
+            for name, table in data["tables"].items()
+        }
+        return cls(tables, data["relationships"], data["queries"], fanout)
+
+    def lookup(self, kind, name, table=None):
+        """The object a change refers to, or None when the tree was built without model_info"""
+        if self.model_info is None:
+            return None
+        if self._lookups is None:
+            # Top-level objects only; columns and measures are searched in their own table
+            model = self.model_info["model"]
+            self._lookups = {
+                "table": {table["name"]: table for table in model.get("tables", [])},
+                "relationship": _keyed_relationships(model),
+                "query": {q["name"]: q for q in self.model_info.get("queries", {}).get("powerQueries", [])},
+            }
+
+        if kind in self._lookups:
+            return self._lookups[kind].get(name)
+        table_info = self._lookups["table"][table]
+        if kind == "partitions":
+            return table_info.get("partitions", [])
+        key = "columns" if kind == "column" else "measures"
+        return next((obj for obj in table_info.get(key, []) if obj["name"] == name), None)
+
+
+def _keyed_relationships(model):
+    """Relationships by relationship_key(); repeated keys get a #n suffix"""
+    keyed = {}
+    for relationship in model.get("relationships", []):
+        key = base = relationship_key(relationship)
+        occurrence = 1
+        while key in keyed:
+            occurrence += 1
+            key = f"{base} #{occurrence}"
+        keyed[key] = relationship
+    return keyed
+
+
+def diff_trees(old, new, include_objects=True):
+    """
+    Change set going from the old to the new ModelHashTree.
+
+    Returns {"oldHash", "newHash", "changes": [...]} where each change is a dict with
+    "change" (added / removed / modified), "kind" (one of CHANGE_KINDS), "name" and, for
+    columns, measures and partitions, "table". Added or removed tables are reported
+    once, without their columns and measures. With include_objects, "before" and/or
+    "after" hold the objects when the trees were built from model info.
+    """
+    changes = []
+
+    def record(change, kind, name, table=None):
+        entry = {"change": change, "kind": kind, "name": name}
+        if table is not None:
+            entry["table"] = table
+        if include_objects:
+            if change != "added" and old.model_info is not None:
+                entry["before"] = old.lookup(kind, name, table)
+            if change != "removed" and new.model_info is not None:
+                entry["after"] = new.lookup(kind, name, table)
+        changes.append(entry)
+
+    if old.hash != new.hash:
+        for name, change in old.tables.diff(new.tables):
+            if change != "modified":
+                record(change, "table", name)
+                continue
+            old_table, new_table = old.table_hashes[name], new.table_hashes[name]
+            if old_table.properties != new_table.properties:
+                record("modified", "table", name)
+            if old_table.partitions != new_table.partitions:
+                record("modified", "partitions", name, table=name)
+            for column, column_change in old_table.columns.diff(new_table.columns):
+                record(column_change, "column", column, table=name)
+            for measure, measure_change in old_table.measures.diff(new_table.measures):
+                record(measure_change, "measure", measure, table=name)
+
+        for key, change in old.relationships.diff(new.relationships):
+            record(change, "relationship", key)
+        for name, change in old.queries.diff(new.queries):
+            record(change, "query", name)
+
+    return {"oldHash": old.hash, "newHash": new.hash, "changes": changes}
+
+
+def diff_models(old_model_info, new_model_info, include_objects=True, fanout=DEFAULT_FANOUT):
+    """Change set between two extract_all() outputs, see diff_trees()"""
+    return diff_trees(
+        ModelHashTree.from_model_info(old_model_info, fanout),
+        ModelHashTree.from_model_info(new_model_info, fanout),
+        include_objects,
+    )
+
+
+def main(argv=None):
+    """Print the changes between two pbi_model_info.json files"""
+    argv = sys.argv[1:] if argv is None else argv
+    as_json = "--json" in argv
+    paths = [arg for arg in argv if arg != "--json"]
+    if len(paths) != 2:
+        print("Usage: python model_diff.py <old.json> <new.json> [--json]")
+        return 2
+
+    result = diff_models(load_model_info(paths[0]), load_model_info(paths[1]))
+    if as_json:
+        print(json.dumps(result, indent=2))
+    elif not result["changes"]:
+        print("No changes")
+    else:
+        for change in result["changes"]:
+            where = f"{change['table']}: " if "table" in change and change["kind"] != "partitions" else ""
+            print(f"{change['change']:<9} {change['kind']:<13} {where}{change['name']}")
+    return 1 if result["changes"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Hash indexes over an extraction, for O(1) lookups instead of scanning the lists.
+
+PowerBIModelExtractor.build_index() indexes its TableRecord objects (see model_records.py);
+ModelIndex.from_model_info() indexes extract_all() output. Either way table(), column()
+and measure() return plain table_info / column_info / measure_info dicts, while the
+tables, columns and measures attributes map to the indexed objects themselves.
+"""
+
+from model_records import Record
+
+
+def _as_dict(info):
+    """The dict form of an indexed object (records are converted, dicts returned as they are)"""
+    return info.to_dict() if isinstance(info, Record) else info
+
+
+class ModelIndex:
+    """Dict indexes over extracted tables, columns, measures and queries for O(1) lookups"""
+
+    def __init__(self, tables=(), queries=()):
+        """
+        Args:
+            tables: table_info structures (as in model.tables) or TableRecord objects
+            queries: query_info structures (as in queries.powerQueries)
+        """
+        self.tables = {}  # table name -> table_info or TableRecord
+        self.columns = {}  # (table name, column name) -> column_info or ColumnRecord
+        self.measures = {}  # measure name -> measure_info or MeasureRecord
+        self.measure_tables = {}  # measure name -> name of the table holding it
+        self.queries = {}  # query name -> query_info
+
+        for table_info in tables:
+            self.add_table(table_info)
+        for query_info in queries:
+            self.add_query(query_info)
+
+    @classmethod
+    def from_model_info(cls, model_info):
+        """Build an index from extract_all() output (legacy layout)"""
+        return cls(model_info["model"]["tables"], model_info["queries"]["powerQueries"])
+
+    def add_table(self, table_info):
+        table_name = table_info["name"]
+        self.tables[table_name] = table_info
+        for column_info in table_info.get("columns", []):
+            self.columns[(table_name, column_info["name"])] = column_info
+        for measure_info in table_info.get("measures", []):
+            self.measures[measure_info["name"]] = measure_info
+            self.measure_tables[measure_info["name"]] = table_name
+
+    def add_query(self, query_info):
+        self.queries[query_info["name"]] = query_info
+
+    def table(self, name):
+        """Return the table_info dict for a table name, or None"""
+        return _as_dict(self.tables.get(name))
+
+    def column(self, table, column):
+        """Return the column_info dict for a table and column name, or None"""
+        return _as_dict(self.columns.get((table, column)))
+
+    def measure(self, name):
+        """Return the measure_info dict for a measure name, or None"""
+        return _as_dict(self.measures.get(name))
+
+    def query(self, name):
+        """Return the query_info for a query name, or None"""
+        return self.queries.get(name)
+
+    def table_columns(self, table):
+        """Column names of a table as a set"""
+        table_info = self.tables.get(table)
+        return {column_info["name"] for column_info in table_info.get("columns", [])} if table_info else set()
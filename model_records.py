@@ -0,0 +1,239 @@
+"""
+Compact record types for extracted tables, columns, measures and relationships.
+
+PowerBIModelExtractor keeps the extracted objects as these __slots__ records rather than
+dicts, and names and other short repeated values (data types, format strings, display
+folders) are interned, so many models can stay resident at a fraction of the memory.
+to_dict() gives back the exact table_info / column_info / measure_info /
+relationship_info structures of the output.
+
+Records are not dicts. record["name"], record.get("columns", []), "expression" in record
+and record["description"] = ... read and write the record's fields directly, without
+building a dict. Assigning a key that is not a field raises KeyError. Code that needs a
+real dict (isinstance checks, json.dumps, iterating items()) must call to_dict().
+Plain dicts put into a TableRecord's columns or measures are accepted and copied as they
+are by to_dict().
+"""
+
+import sys
+from abc import ABC, abstractmethod
+
+_intern = sys.intern
+
+
+def _as_dict(info):
+    """to_dict() of a record; plain dicts are copied"""
+    return info.to_dict() if isinstance(info, Record) else dict(info)
+
+
+class Record(ABC):
+    """Base class: dict-style access to the record's fields, which are its __slots__"""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def to_dict(self):
+        """The output structure of the record, as a new dict"""
+
+    def _has(self, key):
+        """Whether key is present in to_dict()"""
+        return key in self.__slots__
+
+    def __getitem__(self, key):
+        if self._has(key):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if self._has(key) else default
+
+    def __contains__(self, key):
+        return self._has(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ColumnRecord(Record):
+    """A data or calculated column (column_info)"""
+
+    __slots__ = ("name", "dataType", "description", "expression")
+
+    def __init__(self, name, dataType="", description="", expression=None):
+        """
+        Args:
+            expression: DAX expression of a calculated column; None for data columns
+        """
+        self.name = _intern(name)
+        self.dataType = _intern(dataType)
+        self.description = description
+        self.expression = expression
+
+    @classmethod
+    def from_dict(cls, column_info):
+        return cls(
+            column_info["name"],
+            column_info.get("dataType", ""),
+            column_info.get("description", ""),
+            column_info.get("expression") if column_info.get("type") == "calculated" else None,
+        )
+
+    def _has(self, key):
+        # Only calculated columns carry type and expression
+        if key == "expression" or key == "type":
+            return self.expression is not None
+        return key in self.__slots__
+
+    def __getitem__(self, key):
+        if key == "type" and self.expression is not None:
+            return "calculated"
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key == "type":
+            return "calculated" if self.expression is not None else default
+        return super().get(key, default)
+
+    def to_dict(self):
+        if self.expression is None:
+            return {"name": self.name, "dataType": self.dataType, "description": self.description}
+        return {
+            "name": self.name,
+            "type": "calculated",
+            "dataType": self.dataType,
+            "description": self.description,
+            "expression": self.expression,
+        }
+
+
+class MeasureRecord(Record):
+    """A measure (measure_info)"""
+
+    __slots__ = ("name", "description", "expression", "formatString", "displayFolder")
+
+    def __init__(self, name, description="", expression="", formatString="", displayFolder=""):
+        self.name = _intern(name)
+        self.description = description
+        self.expression = expression
+        self.formatString = _intern(formatString)
+        self.displayFolder = _intern(displayFolder)
+
+    @classmethod
+    def from_dict(cls, measure_info):
+        return cls(
+            measure_info["name"],
+            measure_info.get("description", ""),
+            measure_info.get("expression", ""),
+            measure_info.get("formatString", ""),
+            measure_info.get("displayFolder", ""),
+        )
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "description": self.description,
+            "expression": self.expression,
+            "formatString": self.formatString,
+            "displayFolder": self.displayFolder,
+        }
+
+
+class TableRecord(Record):
+    """A table with its columns, measures and M partitions (table_info)"""
+
+    __slots__ = ("name", "description", "measures", "columns", "partitions")
+
+    def __init__(self, name, description="", measures=(), columns=(), partitions=None):
+        """
+        Args:
+            measures: MeasureRecord objects (or measure_info dicts)
+            columns: ColumnRecord objects (or column_info dicts)
+            partitions: Partition dicts as in the output, or None when the table has none
+        """
+        self.name = _intern(name)
+        self.description = description
+        self.measures = list(measures)
+        self.columns = list(columns)
+        self.partitions = partitions
+
+    @classmethod
+    def from_dict(cls, table_info):
+        partitions = table_info.get("partitions")
+        return cls(
+            table_info["name"],
+            table_info.get("description", ""),
+            [MeasureRecord.from_dict(measure_info) for measure_info in table_info.get("measures", [])],
+            [ColumnRecord.from_dict(column_info) for column_info in table_info.get("columns", [])],
+            list(partitions) if partitions is not None else None,
+        )
+
+    def add_partition(self, partition):
+        """Append an output partition dict"""
+        if self.partitions is None:
+            self.partitions = []
+        self.partitions.append(partition)
+
+    def _has(self, key):
+        if key == "partitions":
+            return self.partitions is not None
+        return key in self.__slots__
+
+    def to_dict(self):
+        table_info = {
+            "name": self.name,
+            "description": self.description,
+            "measures": [_as_dict(measure) for measure in self.measures],
+            "columns": [_as_dict(column) for column in self.columns],
+        }
+        if self.partitions is not None:
+            table_info["partitions"] = list(self.partitions)
+        return table_info
+
+
+class RelationshipRecord(Record):
+    """A relationship between two columns (relationship_info)"""
+
+    __slots__ = ("fromTable", "fromColumn", "toTable", "toColumn", "crossFilteringBehavior", "isActive")
+
+    def __init__(
+        self, fromTable, fromColumn, toTable, toColumn, crossFilteringBehavior="oneDirection", isActive=True
+    ):
+        self.fromTable = _intern(fromTable)
+        self.fromColumn = _intern(fromColumn)
+        self.toTable = _intern(toTable)
+        self.toColumn = _intern(toColumn)
+        self.crossFilteringBehavior = _intern(crossFilteringBehavior)
+        self.isActive = isActive
+
+    @classmethod
+    def from_dict(cls, relationship_info):
+        return cls(
+            relationship_info["fromTable"],
+            relationship_info["fromColumn"],
+            relationship_info["toTable"],
+            relationship_info["toColumn"],
+            relationship_info.get("crossFilteringBehavior", "oneDirection"),
+            relationship_info.get("isActive", True),
+        )
+
+    def to_dict(self):
+        return {
+            "fromTable": self.fromTable,
+            "fromColumn": self.fromColumn,
+            "toTable": self.toTable,
+            "toColumn": self.toColumn,
+            "crossFilteringBehavior": self.crossFilteringBehavior,
+            "isActive": self.isActive,
+        }
@@ -0,0 +1,195 @@
+"""
+Keep pbi_model_info.json up to date while the model's TMDL and M files are edited.
+
+    python model_watcher.py MODEL_DIR [--output FILE] [--interval 0.25] [--debounce 0.5] [--max-delay 5]
+
+Model/ and Mashup/ are polled with stat snapshots (no file contents are read to detect
+changes). A burst of changes is debounced into one refresh, which reparses only the
+touched files through an ExtractionCache kept across refreshes and replaces the output
+atomically.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from extract_pbi_model_info import PowerBIModelExtractor
+from extraction_cache import CACHE_FILE_NAME, ExtractionCache
+
+OUTPUT_FILE_NAME = "pbi_model_info.json"
+
+WATCHED_FOLDERS = ("Model", "Mashup")
+
+
+def snapshot(model_path):
+    """Map each file under the watched folders to its (size, mtime_ns), using stat only"""
+    model_path = Path(model_path)
+    files = {}
+    stack = [model_path / folder for folder in WATCHED_FOLDERS]
+    while stack:
+        folder = stack.pop()
+        try:
+            entries = os.scandir(folder)
+        except OSError:
+            # Missing, or removed while scanning
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+    return files
+
+
+def changed_files(old, new):
+    """Paths added, removed or modified between two snapshots"""
+    changed = {path for path, fingerprint in new.items() if old.get(path) != fingerprint}
+    changed.update(path for path in old if path not in new)
+    return changed
+
+
+class ModelWatcher:
+    """Polls a model folder and rewrites its pbi_model_info.json after changes settle"""
+
+    def __init__(
+        self,
+        model_path,
+        output_file=None,
+        interval=0.25,
+        debounce=0.5,
+        max_delay=5.0,
+        compact=False,
+        persist_cache=False,
+        on_refresh=None,
+    ):
+        """
+        Args:
+            model_path: Extracted model folder (containing Model/ and Mashup/)
+            output_file: JSON file to keep current (default: model_path/pbi_model_info.json)
+            interval: Seconds between stat snapshots
+            debounce: Refresh once no further change was seen for this many seconds
+            max_delay: Refresh at the latest this many seconds after the first pending
+                       change, even while changes keep arriving
+            compact: Write the compact layout
+            persist_cache: Also keep the parse cache in the sidecar file, so a restarted
+                           watcher starts warm; otherwise it lives in memory only
+            on_refresh: Optional callback(result) after each refresh attempt, where result
+                        is a dict with status, changedFiles, durationSeconds, cacheHits,
+                        cacheMisses and (on failure) error
+        """
+        self.model_path = Path(model_path)
+        self.output_file = Path(output_file) if output_file else self.model_path / OUTPUT_FILE_NAME
+        self.interval = interval
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.compact = compact
+        self.on_refresh = on_refresh
+
+        # One cache for the watcher's lifetime: unchanged files are matched on size and
+        # mtime and never re-read, so a refresh only parses what was touched
+        self.cache = ExtractionCache(self.model_path / CACHE_FILE_NAME if persist_cache else None, self.model_path)
+        self.refreshes = 0
+        self._stop = threading.Event()
+
+    def refresh(self, changed=()):
+        """Re-extract the model and replace the output file; returns the result dict"""
+        start = time.perf_counter()
+        result = {"status": "ok", "changedFiles": sorted(changed)}
+        try:
+            extractor = PowerBIModelExtractor(self.model_path, cache=self.cache)
+            extractor.save(self.output_file, compact=self.compact)
+        except Exception as e:
+            # Usually a file caught mid-edit; the previous output stays in place
+            result["status"] = "error"
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["durationSeconds"] = round(time.perf_counter() - start, 3)
+        result["cacheHits"] = self.cache.hits
+        result["cacheMisses"] = self.cache.misses
+        self.refreshes += 1
+
+        if self.on_refresh:
+            self.on_refresh(result)
+        return result
+
+    def stop(self):
+        """Make run() return after the current poll"""
+        self._stop.set()
+
+    def run(self, initial_refresh=True):
+        """Poll until stop() is called"""
+        self._stop.clear()
+        current = snapshot(self.model_path)
+        if initial_refresh:
+            self.refresh()
+
+        pending = set()
+        first_change = last_change = None
+        while not self._stop.wait(self.interval):
+            latest = snapshot(self.model_path)
+            changed = changed_files(current, latest)
+            current = latest
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                last_change = now
+                if first_change is None:
+                    first_change = now
+
+            if pending and (now - last_change >= self.debounce or now - first_change >= self.max_delay):
+                self.refresh(pending)
+                pending = set()
+                first_change = last_change = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep pbi_model_info.json up to date as model files change.")
+    parser.add_argument("model_dir", help="Extracted model folder (containing Model/)")
+    parser.add_argument("--output", help=f"Output file (default: MODEL_DIR/{OUTPUT_FILE_NAME})")
+    parser.add_argument("--interval", type=float, default=0.25, help="Seconds between polls")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Quiet period before refreshing")
+    parser.add_argument("--max-delay", type=float, default=5.0, help="Longest wait for a refresh during a burst")
+    parser.add_argument("--compact", action="store_true", help="Write the compact layout")
+    parser.add_argument("--persist-cache", action="store_true", help=f"Keep the parse cache in {CACHE_FILE_NAME}")
+    args = parser.parse_args(argv)
+
+    if not (Path(args.model_dir) / "Model").is_dir():
+        print(f"No Model folder in {args.model_dir}", file=sys.stderr)
+        return 2
+
+    def report(result):
+        if result["status"] == "ok":
+            print(
+                f"Refreshed in {result['durationSeconds']:.2f}s ({len(result['changedFiles'])} changed files, "
+                f"{result['cacheMisses']} reparsed)"
+            )
+        else:
+            print(f"Refresh failed: {result['error']}", file=sys.stderr)
+
+    watcher = ModelWatcher(
+        args.model_dir,
+        output_file=args.output,
+        interval=args.interval,
+        debounce=args.debounce,
+        max_delay=args.max_delay,
+        compact=args.compact,
+        persist_cache=args.persist_cache,
+        on_refresh=report,
+    )
+    print(f"Watching {watcher.model_path} (Ctrl+C to stop)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""
+Pipelined extraction of many PBIX files: pbi-tools and the metadata parse overlap.
+
+Extractor threads run the extraction command (pbi-tools by default) for several PBIX files
+at once and hand each finished folder to the parsers through a bounded queue, so the parse
+of one file runs while the next ones are being extracted. When the parsers fall behind,
+the queue fills up and the extractors wait instead of filling the disk with folders.
+
+    python pbix_pipeline.py "reports/*.pbix" --extractors 2 --parsers 4 --summary summary.json
+
+The command is a template whose "{pbix}" and "{folder}" arguments are replaced by the
+PBIX file and its extraction folder, so a stand-in script can take the place of
+pbi-tools.exe (see tests/fake_pbi_tools.py).
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from batch_extract import OUTPUT_FILE_NAME, extract_model_folder
+from extraction_filter import add_filter_arguments, filters_from_args
+
+# Lines of command output kept in the error of a failed extraction
+OUTPUT_TAIL_LINES = 20
+
+
+def default_command():
+    """pbi-tools extract command template, with pbi-tools.exe from bin/ next to this file"""
+    base_path = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return [os.path.join(base_path, "bin", "pbi-tools.exe"), "extract", "{pbix}", "-extractFolder", "{folder}"]
+
+
+def find_pbix_files(patterns):
+    """Expand PBIX/PBIT paths and glob patterns into files, in order and without duplicates"""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            path = Path(match).resolve()
+            if path not in seen and path.is_file() and path.suffix.lower() in (".pbix", ".pbit"):
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+class StageStats:
+    """Thread-safe counters of one pipeline stage"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.items = 0
+        self.failed = 0
+        # Time spent working on items, summed over workers
+        self.busy_seconds = 0.0
+        # Time spent waiting on the queue: for extractors, blocked on a full queue
+        # (backpressure); for parsers, idle on an empty one
+        self.wait_seconds = 0.0
+        self.first_start = None
+        self.last_end = None
+        self._lock = threading.Lock()
+
+    def record(self, start, end, failed=False):
+        with self._lock:
+            self.items += 1
+            self.failed += failed
+            self.busy_seconds += end - start
+            self.first_start = start if self.first_start is None else min(self.first_start, start)
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    def waited(self, seconds):
+        with self._lock:
+            self.wait_seconds += seconds
+
+    def to_dict(self):
+        active = (self.last_end - self.first_start) if self.items else 0.0
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "failed": self.failed,
+            "busySeconds": round(self.busy_seconds, 3),
+            "waitSeconds": round(self.wait_seconds, 3),
+            "activeSeconds": round(active, 3),
+            "itemsPerSecond": round(self.items / active, 3) if active else None,
+            "utilization": round(self.busy_seconds / (active * self.workers), 3) if active else None,
+        }
+
+
+class PbixPipeline:
+    """
+    Extract and parse many PBIX files with a bounded queue between the two stages.
+
+    run() returns a summary like batch_extract.py's, with one record per PBIX in input
+    order and per-stage metrics under "stages". The "stage" of a record is the one it
+    reached: "extract", then "parse" once its folder was handed to the parsers.
+    """
+
+    def __init__(
+        self,
+        pbix_files,
+        command=None,
+        output_root=None,
+        extractors=2,
+        parsers=None,
+        queue_size=None,
+        output_name=OUTPUT_FILE_NAME,
+        compact=False,
+        cache=False,
+        filters=None,
+        timeout=None,
+    ):
+        """
+        Args:
+            pbix_files: PBIX/PBIT files to process
+            command: Extraction command template as a list (or a string, split with shlex);
+                     "{pbix}" and "{folder}" are replaced in each argument. Defaults to
+                     pbi-tools extract
+            output_root: Folder receiving one extraction folder per PBIX; by default each
+                         PBIX is extracted next to itself, into a folder named after it
+            extractors: Number of extraction commands running at once
+            parsers: Number of parse workers (processes when more than one); defaults to
+                     the CPU count
+            queue_size: Extracted folders that may wait for a parser; defaults to parsers
+            output_name, compact, cache, filters: As for batch_extract.extract_model_folder
+            timeout: Seconds after which an extraction command is killed; None waits
+        """
+        if isinstance(command, str):
+            command = shlex.split(command, posix=os.name != "nt")
+        self.pbix_files = [Path(path) for path in pbix_files]
+        self.command = list(command) if command else default_command()
+        self.output_root = Path(output_root) if output_root else None
+        self.extractors = max(1, extractors)
+        self.parsers = max(1, parsers or os.cpu_count() or 1)
+        self.queue_size = max(1, queue_size or self.parsers)
+        self.output_name = output_name
+        self.compact = compact
+        self.cache = cache
+        self.filters = filters
+        self.timeout = timeout
+
+    def extraction_folder(self, pbix):
+        """Folder a PBIX is extracted into"""
+        pbix = Path(pbix)
+        if self.output_root is not None:
+            return self.output_root / pbix.stem
+        return pbix.with_suffix("")
+
+    def command_for(self, pbix, folder):
+        """The extraction command line of one PBIX"""
+        return [arg.replace("{pbix}", str(pbix)).replace("{folder}", str(folder)) for arg in self.command]
+
+    def _extract(self, pbix):
+        """Run the extraction command for one PBIX; returns (folder, error)"""
+        folder = self.extraction_folder(pbix)
+        try:
+            result = subprocess.run(
+                self.command_for(pbix, folder),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                errors="replace",
+                timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return folder, f"Extraction timed out after {self.timeout}s"
+        except OSError as e:
+            return folder, f"Extraction command failed to start: {e}"
+
+        if result.returncode != 0:
+            tail = "\n".join(result.stdout.splitlines()[-OUTPUT_TAIL_LINES:])
+            return folder, f"Extraction command exited with {result.returncode}:\n{tail}"
+        if not (folder / "Model").is_dir():
+            return folder, f"Could not find Model folder in {folder}"
+        return folder, None
+
+    def run(self):
+        """Process every PBIX and return the summary"""
+        records = [{"pbix": str(pbix), "status": "pending", "stage": "extract"} for pbix in self.pbix_files]
+        pending = queue.SimpleQueue()
+        for index in range(len(self.pbix_files)):
+            pending.put(index)
+        extracted = queue.Queue(self.queue_size)
+        extract_stats = StageStats(self.extractors)
+        parse_stats = StageStats(self.parsers)
+        max_depth = 0
+        depth_lock = threading.Lock()
+
+        def extract_worker():
+            nonlocal max_depth
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except queue.Empty:
+                    return
+                record = records[index]
+                start = time.perf_counter()
+                try:
+                    folder, error = self._extract(self.pbix_files[index])
+                except Exception as e:
+                    # A bug rather than a failed extraction; the record still gets an error and
+                    # this thread goes on with the next PBIX
+                    folder, error = None, f"{type(e).__name__}: {e}"
+                end = time.perf_counter()
+                extract_stats.record(start, end, failed=error is not None)
+                if folder is not None:
+                    record["model"] = str(folder)
+                record["extractSeconds"] = round(end - start, 3)
+                if error is not None:
+                    record["status"] = "error"
+                    record["error"] = error
+                    continue
+
+                record["stage"] = "parse"
+                # Blocks while the queue is full, so extraction never runs far ahead of parsing
+                extracted.put(index)
+                extract_stats.waited(time.perf_counter() - end)
+                with depth_lock:
+                    max_depth = max(max_depth, extracted.qsize())
+
+        def parse_worker(pool):
+            while True:
+                wait_start = time.perf_counter()
+                index = extracted.get()
+                start = time.perf_counter()
+                parse_stats.waited(start - wait_start)
+                if index is None:
+                    return
+                record = records[index]
+                args = (record["model"], self.output_name, self.compact, self.cache, self.filters)
+                try:
+                    if pool is not None:
+                        summary = pool.submit(extract_model_folder, *args).result()
+                    else:
+                        summary = extract_model_folder(*args)
+                except Exception as e:
+                    # A dead worker process; keep draining the queue so the extractors never block forever
+                    summary = {"status": "error", "output": None, "durationSeconds": 0.0}
+                    summary["error"] = f"{type(e).__name__}: {e}"
+                end = time.perf_counter()
+                parse_stats.record(start, end, failed=summary["status"] != "ok")
+
+                record["status"] = summary["status"]
+                record["output"] = summary["output"]
+                record["parseSeconds"] = summary["durationSeconds"]
+                for key in ("inputBytes", "outputBytes"):
+                    if key in summary:
+                        record[key] = summary[key]
+                if "error" in summary:
+                    record["error"] = summary["error"]
+
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            pool = None
+            if self.parsers > 1:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Forking while the extractor threads run can deadlock the child; spawn is
+                # also what Windows uses
+                context = multiprocessing.get_context("spawn")
+                pool = stack.enter_context(ProcessPoolExecutor(self.parsers, mp_context=context))
+
+            extract_threads = [
+                threading.Thread(target=extract_worker, name=f"pbix-extract-{i}", daemon=True)
+                for i in range(self.extractors)
+            ]
+            parse_threads = [
+                threading.Thread(target=parse_worker, args=(pool,), name=f"pbix-parse-{i}", daemon=True)
+                for i in range(self.parsers)
+            ]
+            for thread in extract_threads + parse_threads:
+                thread.start()
+            for thread in extract_threads:
+                thread.join()
+            # One end marker per parser, queued behind the last extracted folder
+            for _ in parse_threads:
+                extracted.put(None)
+            for thread in parse_threads:
+                thread.join()
+        duration = time.perf_counter() - start
+
+        failed = [record for record in records if record["status"] != "ok"]
+        return {
+            "models": records,
+            "succeeded": len(records) - len(failed),
+            "failed": len(failed),
+            "durationSeconds": round(duration, 3),
+            "stages": {
+                "extract": extract_stats.to_dict(),
+                "parse": parse_stats.to_dict(),
+                "queue": {"size": self.queue_size, "maxDepth": max_depth},
+                # Time a strictly serial run would have taken with the same per-file durations
+                "serialSeconds": round(extract_stats.busy_seconds + parse_stats.busy_seconds, 3),
+            },
+        }
+
+
+def main(argv=None):
+    """
+    Pipelined extraction of many PBIX files.
+
+    Exit codes: 0 when every file was processed, 1 when any failed, 2 when no PBIX files matched.
+    """
+    parser = argparse.ArgumentParser(
+        description="Extract pbi_model_info.json for many PBIX files, overlapping pbi-tools with parsing."
+    )
+    parser.add_argument("paths", nargs="+", help="PBIX/PBIT files or glob patterns (e.g. 'reports/*.pbix')")
+    parser.add_argument("-e", "--extractors", type=int, default=2, help="Extraction commands running at once")
+    parser.add_argument("-p", "--parsers", type=int, default=os.cpu_count() or 1, help="Number of parse workers")
+    parser.add_argument("--queue-size", type=int, help="Extracted folders waiting for a parser (default: parsers)")
+    parser.add_argument(
+        "--command", help='Extraction command template with {pbix} and {folder} (default: pbi-tools extract)'
+    )
+    parser.add_argument("--output-root", help="Extract into this folder instead of next to each PBIX")
+    parser.add_argument("--timeout", type=float, help="Kill an extraction command after this many seconds")
+    parser.add_argument("--output-name", default=OUTPUT_FILE_NAME, help="Output file name inside each model folder")
+    parser.add_argument("--compact", action="store_true", help="Write the compact layout")
+    parser.add_argument("--cache", action="store_true", help="Use the incremental extraction cache")
+    parser.add_argument("--summary", help="Write the JSON summary to this file instead of stdout")
+    add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+
+    filters = filters_from_args(parser, args)
+
+    pbix_files = find_pbix_files(args.paths)
+    if not pbix_files:
+        print("No PBIX/PBIT files found", file=sys.stderr)
+        return 2
+
+    pipeline = PbixPipeline(
+        pbix_files,
+        command=args.command,
+        output_root=args.output_root,
+        extractors=args.extractors,
+        parsers=args.parsers,
+        queue_size=args.queue_size,
+        output_name=args.output_name,
+        compact=args.compact,
+        cache=args.cache,
+        filters=filters,
+        timeout=args.timeout,
+    )
+    summary = pipeline.run()
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+    for record in summary["models"]:
+        if record["status"] != "ok":
+            print(f"Failed ({record['stage']}): {record['pbix']}: {record['error']}", file=sys.stderr)
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
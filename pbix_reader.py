@@ -0,0 +1,245 @@
+import io
+import json
+import struct
+import sys
+import zipfile
+from pathlib import Path
+
+from extract_pbi_model_info import (
+    PowerBIModelExtractor,
+    format_column_expression,
+    format_measure_expression,
+    parse_section_file,
+)
+
+
+class MemoryViewFile(io.RawIOBase):
+    """Read-only, seekable file object over a memoryview, so slices are read without copying"""
+
+    def __init__(self, view):
+        super().__init__()
+        self._view = memoryview(view)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._view[self._position : self._position + len(buffer)]
+        size = len(data)
+        buffer[:size] = data
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = len(self._view) + offset
+        return self._position
+
+    def tell(self):
+        return self._position
+
+
+def _text(value):
+    """TMSL stores long strings either as a string or as a list of lines"""
+    if isinstance(value, list):
+        return "\n".join(value)
+    return value or ""
+
+
+def tmsl_table_info(table):
+    """Build the table_info structure from a TMSL table object"""
+    table_info = {
+        "name": table["name"],
+        "description": _text(table.get("description")),
+        "measures": [],
+        "columns": [],
+    }
+
+    for column in table.get("columns", []):
+        column_type = column.get("type", "data")
+        if column_type == "rowNumber":
+            continue
+        if column_type == "calculated":
+            column_info = {
+                "name": column["name"],
+                "type": "calculated",
+                "dataType": column.get("dataType", "calculated"),
+                "description": _text(column.get("description")),
+                "expression": format_column_expression(_text(column.get("expression"))),
+            }
+        else:
+            column_info = {
+                "name": column["name"],
+                "dataType": column.get("dataType", ""),
+                "description": _text(column.get("description")),
+            }
+        table_info["columns"].append(column_info)
+
+    for measure in table.get("measures", []):
+        table_info["measures"].append(
+            {
+                "name": measure["name"],
+                "description": _text(measure.get("description")),
+                "expression": format_measure_expression(_text(measure.get("expression"))),
+                "formatString": measure.get("formatString", ""),
+                "displayFolder": measure.get("displayFolder", ""),
+            }
+        )
+
+    return table_info
+
+
+def tmsl_relationship_info(relationship):
+    """Build the relationship_info structure from a TMSL relationship object"""
+    return {
+        "fromTable": relationship["fromTable"],
+        "fromColumn": relationship["fromColumn"],
+        "toTable": relationship["toTable"],
+        "toColumn": relationship["toColumn"],
+        "crossFilteringBehavior": relationship.get("crossFilteringBehavior", "oneDirection"),
+        "isActive": relationship.get("isActive", True),
+    }
+
+
+def tmsl_queries(expressions, tables):
+    """
+    Build query_info structures from TMSL shared expressions and M partition sources.
+
+    Used when there is no Section1.m to read the queries from.
+    """
+    queries = [tmsl_expression_query(expression) for expression in expressions]
+    for table in tables:
+        queries.extend(tmsl_partition_queries(table["name"], table.get("partitions", [])))
+    return queries
+
+
+def tmsl_expression_query(expression):
+    """Build the query_info structure from a TMSL shared expression"""
+    return {"name": expression["name"], "expression": _text(expression.get("expression"))}
+
+
+def tmsl_partition_queries(table_name, partitions):
+    """Build query_info structures, named after their table, from the M sources of TMSL partitions"""
+    return [
+        {"name": table_name, "expression": _text(partition["source"].get("expression"))}
+        for partition in partitions
+        if partition.get("source", {}).get("type") == "m"
+    ]
+
+
+def read_data_mashup_section(data):
+    """
+    Return the text of Formulas/Section1.m from the bytes of a PBIX DataMashup stream, or None.
+
+    DataMashup starts with a 4-byte version and a 4-byte little-endian length followed by
+    the package parts, an OPC zip that holds the M formulas.
+    """
+    view = memoryview(data)
+    if len(view) < 8:
+        return None
+    (package_length,) = struct.unpack_from("<i", view, 4)
+    package = view[8 : 8 + package_length]
+
+    with zipfile.ZipFile(MemoryViewFile(package)) as package_zip:
+        try:
+            content = package_zip.read("Formulas/Section1.m")
+        except KeyError:
+            return None
+    return content.decode("utf-8-sig").replace("\r\n", "\n")
+
+
+def decode_data_model_schema(data):
+    """Decode the UTF-16 DataModelSchema JSON stored in a PBIX/PBIT"""
+    encoding = "utf-16" if data[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-16-le"
+    return json.loads(data.decode(encoding).lstrip("\ufeff"))
+
+
+class PbixModelExtractor(PowerBIModelExtractor):
+    """
+    Extract model information straight from a .pbix/.pbit archive, without pbi-tools.
+
+    Reads DataModelSchema (TMSL) and the DataMashup package from memory, so no files are
+    written and it runs on any platform. PBIX files whose model is only stored in the
+    compressed DataModel stream carry no DataModelSchema; for those only the M queries
+    can be read.
+    """
+
+    def __init__(self, pbix_path, **kwargs):
+        """
+        Args:
+            pbix_path: .pbix or .pbit file
+            **kwargs: As for PowerBIModelExtractor (filters, max_literal_bytes, stats_callback,
+                      ...); there is no file cache, as nothing is read from disk but the archive
+        """
+        if kwargs.get("cache"):
+            raise ValueError("PbixModelExtractor reads the archive in memory and does not use a cache")
+        self.pbix_path = Path(pbix_path)
+        super().__init__(self.pbix_path.with_suffix(""), **kwargs)
+        self._schema = None
+        self._section = None
+
+    def _load(self):
+        if self._schema is not None:
+            return
+        with zipfile.ZipFile(self.pbix_path) as archive:
+            names = set(archive.namelist())
+            self._schema = {}
+            if "DataModelSchema" in names:
+                self._schema = decode_data_model_schema(archive.read("DataModelSchema"))
+            if "DataMashup" in names:
+                self._section = read_data_mashup_section(archive.read("DataMashup"))
+
+    def _model(self):
+        self._load()
+        return self._schema.get("model", {})
+
+    def iter_tables(self):
+        if not self.object_filter.wants_tables():
+            return
+        print("Extracting tables and columns...")
+        yield from self._filter_tables(self._model().get("tables", []), tmsl_table_info)
+
+    def iter_relationships(self):
+        if not self.object_filter.wants("relationships"):
+            return
+        print("Extracting relationships...")
+        yield from self._filter_relationships(map(tmsl_relationship_info, self._model().get("relationships", [])))
+
+    def iter_queries(self):
+        if not self.object_filter.wants("queries"):
+            return
+        print("Extracting M/Power Query code...")
+        model = self._model()
+        section_queries = (
+            parse_section_file(self._section, self.max_literal_bytes, self.literal_mode) if self._section else []
+        )
+        if section_queries:
+            yield from section_queries
+        else:
+            yield from tmsl_queries(model.get("expressions", []), model.get("tables", []))
+
+
+def main(argv=None):
+    """Extract pbi_model_info.json directly from a PBIX file"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not 1 <= len(argv) <= 2:
+        print("Usage: python pbix_reader.py <file.pbix> [output.json]")
+        return 2
+
+    pbix_path = Path(argv[0])
+    output_file = Path(argv[1]) if len(argv) == 2 else pbix_path.with_name("pbi_model_info.json")
+    PbixModelExtractor(pbix_path).save(output_file)
+    print(f"Model information saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
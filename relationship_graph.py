@@ -0,0 +1,367 @@
+"""
+Filter propagation over a model's relationships.
+
+A filter on the one side of a relationship (toTable) reaches its many side (fromTable);
+bothDirections relationships also propagate the other way. Only active relationships
+propagate unless inactive ones are asked for (as USERELATIONSHIP does in DAX).
+
+    python relationship_graph.py pbi_model_info.json [--from TABLE --to TABLE] [--json]
+"""
+
+import json
+import sys
+from collections import deque
+
+from compact_layout import expand_model_info, load_model_info
+
+BOTH_DIRECTIONS = "bothDirections"
+
+
+class RelationshipGraph:
+    """Adjacency over relationship_info structures for filter path, ambiguity, cycle and orphan queries"""
+
+    def __init__(self, relationships, tables=None):
+        """
+        Args:
+            relationships: relationship_info structures (as in model.relationships)
+            tables: Optional mapping of table name -> column names, used to find
+                    relationships that point to missing tables or columns
+        """
+        self.relationships = list(relationships)
+        self.tables = {name: set(columns) for name, columns in tables.items()} if tables is not None else None
+
+        # table -> [(filtered table, relationship index)], in relationship order
+        self.active = {}
+        self.all = {}
+        for index, relationship in enumerate(self.relationships):
+            edges = [(relationship["toTable"], relationship["fromTable"])]
+            if relationship.get("crossFilteringBehavior") == BOTH_DIRECTIONS:
+                edges.append((relationship["fromTable"], relationship["toTable"]))
+            for source, target in edges:
+                self.all.setdefault(source, []).append((target, index))
+                if relationship.get("isActive", True):
+                    self.active.setdefault(source, []).append((target, index))
+
+    @classmethod
+    def from_model_info(cls, model_info):
+        """Build a graph from extract_all() output (legacy or compact layout)"""
+        if model_info.get("metadata", {}).get("layout"):
+            model_info = expand_model_info(model_info)
+        model = model_info["model"]
+        tables = {
+            table["name"]: [column["name"] for column in table.get("columns", [])] for table in model.get("tables", [])
+        }
+        return cls(model.get("relationships", []), tables)
+
+    def table_names(self):
+        """Every table that is known or used by a relationship, sorted"""
+        names = set(self.tables or ())
+        for relationship in self.relationships:
+            names.add(relationship["fromTable"])
+            names.add(relationship["toTable"])
+        return sorted(names)
+
+    def _adjacency(self, include_inactive):
+        return self.all if include_inactive else self.active
+
+    def _search(self, source, include_inactive=False):
+        """BFS from source: table -> (previous table, relationship index), in discovery order"""
+        adjacency = self._adjacency(include_inactive)
+        parents = {source: (None, None)}
+        queue = deque([source])
+        while queue:
+            table = queue.popleft()
+            for target, index in adjacency.get(table, ()):
+                if target not in parents:
+                    parents[target] = (table, index)
+                    queue.append(target)
+        return parents
+
+    def _path(self, parents, target):
+        """Relationship indexes from the search source to target"""
+        indexes = []
+        while parents[target][0] is not None:
+            target, index = parents[target]
+            indexes.append(index)
+        indexes.reverse()
+        return indexes
+
+    def filtered_tables(self, source, include_inactive=False):
+        """Tables a filter on source reaches, nearest first (source excluded)"""
+        return list(self._search(source, include_inactive))[1:]
+
+    def filter_path(self, source, target, include_inactive=False):
+        """
+        Shortest chain of relationships a filter on source follows to reach target.
+
+        Returns a list of relationship_info structures ([] when source is target), or None
+        when the filter does not reach target.
+        """
+        parents = self._search(source, include_inactive)
+        if target not in parents:
+            return None
+        return [self.relationships[index] for index in self._path(parents, target)]
+
+    def ambiguities(self, include_inactive=False):
+        """
+        Pairs of tables with more than one filter path between them.
+
+        Returns dicts with "source" (the table where the paths split), "target" (the table
+        where they first meet) and "paths" (two alternative table sequences from source to
+        target). Tables upstream of source and downstream of target are not reported again.
+
+        Two paths that split and meet again form a loop, and a loop lies within one
+        biconnected component of the relationships, so only components that contain a
+        loop are searched, each on its own. Models whose loops are small take close to
+        linear time, instead of a search from every table over the whole model.
+        """
+        adjacency = self._adjacency(include_inactive)
+        found = []
+        reported = set()
+        for block in self._cyclic_blocks(adjacency):
+            block_adjacency = {}
+            for index in block:
+                for table in (self.relationships[index]["fromTable"], self.relationships[index]["toTable"]):
+                    if table not in block_adjacency:
+                        block_adjacency[table] = [edge for edge in adjacency.get(table, ()) if edge[1] in block]
+            for source in sorted(block_adjacency):
+                for paths in self._meeting_paths(block_adjacency, source):
+                    key = (paths[0][0], paths[0][-1])
+                    if key not in reported:
+                        reported.add(key)
+                        found.append({"source": key[0], "target": key[1], "paths": paths})
+        return found
+
+    def _meeting_paths(self, adjacency, source):
+        """BFS from source yielding each pair of paths that meet at a table, trimmed to where they split"""
+        parents = {source: (None, None)}
+        queue = deque([source])
+        reported = set()
+        while queue:
+            table = queue.popleft()
+            for target, index in adjacency.get(table, ()):
+                if target not in parents:
+                    parents[target] = (table, index)
+                    queue.append(target)
+                    continue
+                # Going back over the relationship table was reached through is not
+                # another path, and neither is a loop back onto an ancestor
+                if target in reported or index == parents[table][1] or self._is_ancestor(parents, target, table):
+                    continue
+                reported.add(target)
+                first = self._tables_on(parents, target)
+                second = self._tables_on(parents, table) + [target]
+                # Parallel relationships give the same tables twice; the split is then before target
+                split = 0
+                while split + 2 < min(len(first), len(second)) and first[split + 1] == second[split + 1]:
+                    split += 1
+                yield [first[split:], second[split:]]
+
+    def _cyclic_blocks(self, adjacency):
+        """
+        Relationship indexes of each biconnected component with a loop, ignoring filter direction.
+
+        Iterative Tarjan over the relationships in adjacency; a component with a single
+        relationship has no loop and is left out.
+        """
+        neighbors = {}
+        for index in sorted({index for edges in adjacency.values() for _, index in edges}):
+            from_table, to_table = self.relationships[index]["fromTable"], self.relationships[index]["toTable"]
+            neighbors.setdefault(from_table, []).append((to_table, index))
+            neighbors.setdefault(to_table, []).append((from_table, index))
+
+        discovery = {}
+        low = {}
+        edge_stack = []
+        blocks = []
+        for root in sorted(neighbors):
+            if root in discovery:
+                continue
+            discovery[root] = low[root] = len(discovery)
+            work = [(root, None, iter(neighbors[root]))]
+            while work:
+                table, via, edges = work[-1]
+                for other, index in edges:
+                    if index == via:
+                        continue
+                    if other not in discovery:
+                        discovery[other] = low[other] = len(discovery)
+                        edge_stack.append(index)
+                        work.append((other, index, iter(neighbors[other])))
+                        break
+                    if discovery[other] < discovery[table]:
+                        low[table] = min(low[table], discovery[other])
+                        edge_stack.append(index)
+                else:
+                    work.pop()
+                    if not work:
+                        continue
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[table])
+                    if low[table] >= discovery[parent]:
+                        block = set()
+                        while True:
+                            index = edge_stack.pop()
+                            block.add(index)
+                            if index == via:
+                                break
+                        if len(block) > 1:
+                            blocks.append(block)
+        return blocks
+
+    @staticmethod
+    def _is_ancestor(parents, ancestor, table):
+        while table is not None:
+            if table == ancestor:
+                return True
+            table = parents[table][0]
+        return False
+
+    @staticmethod
+    def _tables_on(parents, table):
+        tables = [table]
+        while parents[table][0] is not None:
+            table = parents[table][0]
+            tables.append(table)
+        tables.reverse()
+        return tables
+
+    def cycles(self, include_inactive=False):
+        """
+        Relationships that close a loop between tables, ignoring filter direction.
+
+        Returns dicts with "relationship" (the closing relationship_info) and "tables"
+        (the loop, starting and ending at its fromTable).
+        """
+        # Union-find over tables; a relationship joining two already connected tables
+        # closes a cycle, which is then traced through the spanning forest
+        parent = {}
+
+        def find(table):
+            parent.setdefault(table, table)
+            root = table
+            while parent[root] != root:
+                root = parent[root]
+            while parent[table] != root:
+                parent[table], table = root, parent[table]
+            return root
+
+        forest = {}
+        found = []
+        for relationship in self.relationships:
+            if not include_inactive and not relationship.get("isActive", True):
+                continue
+            from_table, to_table = relationship["fromTable"], relationship["toTable"]
+            from_root, to_root = find(from_table), find(to_table)
+            if from_root == to_root:
+                found.append({"relationship": relationship, "tables": self._forest_path(forest, to_table, from_table)})
+                continue
+            parent[from_root] = to_root
+            forest.setdefault(from_table, []).append(to_table)
+            forest.setdefault(to_table, []).append(from_table)
+        return found
+
+    @staticmethod
+    def _forest_path(forest, source, target):
+        """Tables from target back to itself through the forest path to source"""
+        previous = {source: None}
+        queue = deque([source])
+        while queue and target not in previous:
+            table = queue.popleft()
+            for neighbor in forest.get(table, ()):
+                if neighbor not in previous:
+                    previous[neighbor] = table
+                    queue.append(neighbor)
+        tables = [target]
+        while previous.get(tables[-1]) is not None:
+            tables.append(previous[tables[-1]])
+        return tables + [target]
+
+    def orphans(self):
+        """
+        Relationships that point to tables or columns missing from the model.
+
+        Returns dicts with "relationship" and "missing" (names of the relationship_info
+        keys whose table or column does not exist); [] when no tables were given.
+        """
+        if self.tables is None:
+            return []
+        found = []
+        for relationship in self.relationships:
+            missing = []
+            for table_key, column_key in (("fromTable", "fromColumn"), ("toTable", "toColumn")):
+                columns = self.tables.get(relationship[table_key])
+                if columns is None:
+                    missing.append(table_key)
+                elif relationship[column_key] not in columns:
+                    missing.append(column_key)
+            if missing:
+                found.append({"relationship": relationship, "missing": missing})
+        return found
+
+    def analyze(self):
+        """Ambiguities, cycles and orphans in one report"""
+        return {
+            "relationships": len(self.relationships),
+            "activeRelationships": sum(bool(r.get("isActive", True)) for r in self.relationships),
+            "ambiguities": self.ambiguities(),
+            "cycles": self.cycles(),
+            "orphans": self.orphans(),
+        }
+
+
+def _describe(relationship):
+    arrow = "<->" if relationship.get("crossFilteringBehavior") == BOTH_DIRECTIONS else "<-"
+    inactive = " (inactive)" if not relationship.get("isActive", True) else ""
+    return (
+        f"'{relationship['fromTable']}'[{relationship['fromColumn']}] {arrow} "
+        f"'{relationship['toTable']}'[{relationship['toColumn']}]{inactive}"
+    )
+
+
+def main(argv=None):
+    """Print a relationship report, or the filter path between two tables"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyze filter propagation between a model's tables.")
+    parser.add_argument("model_info", help="pbi_model_info.json (legacy or compact layout)")
+    parser.add_argument("--from", dest="source", help="Table the filter is on")
+    parser.add_argument("--to", dest="target", help="Table the filter should reach")
+    parser.add_argument("--include-inactive", action="store_true", help="Also follow inactive relationships")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+
+    graph = RelationshipGraph.from_model_info(load_model_info(args.model_info))
+
+    if args.source or args.target:
+        if not (args.source and args.target):
+            parser.error("--from and --to go together")
+        path = graph.filter_path(args.source, args.target, args.include_inactive)
+        if args.json:
+            print(json.dumps(path, indent=2))
+        elif path is None:
+            print(f"A filter on {args.source} does not reach {args.target}")
+        else:
+            for relationship in path:
+                print(_describe(relationship))
+        return 0 if path is not None else 1
+
+    report = graph.analyze()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['relationships']} relationships, {report['activeRelationships']} active")
+    for ambiguity in report["ambiguities"]:
+        print(f"Ambiguous: {ambiguity['source']} -> {ambiguity['target']} via")
+        for path in ambiguity["paths"]:
+            print(f"  {' -> '.join(path)}")
+    for cycle in report["cycles"]:
+        print(f"Cycle: {' - '.join(cycle['tables'])} closed by {_describe(cycle['relationship'])}")
+    for orphan in report["orphans"]:
+        print(f"Missing {', '.join(orphan['missing'])}: {_describe(orphan['relationship'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
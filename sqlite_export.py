@@ -0,0 +1,253 @@
+"""
+Export extracted model information into a normalized SQLite catalog.
+
+    python sqlite_export.py catalog.db MODEL [MODEL ...]
+
+MODEL is a pbi_model_info.json file or an extracted model folder (containing Model/).
+Each model is upserted: re-exporting a model replaces its rows, other models in the
+catalog are left untouched. A JSON file inside an extracted model folder is the same model
+as that folder; any other JSON file is a model of its own (see model_key()).
+"""
+
+import datetime
+import sqlite3
+import sys
+from pathlib import Path
+
+from compact_layout import expand_model_info, load_model_info
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    extract_date TEXT,
+    exported_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tables (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    UNIQUE (model_id, name)
+);
+CREATE TABLE IF NOT EXISTS columns (
+    id INTEGER PRIMARY KEY,
+    table_id INTEGER NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    data_type TEXT NOT NULL DEFAULT '',
+    is_calculated INTEGER NOT NULL DEFAULT 0,
+    description TEXT NOT NULL DEFAULT '',
+    expression TEXT
+);
+CREATE TABLE IF NOT EXISTS measures (
+    id INTEGER PRIMARY KEY,
+    table_id INTEGER NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    expression TEXT NOT NULL DEFAULT '',
+    format_string TEXT NOT NULL DEFAULT '',
+    display_folder TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS relationships (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    from_table TEXT NOT NULL,
+    from_column TEXT NOT NULL,
+    to_table TEXT NOT NULL,
+    to_column TEXT NOT NULL,
+    cross_filtering_behavior TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS queries (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    expression TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_models_name ON models(name);
+CREATE INDEX IF NOT EXISTS idx_tables_name ON tables(name);
+CREATE INDEX IF NOT EXISTS idx_columns_table ON columns(table_id);
+CREATE INDEX IF NOT EXISTS idx_columns_name ON columns(name);
+CREATE INDEX IF NOT EXISTS idx_measures_table ON measures(table_id);
+CREATE INDEX IF NOT EXISTS idx_measures_name ON measures(name);
+CREATE INDEX IF NOT EXISTS idx_relationships_model ON relationships(model_id);
+CREATE INDEX IF NOT EXISTS idx_relationships_from ON relationships(from_table, from_column);
+CREATE INDEX IF NOT EXISTS idx_relationships_to ON relationships(to_table, to_column);
+CREATE INDEX IF NOT EXISTS idx_queries_model ON queries(model_id);
+CREATE INDEX IF NOT EXISTS idx_queries_name ON queries(name);
+"""
+
+
+def connect_catalog(db_path):
+    """Open (creating if needed) a catalog database with the current schema"""
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA foreign_keys = ON")
+
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, SCHEMA_VERSION):
+        connection.close()
+        raise ValueError(f"{db_path} has catalog schema version {version}, expected {SCHEMA_VERSION}")
+
+    with connection:
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return connection
+
+
+def model_key(path):
+    """
+    Catalog key of a model as a resolved POSIX path.
+
+    A JSON file saved inside an extracted model folder (next to its Model/ folder) is keyed by
+    that folder, so exporting either updates the same model. Any other JSON file is keyed by
+    its own path, as several exports of different models can share a folder.
+
+    Args:
+        path: Extracted model folder or pbi_model_info.json file
+    """
+    path = Path(path).resolve()
+    if path.is_dir():
+        return path.as_posix()
+    if (path.parent / "Model").is_dir():
+        return path.parent.as_posix()
+    return path.as_posix()
+
+
+def upsert_model(connection, model_info, key=None):
+    """
+    Insert or replace one model in the catalog in a single transaction; returns its model id.
+
+    Args:
+        model_info: extract_all() output, in the legacy or the compact layout
+        key: Identifies the model in the catalog (see model_key()); defaults to the model name
+    """
+    if model_info.get("metadata", {}).get("layout"):
+        model_info = expand_model_info(model_info)
+    model = model_info["model"]
+    key = key or model["name"]
+    exported_at = datetime.datetime.now().isoformat()
+
+    with connection:
+        row = connection.execute("SELECT id FROM models WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            model_id = connection.execute(
+                "INSERT INTO models (key, name, extract_date, exported_at) VALUES (?, ?, ?, ?)",
+                (key, model["name"], model_info.get("metadata", {}).get("extractDate"), exported_at),
+            ).lastrowid
+        else:
+            # Keep the model id stable; its objects are replaced wholesale
+            model_id = row[0]
+            connection.execute(
+                "UPDATE models SET name = ?, extract_date = ?, exported_at = ? WHERE id = ?",
+                (model["name"], model_info.get("metadata", {}).get("extractDate"), exported_at, model_id),
+            )
+            for table in ("tables", "relationships", "queries"):
+                connection.execute(f"DELETE FROM {table} WHERE model_id = ?", (model_id,))
+
+        tables = model.get("tables", [])
+        connection.executemany(
+            "INSERT INTO tables (model_id, name, description) VALUES (?, ?, ?)",
+            ((model_id, table["name"], table.get("description", "")) for table in tables),
+        )
+        table_ids = dict(connection.execute("SELECT name, id FROM tables WHERE model_id = ?", (model_id,)))
+
+        connection.executemany(
+            "INSERT INTO columns (table_id, name, data_type, is_calculated, description, expression) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    table_ids[table["name"]],
+                    column["name"],
+                    column.get("dataType", ""),
+                    int(column.get("type") == "calculated"),
+                    column.get("description", ""),
+                    column.get("expression"),
+                )
+                for table in tables
+                for column in table.get("columns", [])
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO measures (table_id, name, description, expression, format_string, display_folder) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    table_ids[table["name"]],
+                    measure["name"],
+                    measure.get("description", ""),
+                    measure.get("expression", ""),
+                    measure.get("formatString", ""),
+                    measure.get("displayFolder", ""),
+                )
+                for table in tables
+                for measure in table.get("measures", [])
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO relationships "
+            "(model_id, from_table, from_column, to_table, to_column, cross_filtering_behavior, is_active) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    model_id,
+                    relationship["fromTable"],
+                    relationship["fromColumn"],
+                    relationship["toTable"],
+                    relationship["toColumn"],
+                    relationship.get("crossFilteringBehavior", ""),
+                    int(relationship.get("isActive", True)),
+                )
+                for relationship in model.get("relationships", [])
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO queries (model_id, name, expression) VALUES (?, ?, ?)",
+            (
+                (model_id, query["name"], query["expression"])
+                for query in model_info.get("queries", {}).get("powerQueries", [])
+            ),
+        )
+    return model_id
+
+
+def delete_model(connection, key):
+    """Remove a model and all its objects from the catalog; returns True if it was there"""
+    with connection:
+        return connection.execute("DELETE FROM models WHERE key = ?", (key,)).rowcount > 0
+
+
+def load_model(path):
+    """extract_all() output for a pbi_model_info.json file or an extracted model folder"""
+    path = Path(path)
+    if path.is_dir():
+        # Imported here so that exporting existing JSON files does not load the extractor
+        from extract_pbi_model_info import PowerBIModelExtractor
+
+        return PowerBIModelExtractor(path).extract_all()
+    return load_model_info(path)
+
+
+def main(argv=None):
+    """Upsert models into a catalog database"""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print("Usage: python sqlite_export.py <catalog.db> <pbi_model_info.json | model folder> ...")
+        return 2
+
+    connection = connect_catalog(argv[0])
+    try:
+        for path in argv[1:]:
+            path = Path(path).resolve()
+            model_id = upsert_model(connection, load_model(path), key=model_key(path))
+            print(f"Exported {path} as model {model_id}")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+import extract_pbi_model_info  # noqa: E402
+from synthetic_model import generate_model  # noqa: E402
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A small synthetic extracted model: 3 tables, per-file relationships and Section1.m"""
+    return generate_model(tmp_path / "model", tables=3, columns=2, measures=1, calculated_columns=1, queries=1)
+
+
+@pytest.fixture
+def edit_file():
+    """Function rewriting a file and moving its mtime forward, so the edit shows even on coarse timestamps"""
+
+    def edit(path, old, new):
+        path = Path(path)
+        stat = path.stat()
+        path.write_text(path.read_text(encoding="utf-8").replace(old, new), encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    return edit
+
+
+@pytest.fixture
+def edit_while_parsing(monkeypatch):
+    """
+    Function making the next parse of a table run edit() once its content has been read, as if
+    the file changed between the extractor reading it and storing the result; returns a list
+    that gets an item once the edit has run. monkeypatch.undo() restores the parser.
+    """
+    def patch(edit, table_name):
+        parse_table_file = extract_pbi_model_info.parse_table_file
+        edits = []
+
+        def parse_then_edit(content):
+            result = parse_table_file(content)
+            if result["name"] == table_name and not edits:
+                edit()
+                edits.append(True)
+            return result
+
+        monkeypatch.setattr(extract_pbi_model_info, "parse_table_file", parse_then_edit)
+        return edits
+
+    return patch
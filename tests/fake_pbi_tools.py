@@ -0,0 +1,56 @@
+"""
+Stand-in for pbi-tools.exe, for running pbix_pipeline.py on machines without it.
+
+Accepts the same "extract <pbix> -extractFolder <folder>" arguments, waits a while to
+mimic the extraction time, and writes a synthetic model into the folder. An empty input
+file fails like an unreadable PBIX (exit code 1). --log appends "<start|end> <pbix name>
+<time.time()>" lines, so tests can check the order in which the pipeline ran its stages.
+
+    python pbix_pipeline.py "*.pbix" --command "python tests/fake_pbi_tools.py extract {pbix} -extractFolder {folder}"
+"""
+
+import argparse
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from synthetic_model import generate_model  # noqa: E402
+
+
+def _log(log_file, event, pbix):
+    if log_file:
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"{event} {pbix.name} {time.time()!r}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic extraction folder for a PBIX file.")
+    parser.add_argument("verb", choices=("extract",))
+    parser.add_argument("pbix")
+    parser.add_argument("-extractFolder", dest="extract_folder")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds to wait, like a pbi-tools run")
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--log", help="Append start and end lines to this file")
+    args = parser.parse_args(argv)
+
+    pbix = Path(args.pbix)
+    if not pbix.is_file() or pbix.stat().st_size == 0:
+        print(f"Error: {pbix} is not a valid PBIX file")
+        return 1
+
+    _log(args.log, "start", pbix)
+    print(f"Extracting {pbix}...")
+    time.sleep(args.delay)
+    folder = Path(args.extract_folder) if args.extract_folder else pbix.with_suffix("")
+    # Each file gets its own model, stable across runs
+    generate_model(folder, tables=args.tables, seed=zlib.crc32(pbix.name.encode()))
+    print(f"Extracted to {folder}")
+    _log(args.log, "end", pbix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import argparse
+import json
+import sys
+
+import pytest
+
+import batch_extract
+import pbix_pipeline
+from extraction_filter import add_filter_arguments, filters_from_args
+
+
+def parse_filters(argv):
+    parser = argparse.ArgumentParser()
+    add_filter_arguments(parser)
+    return filters_from_args(parser, parser.parse_args(argv))
+
+
+def test_filters_from_args():
+    assert parse_filters([]) == {"tables": None, "exclude_tables": None, "kinds": None, "exclude_kinds": None}
+    assert parse_filters(["--tables", "Sales*", "--tables", "Date", "--exclude-kinds", "queries,measures"]) == {
+        "tables": ["Sales*", "Date"],
+        "exclude_tables": None,
+        "kinds": None,
+        "exclude_kinds": ["queries", "measures"],
+    }
+
+
+@pytest.mark.parametrize("cli", [batch_extract.main, pbix_pipeline.main])
+def test_unknown_kind_is_a_usage_error(cli, tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli([str(tmp_path), "--kinds", "measures,visuals"])
+    assert exit_info.value.code == 2
+    assert "Unknown object kind 'visuals'" in capsys.readouterr().err
+
+
+def test_batch_filters(model_dir, tmp_path):
+    summary_file = tmp_path / "summary.json"
+    argv = [str(model_dir), "--workers", "1", "--summary", str(summary_file)]
+    argv += ["--tables", "Table0", "--kinds", "measures"]
+    assert batch_extract.main(argv) == 0
+
+    with open(model_dir / batch_extract.OUTPUT_FILE_NAME, encoding="utf-8") as f:
+        output = json.load(f)
+    assert [table["name"] for table in output["model"]["tables"]] == ["Table0"]
+    assert output["model"]["tables"][0]["columns"] == []
+    assert output["metadata"]["filters"] == {"kinds": ["measures"], "tables": ["Table0"]}
+
+
+def test_summary_file_without_console(model_dir, monkeypatch):
+    # The windowed executable runs the batch mode with sys.stdout and sys.stderr set to None
+    monkeypatch.setattr(sys, "stdout", None)
+    monkeypatch.setattr(sys, "stderr", None)
+    assert batch_extract.main([str(model_dir), "--workers", "1"]) == 0
+
+    with open(model_dir.parent / batch_extract.SUMMARY_FILE_NAME, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["succeeded"] == 1 and summary["failed"] == 0
@@ -0,0 +1,58 @@
+import io
+import json
+import shutil
+
+import pytest
+
+from catalog_crawler import build_catalog, find_models
+from extract_pbi_model_info import OUTPUT_VERSION, PowerBIModelExtractor
+
+
+@pytest.fixture
+def root(model_dir, tmp_path):
+    """Two copies of the synthetic model, one nested deeper, the second with a commented Section1.m"""
+    root = tmp_path / "reports"
+    first = root / "a"
+    second = root / "team" / "b"
+    shutil.copytree(model_dir, first)
+    shutil.copytree(model_dir, second)
+    section_file = second / "Mashup" / "Package" / "Formulas" / "Section1.m"
+    section_file.write_text("// Exported by Power BI\n" + section_file.read_text(encoding="utf-8"), encoding="utf-8")
+    # Not a model, and not searched
+    (root / "a" / "Report").mkdir()
+    (root / ".git" / "Model").mkdir(parents=True)
+    return root
+
+
+def test_section_document_is_marked(model_dir):
+    extractor = PowerBIModelExtractor(model_dir)
+    output = extractor.extract_all()
+    queries = output["queries"]["powerQueries"]
+    assert output["metadata"]["version"] == OUTPUT_VERSION == "1.1"
+    assert queries[0]["name"] == "Section1" and queries[0]["isSection"] is True
+    assert not any("isSection" in query for query in queries[1:])
+    assert all("isSection" not in expression for expression in output["model"]["expressions"])
+
+    written = io.StringIO()
+    PowerBIModelExtractor(model_dir).write_json(written)
+    assert json.loads(written.getvalue())["queries"] == output["queries"]
+
+
+def test_find_models(root):
+    assert find_models(root) == [(root / "a").resolve(), (root / "team" / "b").resolve()]
+    assert find_models(root / "a") == [(root / "a").resolve()]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_catalog_skips_section_documents(root, workers):
+    catalog = build_catalog(root, workers=workers)
+
+    assert [model["name"] for model in catalog["models"]] == ["a", "b"]
+    assert all(model["status"] == "ok" for model in catalog["models"])
+    for model in catalog["models"]:
+        # The comment before "section" no longer lets the whole document through as a query
+        assert [query["name"] for query in model["queries"]] == ["Table0", "Table 1", "Table2", "Parameter0"]
+
+    # Both models share every query and measure
+    assert catalog["metadata"]["uniqueQueries"] == 4 and catalog["metadata"]["queryUses"] == 8
+    assert all(entry["models"] == 2 for entry in catalog["queries"] + catalog["measures"])
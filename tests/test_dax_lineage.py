@@ -0,0 +1,61 @@
+from dax_lineage import DaxDependencyGraph, scan_dax_references
+from extract_pbi_model_info import PowerBIModelExtractor
+
+SALES_TMDL = """table Sales
+
+\tcolumn Amount
+\t\tdataType: double
+
+\tcolumn 'Amount x2' =
+\t\t\t// doubled
+\t\t\tSales[Amount] * 2
+\t\tdataType: double
+
+\tmeasure Total =
+\t\t\t// total sales
+\t\t\tSUM(Sales[Amount])
+
+\tmeasure 'Total x2' =
+\t\t\t[Total] * 2 -- twice [Missing]
+"""
+
+
+def test_scan_skips_strings_and_comments():
+    expression = "SUM('Sales'[Amount]) + [Tax] // [Ignored]\n+ LEN(\"[NotARef]\") /* Sales[Nope] */ + Dates[Year]"
+    assert scan_dax_references(expression) == [("Sales", "Amount"), (None, "Tax"), ("Dates", "Year")]
+
+
+def test_exported_expressions_are_untouched_and_lineage_reads_line_breaks(tmp_path):
+    tables = tmp_path / "model" / "Model" / "tables"
+    tables.mkdir(parents=True)
+    (tables / "Sales.tmdl").write_text(SALES_TMDL, encoding="utf-8")
+
+    output = PowerBIModelExtractor(tmp_path / "model").extract_all()
+    measures = {m["name"]: m["expression"] for m in output["model"]["tables"][0]["measures"]}
+    assert measures["Total"] == "// total sales SUM(Sales[Amount])"
+
+    graph = DaxDependencyGraph.from_model_path(tmp_path / "model")
+    assert graph.dependencies["[Total]"] == ["'Sales'[Amount]"]
+    assert graph.dependencies["'Sales'[Amount x2]"] == ["'Sales'[Amount]"]
+    assert graph.upstream("[Total x2]") == {"[Total]", "'Sales'[Amount]"}
+    assert "[Total x2]" not in graph.unresolved
+
+
+def test_topological_order_leaves_out_cycles_and_their_dependents():
+    tables = [
+        {
+            "name": "Sales",
+            "columns": [{"name": "Amount"}],
+            "measures": [
+                {"name": "Total", "expression": "SUM(Sales[Amount])"},
+                {"name": "Loop A", "expression": "[Loop B] + [Total]"},
+                {"name": "Loop B", "expression": "[Loop A]"},
+                {"name": "Uses Loop", "expression": "[Loop A] * 2"},
+                {"name": "Uses Total", "expression": "[Total] * 2"},
+            ],
+        }
+    ]
+    graph = DaxDependencyGraph.from_tables(tables)
+
+    assert graph.topological_order() == ["'Sales'[Amount]", "[Total]", "[Uses Total]"]
+    assert graph.find_cycles() == [["[Loop A]", "[Loop B]"]]
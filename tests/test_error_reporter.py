@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from error_reporter import ErrorReporter
+
+
+class UrllibResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class UrllibSession:
+    """The part of requests.Session the reporter uses, over urllib"""
+
+    def post(self, url, json=None, timeout=None):
+        request = urllib.request.Request(
+            url, data=_dumps(json), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return UrllibResponse(response.status)
+        except urllib.error.HTTPError as e:
+            e.close()
+            return UrllibResponse(e.code)
+
+    def close(self):
+        pass
+
+
+def _dumps(payload):
+    return json.dumps(payload).encode("utf-8")
+
+
+class ReportServer:
+    """http.server on localhost recording the reports it receives; replies with queued status codes, then 200"""
+
+    def __init__(self):
+        self.received = []
+        self.statuses = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with server.lock:
+                    status = server.statuses.pop(0) if server.statuses else 200
+                    if status < 300:
+                        server.received.append(json.loads(body))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/v1/extractor-error"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = ReportServer()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def make_reporter(tmp_path):
+    reporters = []
+
+    def make(url, **kwargs):
+        options = dict(spool_dir=tmp_path / "spool", initial_backoff=0.01, max_backoff=0.05, request_timeout=2.0)
+        options.update(kwargs)
+        reporter = ErrorReporter(url, session_factory=UrllibSession, **options)
+        reporters.append(reporter)
+        return reporter
+
+    yield make
+    for reporter in reporters:
+        reporter.close(timeout=1.0)
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_reports_are_delivered_in_order(server, make_reporter):
+    reporter = make_reporter(server.url, batch_size=2)
+    for number in range(5):
+        reporter.report({"error_type": "extraction_error", "number": number})
+
+    wait_until(lambda: reporter.sent == 5)
+    assert [payload["number"] for payload in server.received] == list(range(5))
+    assert reporter.pending() == [] and reporter.failures == 0
+
+
+def test_server_errors_are_retried(server, make_reporter):
+    server.statuses = [503, 429, 500]
+    reporter = make_reporter(server.url)
+    reporter.report({"number": 0})
+    reporter.report({"number": 1})
+
+    wait_until(lambda: reporter.sent == 2)
+    assert reporter.failures == 3
+    # A failed report is retried before the ones after it
+    assert [payload["number"] for payload in server.received] == [0, 1]
+    assert reporter.pending() == []
+
+
+def test_rejected_report_is_dropped(server, make_reporter):
+    server.statuses = [400]
+    reporter = make_reporter(server.url)
+    reporter.report({"number": 0})
+    reporter.report({"number": 1})
+
+    wait_until(lambda: reporter.sent == 2)
+    assert [payload["number"] for payload in server.received] == [1]
+    assert reporter.failures == 0 and reporter.pending() == []
+
+
+def test_unreadable_spool_file_is_dropped(server, make_reporter, tmp_path):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    (spool_dir / "00000000000000000000-broken.json").write_text("{not json", encoding="utf-8")
+    reporter = make_reporter(server.url)
+    reporter.report({"number": 0})
+
+    wait_until(lambda: reporter.sent == 1)
+    assert server.received == [{"number": 0}] and reporter.pending() == []
+
+
+def test_unreachable_endpoint_keeps_reports_for_next_run(server, make_reporter):
+    # Nothing listens on the port of a server that has been shut down
+    closed = ReportServer()
+    closed.stop()
+
+    reporter = make_reporter(closed.url, request_timeout=0.5)
+    started = time.monotonic()
+    reporter.report({"number": 0})
+    assert time.monotonic() - started < 0.5, "report() must not wait for the network"
+
+    wait_until(lambda: reporter.failures >= 2)
+    reporter.close(timeout=1.0)
+    assert len(reporter.pending()) == 1 and reporter.sent == 0
+
+    # The next run ships what the first one left in the spool
+    next_run = make_reporter(server.url)
+    next_run.start()
+    wait_until(lambda: next_run.sent == 1)
+    assert server.received == [{"number": 0}] and next_run.pending() == []
@@ -0,0 +1,75 @@
+import datetime
+import io
+import json
+import types
+from pathlib import Path
+
+import pytest
+
+import extract_pbi_model_info
+from compact_layout import expand_model_info, load_model_info
+from extract_pbi_model_info import PowerBIModelExtractor
+from synthetic_model import generate_model
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Fix metadata.extractDate, so whole outputs can be compared as text"""
+    now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    fake_datetime = types.SimpleNamespace(datetime=types.SimpleNamespace(now=lambda: now))
+    monkeypatch.setattr(extract_pbi_model_info, "datetime", fake_datetime)
+
+
+@pytest.fixture
+def large_model(tmp_path):
+    """Enough table and relationship files for the worker pools to split them up"""
+    return generate_model(
+        tmp_path / "model", tables=12, columns=4, measures=3, calculated_columns=1, queries=3, relationships="both"
+    )
+
+
+def test_workers_output_is_identical(large_model, frozen_clock):
+    serial = json.dumps(PowerBIModelExtractor(large_model).extract_all(), indent=2)
+    parallel = json.dumps(PowerBIModelExtractor(large_model, workers=3).extract_all(), indent=2)
+    assert parallel == serial
+    assert PowerBIModelExtractor(large_model).extract_all(workers=3) == json.loads(serial)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_write_json_matches_json_dump(large_model, frozen_clock, compact):
+    expected = io.StringIO()
+    json.dump(PowerBIModelExtractor(large_model).extract_all(compact=compact), expected, indent=2)
+    written = io.StringIO()
+    PowerBIModelExtractor(large_model).write_json(written, compact=compact)
+    assert written.getvalue() == expected.getvalue()
+
+
+def test_expanded_compact_layout_matches_legacy_output(large_model, frozen_clock, tmp_path):
+    legacy = PowerBIModelExtractor(large_model).extract_all()
+    compact = PowerBIModelExtractor(large_model).extract_all(compact=True)
+    assert compact["metadata"]["layout"]
+    assert expand_model_info(compact) == legacy
+
+    # Also through the loader, from a file written by save()
+    output_file = tmp_path / "pbi_model_info.json"
+    PowerBIModelExtractor(large_model).save(output_file, compact=True)
+    assert load_model_info(output_file) == legacy
+
+
+@pytest.mark.parametrize("options", [{}, {"cache": True}, {"workers": 3}])
+def test_excluded_table_files_are_never_opened(large_model, monkeypatch, options):
+    opened = []
+    real_open = open
+
+    def recording_open(file, *args, **kwargs):
+        opened.append(Path(file).name if isinstance(file, (str, Path)) else file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", recording_open)
+    extractor = PowerBIModelExtractor(large_model, tables=["Table*1*"], exclude_tables=["Table 11"], **options)
+    output = extractor.extract_all()
+    monkeypatch.undo()
+
+    assert [table["name"] for table in output["model"]["tables"]] == ["Table 1", "Table10"]
+    table_files = {path.name for path in (large_model / "Model" / "tables").glob("*.tmdl")}
+    assert table_files & set(opened) == {"Table 1.tmdl", "Table10.tmdl"}
@@ -0,0 +1,49 @@
+from extract_pbi_model_info import PowerBIModelExtractor
+
+
+def _table_names(model_dir):
+    extractor = PowerBIModelExtractor(model_dir, cache=True)
+    output = extractor.extract_all()
+    return [table["name"] for table in output["model"]["tables"]], extractor.cache
+
+
+def test_rerun_is_served_from_cache(model_dir):
+    names, cache = _table_names(model_dir)
+    assert names == ["Table 1", "Table0", "Table2"]
+    assert cache.hits == 0
+
+    names_again, cache = _table_names(model_dir)
+    assert names_again == names
+    assert cache.misses == 0 and cache.hits > 0
+
+
+def test_edit_is_picked_up(model_dir, edit_file):
+    _table_names(model_dir)
+    edit_file(model_dir / "Model" / "tables" / "Table0.tmdl", "table Table0", "table Renamed")
+
+    names, cache = _table_names(model_dir)
+    assert "Renamed" in names and "Table0" not in names
+    assert cache.misses == 1
+
+
+def test_file_edited_while_parsing_is_not_cached(model_dir, edit_file, edit_while_parsing, monkeypatch):
+    table_file = model_dir / "Model" / "tables" / "Table0.tmdl"
+    # The file changes after it was read but before its fragment is stored
+    edited = edit_while_parsing(lambda: edit_file(table_file, "table Table0", "table Renamed"), "Table0")
+    names, _ = _table_names(model_dir)
+    assert edited and "Table0" in names
+    monkeypatch.undo()
+
+    names, cache = _table_names(model_dir)
+    assert "Renamed" in names and "Table0" not in names
+    assert cache.misses == 1
+
+    # The fresh result is cached normally
+    _, cache = _table_names(model_dir)
+    assert cache.misses == 0
+
+
+def test_workers_path_caches_fingerprints(model_dir):
+    PowerBIModelExtractor(model_dir, workers=2, cache=True).extract_all()
+    _, cache = _table_names(model_dir)
+    assert cache.misses == 0
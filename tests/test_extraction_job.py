@@ -0,0 +1,116 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+from extraction_job import OUTPUT_FILE_NAME, ExtractionJob
+
+
+def run(job):
+    job.start()
+    assert job.wait(timeout=30)
+    return job.poll()
+
+
+def test_events_on_success(model_dir, tmp_path):
+    events = run(ExtractionJob(None, [tmp_path / "missing", model_dir]))
+    types = [event["type"] for event in events]
+
+    assert types[0] == "phase" and events[0]["phase"] == "metadata"
+    assert types[-1] == "done" and types.count("done") == 1
+    assert "error" not in types
+
+    progress = [event for event in events if event["type"] == "progress"]
+    assert progress
+    for phase in {event["phase"] for event in progress}:
+        counts = [(event["done"], event["total"]) for event in progress if event["phase"] == phase]
+        assert [done for done, _ in counts] == sorted(done for done, _ in counts)
+        assert counts[-1][0] == counts[-1][1]
+
+    output_file = events[-1]["output_file"]
+    assert output_file == str(model_dir / OUTPUT_FILE_NAME)
+    with open(output_file, encoding="utf-8") as f:
+        assert len(json.load(f)["model"]["tables"]) == 3
+
+
+def test_command_output_then_done(model_dir, tmp_path):
+    command = [sys.executable, "-c", "print('extracting'); print('finished')"]
+    events = run(ExtractionJob(command, [model_dir], output_dir=tmp_path))
+
+    assert events[0] == {"type": "phase", "phase": "pbi-tools"}
+    assert [event["line"] for event in events if event["type"] == "output"] == ["extracting", "finished"]
+    phases = [event["phase"] for event in events if event["type"] == "phase"]
+    assert phases == ["pbi-tools", "metadata"]
+    assert events[-1]["type"] == "done"
+    assert (tmp_path / OUTPUT_FILE_NAME).exists()
+
+
+def test_failing_command(model_dir):
+    command = [sys.executable, "-c", "import sys; print('bad pbix'); sys.exit(3)"]
+    events = run(ExtractionJob(command, [model_dir]))
+
+    assert events[-1] == {"type": "error", "kind": "pbi-tools", "message": "bad pbix", "returncode": 3}
+    assert not any(event["type"] in ("progress", "done") for event in events)
+    assert not (model_dir / OUTPUT_FILE_NAME).exists()
+
+
+def test_model_not_found(tmp_path):
+    events = run(ExtractionJob(None, [tmp_path / "a", tmp_path / "b"]))
+
+    assert [event["type"] for event in events] == ["error"]
+    assert events[0]["kind"] == "model-not-found"
+    assert str(tmp_path / "a") in events[0]["message"] and str(tmp_path / "b") in events[0]["message"]
+
+
+def test_metadata_error(model_dir):
+    def failing_extractor(model_path, progress):
+        raise ValueError("cannot parse model")
+
+    events = run(ExtractionJob(None, [model_dir], extractor_factory=failing_extractor))
+
+    assert [event["type"] for event in events] == ["phase", "error"]
+    assert events[-1]["kind"] == "metadata"
+    assert events[-1]["message"] == "cannot parse model"
+    assert events[-1]["extraction_dir"] == str(model_dir)
+
+
+def test_cancel_during_progress(model_dir):
+    job = ExtractionJob(None, [model_dir])
+    real_progress = job._on_progress
+
+    def cancel_on_first_progress(phase, done, total):
+        job.cancel()
+        real_progress(phase, done, total)
+
+    job._on_progress = cancel_on_first_progress
+    events = run(job)
+
+    assert events[-1] == {"type": "cancelled"}
+    assert not any(event["type"] in ("progress", "done", "error") for event in events)
+    assert not (model_dir / OUTPUT_FILE_NAME).exists()
+
+
+def test_cancel_kills_running_command(tmp_path):
+    pbix = tmp_path / "report.pbix"
+    pbix.write_bytes(b"PK")
+    fake_pbi_tools = Path(__file__).resolve().parent / "fake_pbi_tools.py"
+    # -u: the "Extracting..." line has to reach the job before the 30 second wait, not at exit
+    command = [sys.executable, "-u", str(fake_pbi_tools), "extract", str(pbix)]
+    command += ["-extractFolder", str(tmp_path / "out"), "--delay", "30"]
+    job = ExtractionJob(command, [tmp_path / "out"]).start()
+
+    # Wait for the fake pbi-tools to report that it is extracting
+    deadline = time.monotonic() + 30
+    while not any(event["type"] == "output" for event in job.poll()):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    process = job._process
+
+    started = time.monotonic()
+    job.cancel()
+    assert job.wait(timeout=10)
+
+    assert time.monotonic() - started < 10
+    assert process.poll() is not None
+    assert job.poll()[-1] == {"type": "cancelled"}
+    assert not (tmp_path / "out" / "Model").exists()
@@ -0,0 +1,43 @@
+import io
+import json
+
+from extract_pbi_model_info import PowerBIModelExtractor
+from extraction_stats import PHASE_COUNTERS
+
+
+def test_extract_all_stats(model_dir):
+    reported = []
+    extractor = PowerBIModelExtractor(model_dir, stats_callback=lambda phase, stats: reported.append(phase))
+    output = extractor.extract_all(include_stats=True)
+    stats = output["metadata"]["stats"]
+
+    assert list(stats["phases"]) == ["tables", "relationships", "queries", "partitions"]
+    assert reported == ["tables", "relationships", "queries", "partitions"]
+
+    phases = stats["phases"]
+    assert phases["tables"]["objects"] == len(output["model"]["tables"]) == 3
+    assert phases["tables"]["files"] == 3
+    assert phases["relationships"]["objects"] == len(output["model"]["relationships"]) > 0
+    assert phases["queries"]["objects"] == len(output["queries"]["powerQueries"]) > 0
+    for phase in ("tables", "relationships", "queries"):
+        assert phases[phase]["files"] > 0
+        assert phases[phase]["bytesRead"] > 0
+        assert phases[phase]["regexMatches"] > 0
+        assert phases[phase]["cacheHits"] == 0
+        assert phases[phase]["wallSeconds"] > 0
+
+    for counter in PHASE_COUNTERS:
+        assert stats["total"][counter] == sum(phase[counter] for phase in phases.values())
+
+
+def test_write_json_stats(model_dir):
+    reported = []
+    extractor = PowerBIModelExtractor(model_dir, stats_callback=lambda phase, stats: reported.append(phase))
+    buffer = io.StringIO()
+    extractor.write_json(buffer, include_stats=True)
+    stats = json.loads(buffer.getvalue())["metadata"]["stats"]
+
+    # Serialization is still running when metadata.stats is written, so only the callback sees it
+    assert set(stats["phases"]) == {"tables", "relationships", "queries", "partitions"}
+    assert reported[-1] == "serialization"
+    assert stats["phases"]["tables"]["objects"] == 3
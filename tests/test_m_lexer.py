@@ -0,0 +1,99 @@
+import hashlib
+
+import pytest
+
+from m_lexer import mapped_file, scan_section, section_queries
+
+SECTION = """section Section1;
+
+// a comment with ; and = inside
+shared Sales = let
+    Source = "a;b = c",   /* block ; = */
+    Next = #"Quoted; = name"
+in
+    Next;
+
+[ Description = "Attribute; with = signs" ]
+shared #"Sales Fact" = Table.FromRows({{"x;y"}});
+
+Helper = 1;
+
+/* header comment */ shared Param = "p" meta [IsParameterQuery=true];
+"""
+
+SALES = """let
+    Source = "a;b = c",   /* block ; = */
+    Next = #"Quoted; = name"
+in
+    Next"""
+
+
+def test_strings_comments_and_attributes_do_not_split_members():
+    scan = scan_section(SECTION)
+    assert scan.name == "Section1"
+    assert [(name, shared) for name, shared, _, _ in scan.members] == [
+        ("Sales", True),
+        ('#"Sales Fact"', True),
+        ("Helper", False),
+        ("Param", True),
+    ]
+
+    queries = section_queries(SECTION)
+    assert queries[0] == {"name": "Section1", "expression": SECTION, "isSection": True}
+    # Only shared members are queries, with #"..." names unquoted
+    assert queries[1:] == [
+        {"name": "Sales", "expression": SALES},
+        {"name": "Sales Fact", "expression": 'Table.FromRows({{"x;y"}})'},
+        {"name": "Param", "expression": '"p" meta [IsParameterQuery=true]'},
+    ]
+
+
+def test_no_section_declaration():
+    assert section_queries("shared Sales = 1;") == []
+    assert section_queries(b"") == []
+
+
+def test_bom_and_crlf_through_mapped_file(tmp_path):
+    path = tmp_path / "Section1.m"
+    path.write_bytes(b"\xef\xbb\xbf" + SECTION.replace("\n", "\r\n").encode("utf-8"))
+
+    with mapped_file(path) as buffer:
+        queries = section_queries(buffer)
+    assert queries == section_queries(SECTION)
+
+
+def test_empty_file_is_mapped_as_empty_bytes(tmp_path):
+    path = tmp_path / "Section1.m"
+    path.write_bytes(b"")
+
+    with mapped_file(path) as buffer:
+        assert buffer == b""
+        assert section_queries(buffer) == []
+
+
+def payload_section(size):
+    return f'section Section1;\nshared Data = Binary.FromText("{"A" * size}", BinaryEncoding.Base64);\n'
+
+
+@pytest.mark.parametrize("as_bytes", [False, True])
+def test_literals_up_to_the_limit_are_kept(as_bytes):
+    section = payload_section(100)
+    buffer = section.encode("utf-8") if as_bytes else section
+
+    assert scan_section(buffer, max_literal_bytes=100).literals == []
+    assert section_queries(buffer, max_literal_bytes=100) == section_queries(section)
+
+
+@pytest.mark.parametrize("as_bytes", [False, True])
+def test_literals_over_the_limit_are_hashed_or_elided(as_bytes):
+    section = payload_section(101)
+    buffer = section.encode("utf-8") if as_bytes else section
+    digest = hashlib.sha256(b"A" * 101).hexdigest()
+
+    assert len(scan_section(buffer, max_literal_bytes=100).literals) == 1
+    hashed = section_queries(buffer, max_literal_bytes=100)
+    assert hashed[1]["expression"] == f'Binary.FromText("<literal sha256:{digest} 101 bytes>", BinaryEncoding.Base64)'
+    assert "A" * 101 not in hashed[0]["expression"]
+
+    elided = section_queries(buffer, max_literal_bytes=100, literal_mode="elide")
+    assert elided[1]["expression"] == 'Binary.FromText("<literal elided: 101 bytes>", BinaryEncoding.Base64)'
@@ -0,0 +1,83 @@
+import copy
+
+import pytest
+
+from compact_layout import compact_model_info
+from extract_pbi_model_info import PowerBIModelExtractor
+from model_diff import ModelHashTree, diff_models, diff_trees
+
+
+@pytest.fixture
+def model_info(model_dir):
+    return PowerBIModelExtractor(model_dir).extract_all()
+
+
+def changes(old, new, **kwargs):
+    return [
+        (change["change"], change["kind"], change.get("table"), change["name"])
+        for change in diff_models(old, new, include_objects=False, **kwargs)["changes"]
+    ]
+
+
+def test_identical_models_have_no_changes(model_info):
+    result = diff_models(model_info, copy.deepcopy(model_info))
+    assert result["changes"] == []
+    assert result["oldHash"] == result["newHash"]
+
+    # The compact layout of the same extraction hashes the same
+    assert changes(model_info, compact_model_info(copy.deepcopy(model_info))) == []
+
+
+def test_reordering_is_not_a_change(model_info):
+    new = copy.deepcopy(model_info)
+    new["model"]["tables"].reverse()
+    for table in new["model"]["tables"]:
+        table["columns"].reverse()
+        table["measures"].reverse()
+    new["model"]["relationships"].reverse()
+    new["queries"]["powerQueries"].reverse()
+
+    assert changes(model_info, new) == []
+
+
+@pytest.mark.parametrize("fanout", [1, 64])
+def test_changes_are_reported_at_their_path(model_info, fanout):
+    new = copy.deepcopy(model_info)
+    tables = {table["name"]: table for table in new["model"]["tables"]}
+    tables["Table0"]["measures"][0]["expression"] = "1"
+    tables["Table0"]["columns"].append({"name": "Added", "dataType": "string", "description": ""})
+    removed_column = tables["Table2"]["columns"].pop(0)["name"]
+    tables["Table2"]["description"] = "changed"
+    new["model"]["tables"].remove(tables["Table 1"])
+    new["model"]["tables"].append({"name": "New", "description": "", "columns": [], "measures": []})
+    new["queries"]["powerQueries"][-1]["expression"] = "let in 1"
+    query = new["queries"]["powerQueries"][-1]["name"]
+
+    assert sorted(changes(model_info, new, fanout=fanout)) == sorted(
+        [
+            ("modified", "measure", "Table0", tables["Table0"]["measures"][0]["name"]),
+            ("added", "column", "Table0", "Added"),
+            ("removed", "column", "Table2", removed_column),
+            ("modified", "table", None, "Table2"),
+            ("removed", "table", None, "Table 1"),
+            ("added", "table", None, "New"),
+            ("modified", "query", None, query),
+        ]
+    )
+
+
+def test_change_objects_and_stored_hashes(model_info):
+    new = copy.deepcopy(model_info)
+    measure = new["model"]["tables"][0]["measures"][0]
+    old_expression = measure["expression"]
+    measure["expression"] = "1"
+
+    [change] = diff_models(model_info, new)["changes"]
+    assert change["before"]["expression"] == old_expression
+    assert change["after"]["expression"] == "1"
+
+    # Hashes saved without the model still diff, just without the objects
+    old_tree = ModelHashTree.from_dict(ModelHashTree.from_model_info(model_info).to_dict())
+    [change] = diff_trees(old_tree, ModelHashTree.from_model_info(new))["changes"]
+    assert (change["change"], change["kind"], change["name"]) == ("modified", "measure", measure["name"])
+    assert "before" not in change and change["after"]["expression"] == "1"
@@ -0,0 +1,17 @@
+from extract_pbi_model_info import PowerBIModelExtractor
+from model_index import ModelIndex
+
+
+def test_lookups_return_dicts_for_records_and_output(model_dir):
+    extractor = PowerBIModelExtractor(model_dir)
+    output = extractor.extract_all()
+
+    for index in (extractor.index, ModelIndex.from_model_info(output)):
+        table = index.table("Table0")
+        assert type(table) is dict and table["name"] == "Table0"
+        assert table["partitions"][0]["name"] == "Table0 Partition"
+        assert index.column("Table0", "Column 0") == {"name": "Column 0", "dataType": "string", "description": ""}
+        assert type(index.measure("Measure 0-0")) is dict
+        assert index.measure_tables["Measure 0-0"] == "Table0"
+        assert index.table_columns("Table0") == {"Column 0", "Column 1", "Calc 0"}
+        assert index.table("Missing") is None
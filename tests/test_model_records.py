@@ -0,0 +1,102 @@
+import pytest
+
+from model_records import ColumnRecord, MeasureRecord, Record, RelationshipRecord, TableRecord
+
+TABLE_INFO = {
+    "name": "Sales",
+    "description": "Fact table",
+    "measures": [
+        {
+            "name": "Total",
+            "description": "",
+            "expression": "SUM(Sales[Amount])",
+            "formatString": "#,0",
+            "displayFolder": "",
+        }
+    ],
+    "columns": [
+        {"name": "Amount", "dataType": "double", "description": ""},
+        {"name": "Double", "type": "calculated", "dataType": "double", "description": "", "expression": "[Amount] * 2"},
+    ],
+    "partitions": [{"name": "Sales Partition", "source": {"type": "m", "expression": "let Source = 1 in Source"}}],
+}
+
+
+def test_round_trip():
+    assert TableRecord.from_dict(TABLE_INFO).to_dict() == TABLE_INFO
+    table_info = dict(TABLE_INFO)
+    del table_info["partitions"]
+    assert TableRecord.from_dict(table_info).to_dict() == table_info
+    relationship_info = {
+        "fromTable": "Sales",
+        "fromColumn": "Date",
+        "toTable": "Date",
+        "toColumn": "Date",
+        "crossFilteringBehavior": "bothDirections",
+        "isActive": False,
+    }
+    assert RelationshipRecord.from_dict(relationship_info).to_dict() == relationship_info
+
+
+def test_reads_match_the_dict_without_building_it(monkeypatch):
+    table = TableRecord.from_dict(TABLE_INFO)
+    data_column, calculated_column = table["columns"]
+    for cls in (TableRecord, ColumnRecord, MeasureRecord):
+        monkeypatch.setattr(cls, "to_dict", lambda self: pytest.fail("to_dict() called on read"))
+
+    assert table["name"] == "Sales" and table.get("description") == "Fact table"
+    assert table["partitions"] == TABLE_INFO["partitions"] and "partitions" in table
+    assert "lineageTag" not in table and table.get("lineageTag", "-") == "-"
+    with pytest.raises(KeyError):
+        table["lineageTag"]
+
+    assert data_column.get("type") is None and data_column.get("expression") is None
+    assert "expression" not in data_column
+    with pytest.raises(KeyError):
+        data_column["type"]
+    assert calculated_column["type"] == "calculated" and calculated_column["expression"] == "[Amount] * 2"
+    assert table["measures"][0]["formatString"] == "#,0"
+
+
+def test_partitions_key_follows_the_field():
+    table = TableRecord("Date")
+    assert "partitions" not in table and table.get("partitions", []) == []
+    table.add_partition({"name": "Date Partition"})
+    assert table["partitions"] == [{"name": "Date Partition"}]
+
+
+def test_setitem():
+    table = TableRecord.from_dict(TABLE_INFO)
+    table["description"] = "Sales lines"
+    table["columns"][0]["description"] = "Net amount"
+    table["measures"][0]["expression"] = "SUMX(Sales, Sales[Amount])"
+
+    table_info = table.to_dict()
+    assert table_info["description"] == "Sales lines"
+    assert table_info["columns"][0]["description"] == "Net amount"
+    assert table_info["measures"][0]["expression"] == "SUMX(Sales, Sales[Amount])"
+
+    with pytest.raises(KeyError):
+        table["lineageTag"] = "abc"
+    with pytest.raises(KeyError):
+        table["columns"][0]["type"] = "calculated"
+
+
+def test_plain_dicts_in_a_table():
+    table = TableRecord.from_dict(TABLE_INFO)
+    column_info = {"name": "Added", "dataType": "string", "description": "", "sourceColumn": "Added"}
+    table.columns.append(column_info)
+    table["measures"] = [{"name": "Count", "expression": "COUNTROWS(Sales)"}]
+
+    table_info = table.to_dict()
+    assert table_info["columns"][-1] == column_info and table_info["columns"][-1] is not column_info
+    assert table_info["measures"] == [{"name": "Count", "expression": "COUNTROWS(Sales)"}]
+
+
+def test_to_dict_is_abstract():
+    class Incomplete(Record):
+        __slots__ = ("name",)
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    assert not isinstance(TableRecord("Sales"), dict)
@@ -0,0 +1,66 @@
+import json
+import threading
+import time
+
+from model_watcher import ModelWatcher
+
+
+def table_names(output_file):
+    with open(output_file, encoding="utf-8") as f:
+        return [table["name"] for table in json.load(f)["model"]["tables"]]
+
+
+def test_edit_during_refresh_is_picked_up_next_refresh(model_dir, edit_file, edit_while_parsing, monkeypatch):
+    table_file = model_dir / "Model" / "tables" / "Table0.tmdl"
+    watcher = ModelWatcher(model_dir)
+    watcher.refresh()
+
+    edit_file(table_file, "table Table0", "table Edited")
+    edits = edit_while_parsing(lambda: edit_file(table_file, "table Edited", "table Final"), "Edited")
+    result = watcher.refresh([str(table_file)])
+    assert edits and result["status"] == "ok"
+    # The refresh reports what it read; the later edit must not be hidden by the cache
+    assert "Edited" in table_names(watcher.output_file)
+
+    monkeypatch.undo()
+    result = watcher.refresh([str(table_file)])
+    names = table_names(watcher.output_file)
+    assert "Final" in names and "Edited" not in names
+    assert result["cacheMisses"] == 1
+
+
+def test_run_refreshes_again_after_edit_during_refresh(model_dir, edit_file, edit_while_parsing, monkeypatch):
+    table_file = model_dir / "Model" / "tables" / "Table0.tmdl"
+    results = []
+    refreshed = threading.Condition()
+
+    def on_refresh(result):
+        with refreshed:
+            results.append(result)
+            refreshed.notify_all()
+
+    def wait_for(predicate, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        with refreshed:
+            while not predicate():
+                remaining = deadline - time.monotonic()
+                assert remaining > 0, f"timed out after {len(results)} refreshes"
+                refreshed.wait(remaining)
+
+    watcher = ModelWatcher(model_dir, interval=0.02, debounce=0.05, max_delay=1.0, on_refresh=on_refresh)
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    try:
+        wait_for(lambda: len(results) == 1)
+        assert "Table0" in table_names(watcher.output_file)
+
+        edits = edit_while_parsing(lambda: edit_file(table_file, "table Edited", "table Final"), "Edited")
+        edit_file(table_file, "table Table0", "table Edited")
+        wait_for(lambda: edits and "Final" in table_names(watcher.output_file))
+    finally:
+        watcher.stop()
+        thread.join(5)
+
+    assert all(result["status"] == "ok" for result in results)
+    # The edit made while reading was detected by the poll and refreshed on its own
+    assert results[-1]["changedFiles"] == [str(table_file)]
@@ -0,0 +1,166 @@
+import json
+import shlex
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pbix_pipeline
+from pbix_pipeline import PbixPipeline, main
+
+FAKE_PBI_TOOLS = Path(__file__).resolve().parent / "fake_pbi_tools.py"
+
+
+def fake_command(*options):
+    return [sys.executable, str(FAKE_PBI_TOOLS), "extract", "{pbix}", "-extractFolder", "{folder}", *options]
+
+
+def write_pbix_files(folder, names):
+    folder.mkdir(exist_ok=True)
+    paths = []
+    for name in names:
+        path = folder / name
+        # The stand-in treats an empty file as an unreadable PBIX
+        path.write_bytes(b"" if name.startswith("empty") else b"PK")
+        paths.append(path)
+    return paths
+
+
+def read_log(log_file):
+    events = {}
+    for line in log_file.read_text(encoding="utf-8").splitlines():
+        event, name, at = line.split()
+        events[(event, name)] = float(at)
+    return events
+
+
+def test_stages_run_in_order(tmp_path, monkeypatch):
+    pbix_files = write_pbix_files(tmp_path / "in", [f"report{i}.pbix" for i in range(5)])
+    log_file = tmp_path / "extract.log"
+    parse_times = {}
+    lock = threading.Lock()
+    extract_model_folder = pbix_pipeline.extract_model_folder
+
+    def timed_parse(folder, *args):
+        start = time.time()
+        summary = extract_model_folder(folder, *args)
+        with lock:
+            parse_times[Path(folder).name + ".pbix"] = (start, time.time())
+        return summary
+
+    monkeypatch.setattr(pbix_pipeline, "extract_model_folder", timed_parse)
+    pipeline = PbixPipeline(
+        pbix_files,
+        command=fake_command("--delay", "0.05", "--tables", "3", "--log", str(log_file)),
+        output_root=tmp_path / "out",
+        extractors=2,
+        parsers=1,
+        queue_size=1,
+    )
+    summary = pipeline.run()
+
+    assert summary["succeeded"] == 5 and summary["failed"] == 0
+    # Records follow the input order, whatever order the files finished in
+    assert [record["pbix"] for record in summary["models"]] == [str(path) for path in pbix_files]
+    for record in summary["models"]:
+        assert Path(record["output"]).is_file()
+
+    extract_times = read_log(log_file)
+    for path in pbix_files:
+        # A file is parsed only once its extraction has finished
+        assert extract_times[("start", path.name)] <= extract_times[("end", path.name)] <= parse_times[path.name][0]
+
+    stages = summary["stages"]
+    assert stages["extract"]["items"] == stages["parse"]["items"] == 5
+    assert stages["queue"]["maxDepth"] <= 1
+
+
+def test_errors_are_reported_per_stage(tmp_path, monkeypatch):
+    names = ["good0.pbix", "empty.pbix", "broken.pbix", "good1.pbix"]
+    pbix_files = write_pbix_files(tmp_path / "in", names)
+    extract_model_folder = pbix_pipeline.extract_model_folder
+
+    def failing_parse(folder, *args):
+        if Path(folder).name == "broken":
+            raise RuntimeError("worker died")
+        return extract_model_folder(folder, *args)
+
+    monkeypatch.setattr(pbix_pipeline, "extract_model_folder", failing_parse)
+    summary = PbixPipeline(
+        pbix_files,
+        command=fake_command("--delay", "0", "--tables", "2"),
+        output_root=tmp_path / "out",
+        extractors=2,
+        parsers=1,
+    ).run()
+
+    records = {Path(record["pbix"]).name: record for record in summary["models"]}
+    assert summary["succeeded"] == 2 and summary["failed"] == 2
+    assert records["good0.pbix"]["status"] == records["good1.pbix"]["status"] == "ok"
+
+    empty = records["empty.pbix"]
+    assert empty["status"] == "error" and empty["stage"] == "extract"
+    assert "exited with 1" in empty["error"] and "is not a valid PBIX" in empty["error"]
+    assert "parseSeconds" not in empty
+
+    broken = records["broken.pbix"]
+    assert broken["status"] == "error" and broken["stage"] == "parse"
+    assert broken["error"] == "RuntimeError: worker died"
+
+    assert summary["stages"]["extract"]["failed"] == 1 and summary["stages"]["parse"]["failed"] == 1
+
+
+def test_missing_model_folder_and_timeout(tmp_path):
+    pbix_files = write_pbix_files(tmp_path / "in", ["report.pbix"])
+
+    # Succeeds without writing anything
+    summary = PbixPipeline(pbix_files, command=[sys.executable, "-c", "pass"], output_root=tmp_path, parsers=1).run()
+    record = summary["models"][0]
+    assert record["stage"] == "extract" and record["error"].startswith("Could not find Model folder")
+
+    summary = PbixPipeline(
+        pbix_files, command=fake_command("--delay", "30"), output_root=tmp_path, parsers=1, timeout=0.5
+    ).run()
+    assert summary["models"][0]["error"] == "Extraction timed out after 0.5s"
+
+
+def test_parser_processes(tmp_path):
+    pbix_files = write_pbix_files(tmp_path / "in", ["a.pbix", "b.pbix", "empty.pbix"])
+    summary = PbixPipeline(
+        pbix_files, command=fake_command("--delay", "0", "--tables", "2"), output_root=tmp_path / "out", parsers=2
+    ).run()
+    assert [record["status"] for record in summary["models"]] == ["ok", "ok", "error"]
+
+
+def test_main_exit_codes(tmp_path, capsys):
+    write_pbix_files(tmp_path / "in", ["good.pbix", "empty.pbix"])
+    command = " ".join(f'"{arg}"' for arg in fake_command("--delay", "0", "--tables", "2"))
+    summary_file = tmp_path / "summary.json"
+    arguments = [str(tmp_path / "in" / "*.pbix"), "--command", command, "--parsers", "1"]
+    arguments += ["--summary", str(summary_file)]
+
+    assert main(arguments) == 1
+    assert "Failed (extract)" in capsys.readouterr().err
+    assert summary_file.is_file()
+    assert main([str(tmp_path / "nothing" / "*.pbix")]) == 2
+
+
+def test_unexpected_extract_error(tmp_path, monkeypatch, capsys):
+    pbix_files = write_pbix_files(tmp_path / "in", ["good.pbix", "bad.pbix"])
+    extract = PbixPipeline._extract
+
+    def failing_extract(self, pbix):
+        if pbix.name == "bad.pbix":
+            raise KeyError("folder")
+        return extract(self, pbix)
+
+    monkeypatch.setattr(PbixPipeline, "_extract", failing_extract)
+    summary_file = tmp_path / "summary.json"
+    argv = [str(path) for path in pbix_files] + ["--output-root", str(tmp_path / "out"), "--parsers", "1"]
+    argv += ["--command", shlex.join(fake_command("--delay", "0", "--tables", "2")), "--summary", str(summary_file)]
+    assert main(argv) == 1
+    assert f"Failed (extract): {pbix_files[1]}: KeyError: 'folder'" in capsys.readouterr().err
+
+    good, bad = json.loads(summary_file.read_text(encoding="utf-8"))["models"]
+    assert good["status"] == "ok" and good["stage"] == "parse"
+    assert bad["status"] == "error" and bad["stage"] == "extract" and "model" not in bad
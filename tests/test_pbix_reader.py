@@ -0,0 +1,143 @@
+import io
+import json
+import struct
+import zipfile
+
+import pytest
+
+from pbix_reader import PbixModelExtractor
+
+SCHEMA = {
+    "name": "Sales",
+    "compatibilityLevel": 1550,
+    "model": {
+        "tables": [
+            {
+                "name": "Sales",
+                "columns": [
+                    {"name": "RowNumber-2662979B", "type": "rowNumber"},
+                    {"name": "Amount", "dataType": "double", "description": "Net amount"},
+                    {"name": "Date", "dataType": "dateTime"},
+                    {"name": "Double", "type": "calculated", "dataType": "double", "expression": "Sales[Amount] * 2"},
+                ],
+                "measures": [
+                    {"name": "Total", "expression": ["SUM(", "    Sales[Amount]", ")"], "formatString": "#,0"},
+                ],
+                "partitions": [{"name": "Sales", "source": {"type": "m", "expression": "let Source = 1 in Source"}}],
+            },
+            {
+                "name": "Date",
+                "columns": [{"name": "Date", "dataType": "dateTime"}],
+                "partitions": [{"name": "Date", "source": {"type": "calculated", "expression": "CALENDARAUTO()"}}],
+            },
+        ],
+        "relationships": [
+            {"name": "r1", "fromTable": "Sales", "fromColumn": "Date", "toTable": "Date", "toColumn": "Date"},
+            {
+                "name": "r2",
+                "fromTable": "Sales",
+                "fromColumn": "Amount",
+                "toTable": "Date",
+                "toColumn": "Date",
+                "isActive": False,
+                "crossFilteringBehavior": "bothDirections",
+            },
+        ],
+        "expressions": [{"name": "Server", "expression": '"localhost" meta [IsParameterQuery=true]'}],
+    },
+}
+
+SECTION = 'section Section1;\r\n\r\nshared Sales = let Source = Csv.Document("' + "x" * 200 + '") in Source;\r\n'
+
+
+def write_pbix(path, schema=SCHEMA, section=SECTION, bom=False):
+    """Write a minimal PBIX: a UTF-16 DataModelSchema and a DataMashup holding Section1.m"""
+    with zipfile.ZipFile(path, "w") as archive:
+        if schema is not None:
+            text = json.dumps(schema)
+            archive.writestr("DataModelSchema", text.encode("utf-16") if bom else text.encode("utf-16-le"))
+        if section is not None:
+            package = io.BytesIO()
+            with zipfile.ZipFile(package, "w") as package_zip:
+                package_zip.writestr("Formulas/Section1.m", section.encode("utf-8-sig"))
+            parts = package.getvalue()
+            # Version, length of the package parts, the parts, then permissions and metadata
+            archive.writestr("DataMashup", struct.pack("<ii", 0, len(parts)) + parts + b"\x00" * 16)
+        archive.writestr("Version", "1.28".encode("utf-16-le"))
+    return path
+
+
+def test_tables_relationships_and_queries(tmp_path):
+    output = PbixModelExtractor(write_pbix(tmp_path / "report.pbix")).extract_all()
+    model = output["model"]
+
+    sales, date = model["tables"]
+    assert [column["name"] for column in sales["columns"]] == ["Amount", "Date", "Double"]
+    assert sales["columns"][0] == {"name": "Amount", "dataType": "double", "description": "Net amount"}
+    assert sales["columns"][2]["type"] == "calculated"
+    assert sales["measures"][0]["expression"] == "SUM( Sales[Amount] )"
+    assert sales["measures"][0]["formatString"] == "#,0"
+    assert date["name"] == "Date" and "partitions" not in date
+
+    assert model["relationships"] == [
+        {
+            "fromTable": "Sales",
+            "fromColumn": "Date",
+            "toTable": "Date",
+            "toColumn": "Date",
+            "crossFilteringBehavior": "oneDirection",
+            "isActive": True,
+        },
+        {
+            "fromTable": "Sales",
+            "fromColumn": "Amount",
+            "toTable": "Date",
+            "toColumn": "Date",
+            "crossFilteringBehavior": "bothDirections",
+            "isActive": False,
+        },
+    ]
+
+    # Queries come from Section1.m when the archive has a DataMashup
+    queries = {query["name"]: query["expression"] for query in output["queries"]["powerQueries"]}
+    assert set(queries) == {"Section1", "Sales"}
+    assert queries["Sales"].startswith("let Source = Csv.Document(")
+    assert sales["partitions"][0]["source"]["expression"] == queries["Sales"]
+
+
+def test_queries_from_schema_without_data_mashup(tmp_path):
+    output = PbixModelExtractor(write_pbix(tmp_path / "report.pbit", section=None, bom=True)).extract_all()
+    queries = {query["name"]: query["expression"] for query in output["queries"]["powerQueries"]}
+    assert queries == {"Server": '"localhost" meta [IsParameterQuery=true]', "Sales": "let Source = 1 in Source"}
+
+
+def test_mashup_only_archive(tmp_path):
+    output = PbixModelExtractor(write_pbix(tmp_path / "report.pbix", schema=None)).extract_all()
+    assert output["model"]["tables"] == [] and output["model"]["relationships"] == []
+    queries = output["queries"]["powerQueries"]
+    assert [query["name"] for query in queries] == ["Section1", "Sales"]
+    assert queries[0]["isSection"] is True and "isSection" not in queries[1]
+
+
+def test_extractor_options_are_forwarded(tmp_path):
+    phases = []
+    extractor = PbixModelExtractor(
+        write_pbix(tmp_path / "report.pbix"),
+        tables=["Date"],
+        kinds=["columns", "relationships", "queries"],
+        max_literal_bytes=64,
+        stats_callback=lambda name, stats: phases.append(name),
+    )
+    output = extractor.extract_all()
+
+    assert [table["name"] for table in output["model"]["tables"]] == ["Date"]
+    # Both relationships involve Sales, which is filtered out
+    assert output["model"]["relationships"] == []
+    assert "x" * 200 not in json.dumps(output)
+    assert output["metadata"]["filters"]["tables"] == ["Date"]
+    assert "tables" in phases and "queries" in phases
+
+
+def test_cache_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        PbixModelExtractor(write_pbix(tmp_path / "report.pbix"), cache=True)
@@ -0,0 +1,86 @@
+from relationship_graph import RelationshipGraph
+
+
+def rel(from_table, to_table, both=False, active=True):
+    """A relationship filtering from_table by to_table (keyed on a column named after to_table)"""
+    return {
+        "fromTable": from_table,
+        "fromColumn": f"{to_table}Key",
+        "toTable": to_table,
+        "toColumn": f"{to_table}Key",
+        "crossFilteringBehavior": "bothDirections" if both else "oneDirection",
+        "isActive": active,
+    }
+
+
+# Top filters Left and Right, which both filter Bottom; Upstream is above the diamond, Tail below it
+DIAMOND = [
+    rel("Top", "Upstream"),
+    rel("Left", "Top"),
+    rel("Right", "Top"),
+    rel("Bottom", "Left"),
+    rel("Bottom", "Right"),
+    rel("Tail", "Bottom"),
+]
+
+
+def test_diamond_is_reported_once_where_the_paths_split_and_meet():
+    assert RelationshipGraph(DIAMOND).ambiguities() == [
+        {"source": "Top", "target": "Bottom", "paths": [["Top", "Left", "Bottom"], ["Top", "Right", "Bottom"]]}
+    ]
+
+
+def test_inactive_relationships_only_count_when_asked_for():
+    relationships = DIAMOND[:4] + [rel("Bottom", "Right", active=False)] + DIAMOND[5:]
+    graph = RelationshipGraph(relationships)
+    assert graph.ambiguities() == []
+    assert [(a["source"], a["target"]) for a in graph.ambiguities(include_inactive=True)] == [("Top", "Bottom")]
+
+
+def test_trees_and_bidirectional_stars_are_not_ambiguous():
+    star = [rel("Sales", "Date"), rel("Sales", "Product", both=True), rel("Sales", "Customer"), rel("Returns", "Date")]
+    graph = RelationshipGraph(star)
+    assert graph.ambiguities() == []
+    assert graph.cycles() == []
+
+
+def test_bidirectional_relationship_opens_a_second_path():
+    # Date filters Sales directly, and through Budget and Product, as Budget-Product filters both ways
+    relationships = [rel("Sales", "Date"), rel("Budget", "Date"), rel("Budget", "Product"), rel("Sales", "Product")]
+    assert RelationshipGraph(relationships).ambiguities() == []
+
+    relationships[2] = rel("Budget", "Product", both=True)
+    assert RelationshipGraph(relationships).ambiguities() == [
+        {"source": "Date", "target": "Sales", "paths": [["Date", "Sales"], ["Date", "Budget", "Product", "Sales"]]}
+    ]
+
+
+def test_separate_loops_are_each_reported():
+    # Two diamonds joined by a single relationship, plus a long chain without loops
+    second = [rel(r["fromTable"] + "2", r["toTable"] + "2") for r in DIAMOND[1:5]]
+    chain = [rel(f"Chain{i + 1}", f"Chain{i}") for i in range(2000)]
+    relationships = DIAMOND + [rel("Top2", "Tail")] + second + chain + [rel("Chain0", "Bottom2")]
+
+    ambiguities = RelationshipGraph(relationships).ambiguities()
+    assert sorted((a["source"], a["target"]) for a in ambiguities) == [("Top", "Bottom"), ("Top2", "Bottom2")]
+
+
+def test_cycles():
+    cycles = RelationshipGraph(DIAMOND).cycles()
+    assert len(cycles) == 1
+    assert cycles[0]["relationship"] == rel("Bottom", "Right")
+    assert cycles[0]["tables"][0] == cycles[0]["tables"][-1] == "Bottom"
+    assert set(cycles[0]["tables"]) == {"Top", "Left", "Right", "Bottom"}
+
+
+def test_orphans():
+    tables = {"Sales": ["DateKey", "ProductKey"], "Date": ["DateKey"]}
+    graph = RelationshipGraph([rel("Sales", "Date"), rel("Sales", "Product"), rel("Returns", "Date")], tables)
+    assert graph.orphans() == [
+        {"relationship": rel("Sales", "Product"), "missing": ["toTable"]},
+        {"relationship": rel("Returns", "Date"), "missing": ["fromTable"]},
+    ]
+
+    tables["Date"] = ["Date"]
+    assert RelationshipGraph(graph.relationships, tables).orphans()[0]["missing"] == ["toColumn"]
+    assert RelationshipGraph(graph.relationships).orphans() == []
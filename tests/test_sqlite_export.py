@@ -0,0 +1,47 @@
+import sqlite3
+
+from extract_pbi_model_info import PowerBIModelExtractor
+from sqlite_export import main, model_key
+from synthetic_model import generate_model
+
+
+def test_relationship_is_active(tmp_path):
+    # The single relationships.tmdl marks every fifth relationship inactive
+    model_dir = generate_model(tmp_path / "model", tables=7, columns=1, measures=0, relationships="single-file")
+    database = tmp_path / "catalog.db"
+    assert main([str(database), str(model_dir)]) == 0
+
+    with sqlite3.connect(database) as connection:
+        flags = [row[0] for row in connection.execute("SELECT is_active FROM relationships ORDER BY id")]
+    assert flags == [0, 1, 1, 1, 1, 0]
+
+
+def test_folder_and_its_json_are_the_same_model(model_dir, tmp_path):
+    json_file = model_dir / "pbi_model_info.json"
+    PowerBIModelExtractor(model_dir).save(json_file)
+    assert model_key(json_file) == model_key(model_dir) == model_dir.resolve().as_posix()
+
+    database = tmp_path / "catalog.db"
+    assert main([str(database), str(model_dir)]) == 0
+    assert main([str(database), str(json_file)]) == 0
+
+    with sqlite3.connect(database) as connection:
+        assert connection.execute("SELECT key FROM models").fetchall() == [(model_dir.resolve().as_posix(),)]
+        assert connection.execute("SELECT COUNT(*) FROM tables").fetchone() == (3,)
+
+
+def test_json_files_in_one_folder_are_different_models(tmp_path):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    for name, tables in (("a", 2), ("b", 4)):
+        model_dir = generate_model(tmp_path / name, tables=tables, columns=1, measures=0)
+        PowerBIModelExtractor(model_dir).save(exports / f"{name}.json")
+    assert model_key(exports / "a.json") != model_key(exports / "b.json")
+
+    database = tmp_path / "catalog.db"
+    assert main([str(database), str(exports / "a.json"), str(exports / "b.json")]) == 0
+
+    with sqlite3.connect(database) as connection:
+        keys = [key for (key,) in connection.execute("SELECT key FROM models ORDER BY key")]
+        assert keys == [(exports / "a.json").resolve().as_posix(), (exports / "b.json").resolve().as_posix()]
+        assert connection.execute("SELECT COUNT(*) FROM tables").fetchone() == (6,)
@@ -0,0 +1,40 @@
+from tmdl_model import TmdlModel
+
+
+def test_tables_are_parsed_on_first_access_and_kept(model_dir):
+    model = TmdlModel(model_dir)
+    assert list(model.tables) == ["Table 1", "Table0", "Table2"]
+    assert model.files_loaded == 0
+
+    table = model.tables["Table0"]
+    assert table.name == "Table0"
+    assert [measure.name for measure in table.children_of("measure")] == ["Measure 0-0"]
+    assert model.files_loaded == 1
+    assert model.tables.is_loaded("Table0") and not model.tables.is_loaded("Table2")
+
+    assert model.tables["Table0"] is table
+    assert model.files_loaded == 1
+
+
+def test_table_files_are_keyed_by_unquoted_name(model_dir):
+    # pbi-tools escapes characters such as spaces in file names
+    tables = model_dir / "Model" / "tables"
+    (tables / "Table 1.tmdl").rename(tables / "Table%201.tmdl")
+    (tables / "Sales%20Fact%25.tmdl").write_text("table 'Sales Fact%'\n\n\tcolumn Amount\n", encoding="utf-8")
+
+    model = TmdlModel(model_dir)
+    assert "Sales Fact%" in model.tables and "Sales%20Fact%25" not in model.tables
+    assert model.tables["Sales Fact%"].name == "Sales Fact%"
+    assert model.tables["Table 1"].name == "Table 1"
+    assert model.table_info("Sales Fact%")["columns"][0]["name"] == "Amount"
+    # table_info() reuses the parsed table
+    assert model.files_loaded == 2
+
+
+def test_relationships_and_missing_folders(model_dir, tmp_path):
+    model = TmdlModel(model_dir)
+    assert model.relationship_infos()
+    assert model.files_loaded == len(list((model_dir / "Model" / "relationships").glob("*.tmdl")))
+
+    empty = TmdlModel(tmp_path)
+    assert len(empty.tables) == 0 and empty.relationships == [] and empty.model is None
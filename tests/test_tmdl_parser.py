@@ -0,0 +1,129 @@
+from extract_pbi_model_info import PowerBIModelExtractor, parse_table_file
+from synthetic_model import generate_model
+from tmdl_parser import parse_tmdl, read_name
+
+SALES_TMDL = """\
+/// Sales lines
+table 'Bob''s Sales'
+\tlineageTag: 0123
+
+\tcolumn 'O''Brien'
+\t\tdataType: string
+\t\tisHidden
+
+\t\tsummarizeBy: none
+
+\t/// Margin per line
+\t/// before discounts
+\tcolumn Margin =
+\t\t\tVAR price = 'Bob''s Sales'[Price]
+
+\t\t\tRETURN
+\t\t\t\tprice - 'Bob''s Sales'[Cost]
+\t\tdataType: double
+\t\tisHidden
+
+\tmeasure 'Ratio = A / B' = DIVIDE([A], [B])
+\t\tformatString: 0.0%
+\t\tdisplayFolder: "KPIs"
+
+\tmeasure Fenced = ```
+\t\t\tVAR x = 1 // not a property: here
+\t\t\tRETURN
+\t\t\t    x
+\t\t\t```
+\t\tformatString: #,0
+
+\tpartition 'Bob''s Sales' = m
+\t\tmode: import
+\t\tsource =
+\t\t\t\tlet
+\t\t\t\t    Source = 1
+\t\t\t\tin
+\t\t\t\t    Source
+"""
+
+
+def _table():
+    (table,) = parse_tmdl(SALES_TMDL)
+    return table
+
+
+def test_quoted_names():
+    assert read_name("'Bob''s Sales' = 1") == ("Bob's Sales", " = 1")
+    assert read_name("Sales: x") == ("Sales", ": x")
+    table = _table()
+    assert table.name == "Bob's Sales"
+    assert table.children_of("column")[0].name == "O'Brien"
+    assert table.children_of("partition")[0].name == "Bob's Sales"
+
+
+def test_measure_names_containing_equals():
+    ratio = _table().children_of("measure")[0]
+    assert ratio.name == "Ratio = A / B"
+    assert ratio.expression == "DIVIDE([A], [B])"
+    assert ratio.properties == {"formatString": "0.0%", "displayFolder": "KPIs"}
+
+
+def test_triple_backtick_expression():
+    fenced = _table().children_of("measure")[1]
+    assert fenced.expression == "VAR x = 1 // not a property: here\nRETURN\n    x"
+    assert fenced.properties == {"formatString": "#,0"}
+
+
+def test_multi_line_calculated_column_with_blank_lines():
+    margin = _table().children_of("column")[1]
+    assert margin.expression == "VAR price = 'Bob''s Sales'[Price]\n\nRETURN\n\tprice - 'Bob''s Sales'[Cost]"
+    assert margin.properties == {"dataType": "double", "isHidden": True}
+
+
+def test_flags_and_blank_lines_inside_objects():
+    column = _table().children_of("column")[0]
+    # The blank line does not end the column: summarizeBy still belongs to it
+    assert column.properties == {"dataType": "string", "isHidden": True, "summarizeBy": "none"}
+
+
+def test_descriptions():
+    table = _table()
+    assert table.description == "Sales lines"
+    assert table.children_of("column")[1].description == "Margin per line\nbefore discounts"
+    assert table.children_of("column")[0].description == ""
+
+
+def test_table_info():
+    table_info = parse_table_file(SALES_TMDL)
+    assert [column["name"] for column in table_info["columns"]] == ["O'Brien", "Margin"]
+    margin = table_info["columns"][1]
+    assert margin["type"] == "calculated"
+    assert margin["expression"] == "VAR price = 'Bob''s Sales'[Price] RETURN price - 'Bob''s Sales'[Cost]"
+    assert [measure["formatString"] for measure in table_info["measures"]] == ["0.0%", "#,0"]
+
+
+# What the regex parser this tokenizer replaced returned for the sample model below. It read
+# measure names and expressions correctly; columns, format strings and descriptions it got
+# wrong (or dropped) are checked against the source above instead.
+PREVIOUS_PARSER_MEASURES = [
+    ("Measure 0-0", "SUM('Table0'[Column 0])"),
+    (
+        "Measure 0-1",
+        "VAR current = [Measure 0-0] \n"
+        "VAR total = CALCULATE([Measure 0-0], ALL('Table0')) \n"
+        "RETURN DIVIDE(current, total)",
+    ),
+    (
+        "Measure 0-2",
+        "VAR current = [Measure 0-1] \n"
+        "VAR total = CALCULATE([Measure 0-1], ALL('Table0')) \n"
+        "RETURN DIVIDE(current, total)",
+    ),
+]
+
+
+def test_matches_previous_parser_on_sample_model(tmp_path):
+    model_dir = generate_model(tmp_path / "model", tables=1, columns=2, measures=3, calculated_columns=2, queries=0)
+    (table,) = PowerBIModelExtractor(model_dir).extract_all()["model"]["tables"]
+
+    assert table["name"] == "Table0"
+    assert [(measure["name"], measure["expression"]) for measure in table["measures"]] == PREVIOUS_PARSER_MEASURES
+    assert [measure["formatString"] for measure in table["measures"]] == ["#,0", "#,0.00", "0.0%"]
+    assert [column["name"] for column in table["columns"]] == ["Column 0", "Column 1", "Calc 0", "Calc 1"]
@@ -0,0 +1,97 @@
+import io
+import json
+
+import pytest
+
+from pbix_reader import PbixModelExtractor
+from test_pbix_reader import SCHEMA, write_pbix
+from tmsl_backend import JsonEventReader, TmslModelExtractor, iter_schema_items
+
+# Escapes, surrogate pairs and numbers that a chunk boundary can cut in half, and skipped containers
+DOCUMENT = {
+    "name": 'Quote " backslash \\ tab \t',
+    "skipped": {"nested": [1, {"deep": ["x", None, True]}], "text": "\\u0041 is not an escape here"},
+    "model": {
+        "tables": [
+            {"name": "Café 😀", "columns": [{"name": "A\u0000B"}], "size": 1.5e-3},
+            {"name": "Second", "columns": [], "size": -12345678901234567890},
+        ],
+        "relationships": [],
+        "expressions": [{"name": "Slash", "expression": "a/b   c"}],
+    },
+}
+PATHS = ["model.tables.item", "model.expressions.item.name"]
+
+
+def events(text, chunk_size, paths=PATHS):
+    return list(JsonEventReader(io.StringIO(text), chunk_size).events(paths))
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_events_do_not_depend_on_chunk_size(indent):
+    text = json.dumps(DOCUMENT, indent=indent)
+    expected = events(text, 1 << 20)
+    assert [value for event, _, value in expected if event == "value"] == DOCUMENT["model"]["tables"] + ["Slash"]
+    for chunk_size in range(1, 65):
+        assert events(text, chunk_size) == expected, chunk_size
+
+
+def test_escapes_split_across_chunks():
+    # Raw escapes, so every chunk boundary falls somewhere inside one of them
+    text = r'{"model": {"tables": [{"name": "\"\\\/\b\f\n\r\té😀"}]}}'
+    for chunk_size in range(1, 65):
+        [table] = JsonEventReader(io.StringIO(text), chunk_size).items("model.tables.item")
+        assert table == {"name": '"\\/\b\f\n\r\té\U0001f600'}
+
+
+def test_malformed_documents_are_rejected():
+    with pytest.raises(ValueError):
+        events('{"model": {"tables": [1 2]}}', 4)
+    with pytest.raises(ValueError):
+        events('{"model": {}} {}', 4)
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "utf-16", "utf-16-le", "utf-16-be"])
+def test_schema_encodings(tmp_path, encoding):
+    schema_file = tmp_path / "model.json"
+    schema_file.write_bytes(json.dumps(DOCUMENT, ensure_ascii=False).encode(encoding))
+
+    tables = list(iter_schema_items(schema_file, "model.tables.item", chunk_size=7))
+    assert tables == DOCUMENT["model"]["tables"]
+
+
+@pytest.mark.parametrize("chunk_size", [5, 1 << 20])
+def test_extraction_matches_the_pbix_reader(tmp_path, chunk_size):
+    # The model is named after its folder, as the PBIX reader names it after the file
+    schema_dir = tmp_path / "report" / "DataModelSchema"
+    schema_dir.mkdir(parents=True)
+    (schema_dir / "model.json").write_bytes(json.dumps(SCHEMA, indent=2).encode("utf-16"))
+
+    output = TmslModelExtractor(tmp_path / "report", chunk_size=chunk_size).extract_all()
+    expected = PbixModelExtractor(write_pbix(tmp_path / "report.pbit", section=None)).extract_all()
+    assert output["model"] == expected["model"]
+    assert output["queries"] == expected["queries"]
+
+    sales = output["model"]["tables"][0]
+    assert [column["name"] for column in sales["columns"]] == ["Amount", "Date", "Double"]
+    assert sales["measures"][0]["expression"] == "SUM( Sales[Amount] )"
+    assert [relationship["isActive"] for relationship in output["model"]["relationships"]] == [True, False]
+    queries = {query["name"]: query["expression"] for query in output["queries"]["powerQueries"]}
+    assert queries == {"Server": '"localhost" meta [IsParameterQuery=true]', "Sales": "let Source = 1 in Source"}
+
+
+def test_filters_match_the_pbix_reader(tmp_path):
+    schema_dir = tmp_path / "report" / "DataModelSchema"
+    schema_dir.mkdir(parents=True)
+    (schema_dir / "model.json").write_text(json.dumps(SCHEMA), encoding="utf-8")
+    pbit = write_pbix(tmp_path / "report.pbit", section=None)
+
+    for filters in ({"tables": ["Sales"]}, {"kinds": ["measures", "relationships"]}, {"exclude_tables": ["Date"]}):
+        output = TmslModelExtractor(tmp_path / "report", **filters).extract_all()
+        assert output["model"] == PbixModelExtractor(pbit, **filters).extract_all()["model"], filters
+
+    output = TmslModelExtractor(tmp_path / "report", tables=["Sales"], kinds=["measures"]).extract_all()
+    [sales] = output["model"]["tables"]
+    assert sales["columns"] == [] and [measure["name"] for measure in sales["measures"]] == ["Total"]
+    # Relationships are not among the kept kinds
+    assert output["model"]["relationships"] == []
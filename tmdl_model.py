@@ -0,0 +1,145 @@
+"""
+Lazily loaded object model over a TMDL model folder.
+
+Creating a TmdlModel only lists the folder. Each table, role, perspective and culture
+file is parsed the first time it is accessed and kept, and model.tmdl, database.tmdl,
+expressions.tmdl and the relationships are parsed on first attribute access. A tool that
+needs one table's measures in a 500-table model reads a single file:
+
+    model = TmdlModel("extracted")
+    sales = model.tables["Sales"]
+    measures = sales.children_of("measure")
+
+Objects are TmdlNode instances (see tmdl_parser.py).
+"""
+
+import os
+from collections.abc import Mapping
+from functools import cached_property
+from pathlib import Path
+from urllib.parse import unquote
+
+from extract_pbi_model_info import read_source_file, relationship_info_from_properties, table_info_from_node
+from tmdl_parser import parse_tmdl
+
+# Folder of the definition -> kind of the object each of its files holds
+OBJECT_FOLDERS = {"tables": "table", "roles": "role", "perspectives": "perspective", "cultures": "cultureInfo"}
+
+
+class LazyObjects(Mapping):
+    """
+    Objects stored one per .tmdl file, parsed on first access and memoized.
+
+    Keyed by the file name without .tmdl and with %XX escapes decoded, which is the object
+    name: pbi-tools writes the table 'Sales Fact' to Sales%20Fact.tmdl.
+    """
+
+    def __init__(self, folder, kind, load):
+        """
+        Args:
+            folder: Folder holding the .tmdl files (may be missing)
+            kind: TMDL keyword of the objects, e.g. "table"
+            load: Callable(path) returning the parsed top-level TmdlNode objects of a file
+        """
+        self.kind = kind
+        self._load = load
+        self._loaded = {}
+        try:
+            with os.scandir(folder) as entries:
+                paths = {
+                    unquote(entry.name[:-5]): Path(entry.path) for entry in entries if entry.name.endswith(".tmdl")
+                }
+        except OSError:
+            paths = {}
+        self.paths = dict(sorted(paths.items()))
+
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            nodes = self._load(self.paths[name])
+            self._loaded[name] = next((node for node in nodes if node.kind == self.kind), None)
+        return self._loaded[name]
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def is_loaded(self, name):
+        """Whether the file of an object was parsed already"""
+        return name in self._loaded
+
+
+class TmdlModel:
+    """Objects of a TMDL model definition, loaded on first access"""
+
+    def __init__(self, model_path):
+        """
+        Args:
+            model_path: Extracted model folder (containing Model/) or the TMDL definition
+                        folder itself (containing model.tmdl)
+        """
+        model_path = Path(model_path)
+        self.definition_path = model_path / "Model" if (model_path / "Model").is_dir() else model_path
+        # Number of .tmdl files parsed so far
+        self.files_loaded = 0
+
+        for folder, kind in OBJECT_FOLDERS.items():
+            setattr(self, folder, LazyObjects(self.definition_path / folder, kind, self._load_file))
+
+    def _load_file(self, path):
+        self.files_loaded += 1
+        return parse_tmdl(read_source_file(path))
+
+    def _load_definition(self, name):
+        """Top-level objects of a definition file, [] when it does not exist"""
+        path = self.definition_path / name
+        return self._load_file(path) if path.is_file() else []
+
+    def _first(self, name, kind):
+        return next((node for node in self._load_definition(name) if node.kind == kind), None)
+
+    @cached_property
+    def _model_file(self):
+        return self._load_definition("model.tmdl")
+
+    @cached_property
+    def model(self):
+        """The model object of model.tmdl (culture, data source version, annotations), or None"""
+        return next((node for node in self._model_file if node.kind == "model"), None)
+
+    @cached_property
+    def references(self):
+        """(kind, name) of the ref lines in model.tmdl, which give the order of tables, cultures etc."""
+        return [(node.properties["refType"], node.name) for node in self._model_file if node.kind == "ref"]
+
+    @cached_property
+    def database(self):
+        """The database object of database.tmdl (compatibilityLevel), or None"""
+        return self._first("database.tmdl", "database")
+
+    @cached_property
+    def expressions(self):
+        """Shared expressions of expressions.tmdl by name"""
+        return {node.name: node for node in self._load_definition("expressions.tmdl") if node.kind == "expression"}
+
+    @cached_property
+    def relationships(self):
+        """Relationship objects of relationships.tmdl and relationships/*.tmdl"""
+        nodes = self._load_definition("relationships.tmdl")
+        folder = LazyObjects(self.definition_path / "relationships", "relationship", self._load_file)
+        nodes.extend(folder[name] for name in folder)
+        return [node for node in nodes if node is not None and node.kind == "relationship"]
+
+    def table_info(self, name):
+        """The table_info structure of one table, as PowerBIModelExtractor builds it"""
+        table_node = self.tables[name]
+        return table_info_from_node(table_node) if table_node is not None else None
+
+    def relationship_infos(self):
+        """relationship_info structures of all relationships, skipping incomplete ones"""
+        infos = (relationship_info_from_properties(node.properties) for node in self.relationships)
+        return [info for info in infos if info]
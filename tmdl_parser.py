@@ -0,0 +1,261 @@
+"""Single-pass, indentation-aware TMDL tokenizer"""
+
+# Keywords that open a named TMDL object (everything else is a property)
+OBJECT_KEYWORDS = frozenset(
+    {
+        "annotation",
+        "calculationGroup",
+        "calculationItem",
+        "changedProperty",
+        "column",
+        "culture",
+        "cultureInfo",
+        "database",
+        "dataSource",
+        "expression",
+        "extendedProperty",
+        "hierarchy",
+        "kpi",
+        "level",
+        "linguisticMetadata",
+        "measure",
+        "member",
+        "model",
+        "partition",
+        "perspective",
+        "perspectiveColumn",
+        "perspectiveHierarchy",
+        "perspectiveMeasure",
+        "perspectiveTable",
+        "queryGroup",
+        "ref",
+        "relationship",
+        "role",
+        "table",
+        "tablePermission",
+        "variation",
+    }
+)
+
+
+class TmdlNode:
+    """A TMDL object with its default expression, properties and child objects"""
+
+    def __init__(self, kind, name, expression=None, description=""):
+        self.kind = kind
+        self.name = name
+        self.expression = expression
+        self.description = description
+        self.properties = {}
+        self.children = []
+
+    def children_of(self, kind):
+        """Return the child objects of the given kind, in file order"""
+        return [child for child in self.children if child.kind == kind]
+
+    @property
+    def annotations(self):
+        """Annotations of this object as a name -> value dict"""
+        return {child.name: child.expression for child in self.children if child.kind == "annotation"}
+
+    def __repr__(self):
+        return f"TmdlNode({self.kind!r}, {self.name!r})"
+
+
+def _indent_level(line):
+    """Return the indentation depth of a line and the text after it (tab or 4 spaces per level)"""
+    depth = 0
+    spaces = 0
+    i = 0
+    n = len(line)
+    while i < n:
+        ch = line[i]
+        if ch == "\t":
+            depth += 1
+            spaces = 0
+        elif ch == " ":
+            spaces += 1
+            if spaces == 4:
+                depth += 1
+                spaces = 0
+        else:
+            break
+        i += 1
+    return depth, line[i:]
+
+
+def _strip_levels(line, levels):
+    """Remove up to `levels` indentation levels from the start of a line"""
+    i = 0
+    spaces = 0
+    n = len(line)
+    while levels and i < n:
+        ch = line[i]
+        if ch == "\t":
+            levels -= 1
+            spaces = 0
+        elif ch == " ":
+            spaces += 1
+            if spaces == 4:
+                levels -= 1
+                spaces = 0
+        else:
+            break
+        i += 1
+    return line[i:]
+
+
+def read_name(text):
+    """Read a (possibly single-quoted) TMDL name from the start of text, return (name, rest)"""
+    n = len(text)
+    if text.startswith("'"):
+        parts = []
+        i = 1
+        while i < n:
+            j = text.find("'", i)
+            if j == -1:
+                parts.append(text[i:])
+                i = n
+                break
+            parts.append(text[i:j])
+            # Two single quotes are an escaped quote inside the name
+            if j + 1 < n and text[j + 1] == "'":
+                parts.append("'")
+                i = j + 2
+            else:
+                i = j + 1
+                break
+        return "".join(parts), text[i:]
+
+    i = 0
+    while i < n and text[i] not in " \t=:":
+        i += 1
+    return text[:i], text[i:]
+
+
+def unquote_value(value):
+    """Strip optional double quotes around a TMDL property value"""
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return value[1:-1].replace('""', '"')
+    return value
+
+
+def _split_keyword(text):
+    """Split the leading identifier off a line"""
+    i = 0
+    n = len(text)
+    while i < n and (text[i].isalnum() or text[i] == "_"):
+        i += 1
+    return text[:i], text[i:]
+
+
+def _read_expression(rhs, lines, i, depth):
+    """Read a default expression starting after '=' on line i - 1, return (expression, next line index)"""
+    rhs = rhs.strip()
+    n = len(lines)
+
+    # Expressions fenced with triple backticks run until the closing fence
+    if rhs.startswith("```"):
+        body = rhs[3:]
+        if body.rstrip().endswith("```"):
+            return body.rstrip()[:-3].strip(), i
+        collected = [body] if body.strip() else []
+        while i < n:
+            line = _strip_levels(lines[i].rstrip("\r"), depth + 2)
+            i += 1
+            if line.rstrip().endswith("```"):
+                tail = line.rstrip()[:-3]
+                if tail.strip():
+                    collected.append(tail)
+                break
+            collected.append(line)
+        return "\n".join(collected).strip("\n"), i
+
+    # Otherwise continuation lines are indented two levels below the owning line
+    collected = [rhs] if rhs else []
+    last = i
+    j = i
+    while j < n:
+        line = lines[j].rstrip("\r")
+        if not line.strip():
+            j += 1
+            continue
+        line_depth, _ = _indent_level(line)
+        if line_depth < depth + 2:
+            break
+        # Keep blank lines that sit between continuation lines
+        collected.extend("" for _ in range(last, j))
+        collected.append(_strip_levels(line, depth + 2).rstrip())
+        j += 1
+        last = j
+    return "\n".join(collected), last
+
+
+def parse_tmdl(content):
+    """Parse TMDL text into a list of top-level TmdlNode objects in a single pass over its lines"""
+    lines = content.split("\n")
+    roots = []
+    stack = []  # (depth, node) of the currently open objects
+    description = []
+
+    i = 0
+    n = len(lines)
+    while i < n:
+        depth, text = _indent_level(lines[i].rstrip("\r"))
+        i += 1
+        text = text.rstrip()
+        if not text:
+            continue
+
+        # Descriptions are '///' lines directly above the object they describe
+        if text.startswith("///"):
+            description.append(text[3:].strip())
+            continue
+        if text.startswith("//"):
+            continue
+
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        parent = stack[-1][1] if stack else None
+
+        keyword, rest = _split_keyword(text)
+
+        if keyword in OBJECT_KEYWORDS and (not rest or rest[0] in " \t"):
+            rest = rest.lstrip()
+            if keyword == "ref":
+                # 'ref table Sales' references an object defined in another file
+                ref_kind, rest = _split_keyword(rest)
+                name, rest = read_name(rest.lstrip())
+                node = TmdlNode("ref", name)
+                node.properties["refType"] = ref_kind
+            else:
+                name, rest = read_name(rest)
+                node = TmdlNode(keyword, name)
+                rest = rest.lstrip()
+                if rest.startswith("="):
+                    node.expression, i = _read_expression(rest[1:], lines, i, depth)
+            node.description = "\n".join(description)
+            description = []
+
+            if parent is None:
+                roots.append(node)
+            else:
+                parent.children.append(node)
+            stack.append((depth, node))
+            continue
+
+        description = []
+        if parent is None or not keyword:
+            continue
+
+        rest = rest.lstrip()
+        if rest.startswith(":"):
+            parent.properties[keyword] = unquote_value(rest[1:].strip())
+        elif rest.startswith("="):
+            # Expression-valued property such as a partition 'source ='
+            parent.properties[keyword], i = _read_expression(rest[1:], lines, i, depth)
+        elif not rest:
+            # Bare keywords are boolean flags such as 'isHidden'
+            parent.properties[keyword] = True
+
+    return roots
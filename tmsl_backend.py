@@ -0,0 +1,307 @@
+"""
+Extract model information from a TMSL schema (DataModelSchema/model.json) instead of TMDL.
+
+pbi-tools writes the model as TMSL JSON for legacy PBIX files, and such schemas can run to
+hundreds of MB. They are read incrementally: the JSON is scanned in chunks and only the
+values at the requested paths (one table, one relationship) are decoded at a time, while
+everything else is skipped one element at a time. Peak memory is proportional to the
+largest single table rather than to the whole schema.
+
+    python tmsl_backend.py MODEL_DIR_OR_SCHEMA [output.json]
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+from extract_pbi_model_info import PowerBIModelExtractor
+from pbix_reader import tmsl_expression_query, tmsl_partition_queries, tmsl_relationship_info, tmsl_table_info
+
+# Where pbi-tools and other tools leave a TMSL schema, relative to the model folder
+SCHEMA_FILE_NAMES = ("DataModelSchema/model.json", "DataModelSchema", "model.bim")
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+
+
+def detect_encoding(prefix):
+    """Encoding of a JSON file from its first bytes (BOM, or the zero bytes of UTF-16)"""
+    if prefix[:3] == b"\xef\xbb\xbf":
+        return "utf-8-sig"
+    if prefix[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return "utf-16"
+    if len(prefix) >= 2 and prefix[1:2] == b"\x00":
+        return "utf-16-le"
+    if len(prefix) >= 2 and prefix[:1] == b"\x00":
+        return "utf-16-be"
+    return "utf-8"
+
+
+def open_schema(path):
+    """Open a TMSL JSON file as text in its detected encoding"""
+    with open(path, "rb") as f:
+        prefix = f.read(4)
+    return open(path, "r", encoding=detect_encoding(prefix))
+
+
+def find_schema_file(model_path):
+    """The TMSL schema of an extracted model folder, or None"""
+    for name in SCHEMA_FILE_NAMES:
+        path = Path(model_path) / name
+        if path.is_file():
+            return path
+    return None
+
+
+class JsonEventReader:
+    """
+    Incremental JSON reader yielding events for the containers and values along given paths.
+
+    Paths are dot-separated keys with "item" for array elements, e.g. "model.tables.item".
+    Containers on the way to a requested path produce start/end events; a value at a
+    requested path is decoded whole and produced as one "value" event; other containers are
+    skipped by decoding and discarding their elements one by one. Only the unread part of
+    the current chunk and the value being decoded are held in memory.
+    """
+
+    def __init__(self, fp, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            fp: Text file object
+            chunk_size: Characters read at a time; grows while a single value is longer
+        """
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.chars_read = 0
+
+    def _fill(self):
+        """Append the next chunk, dropping what was consumed; returns False at the end of the file"""
+        if self.eof:
+            return False
+        # Read at least as much as is already buffered, so re-decoding a long value stays linear
+        chunk = self.fp.read(max(self.chunk_size, len(self.buffer) - self.position))
+        if not chunk:
+            self.eof = True
+            return False
+        self.chars_read += len(chunk)
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def _peek(self):
+        """Next non-whitespace character, not consumed; "" at the end of the file"""
+        while True:
+            self.position = _WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at character {self.chars_read - len(self.buffer) + self.position}")
+        self.position += 1
+
+    def _read_value(self):
+        """Decode the value starting at the current position"""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the end of the chunk ("1." or "2e") decodes as a shorter one
+            if _NUMBER_TAIL.fullmatch(self.buffer, end) and self._fill():
+                continue
+            self.position = end
+            return value
+
+    def _skip_value(self):
+        """Move past the value at the current position, decoding at most one of its elements at a time"""
+        char = self._peek()
+        if char not in ("{", "["):
+            self._read_value()
+            return
+        closing = "}" if char == "{" else "]"
+        self.position += 1
+        first = True
+        while self._peek() != closing:
+            if not first:
+                self._expect(",")
+            first = False
+            if char == "{":
+                self._read_value()
+                self._expect(":")
+            self._read_value()
+        self.position += 1
+
+    def events(self, paths):
+        """
+        Yield (event, path, value) tuples in document order, where event is "start_map",
+        "end_map", "start_array" or "end_array" (value None) for containers leading to a
+        requested path, or "value" for a decoded value at a requested path.
+        """
+        paths = set(paths)
+        prefixes = {path.rsplit(".", depth)[0] for path in paths for depth in range(1, path.count(".") + 1)}
+        prefixes.add("")
+        yield from self._walk("", paths, prefixes)
+        if self._peek():
+            raise ValueError("Extra data after the JSON document")
+
+    def _walk(self, path, paths, prefixes):
+        if path in paths:
+            yield "value", path, self._read_value()
+            return
+        char = self._peek()
+        if path not in prefixes or char not in ("{", "["):
+            self._skip_value()
+            return
+
+        self.position += 1
+        if char == "{":
+            yield "start_map", path, None
+            first = True
+            while self._peek() != "}":
+                if not first:
+                    self._expect(",")
+                first = False
+                key = self._read_value()
+                self._expect(":")
+                yield from self._walk(f"{path}.{key}" if path else key, paths, prefixes)
+            self.position += 1
+            yield "end_map", path, None
+        else:
+            yield "start_array", path, None
+            item_path = f"{path}.item" if path else "item"
+            first = True
+            while self._peek() != "]":
+                if not first:
+                    self._expect(",")
+                first = False
+                yield from self._walk(item_path, paths, prefixes)
+            self.position += 1
+            yield "end_array", path, None
+
+    def items(self, path):
+        """Yield the values at one path, such as each table of "model.tables.item" """
+        for event, _, value in self.events([path]):
+            if event == "value":
+                yield value
+
+
+def iter_schema_items(schema_file, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the values at a path of a TMSL file, read incrementally"""
+    with open_schema(schema_file) as f:
+        yield from JsonEventReader(f, chunk_size).items(path)
+
+
+class TmslModelExtractor(PowerBIModelExtractor):
+    """
+    PowerBIModelExtractor backend for TMSL JSON schemas, producing the same output.
+
+    Tables, relationships and shared expressions are streamed from the schema. Queries
+    come from Mashup/Package/Formulas/Section1.m when the folder has one, otherwise from
+    the shared expressions and M partitions in the schema.
+    """
+
+    def __init__(self, model_path, schema_file=None, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+        """
+        Args:
+            model_path: Extracted model folder, or the schema file itself
+            schema_file: TMSL file to read; defaults to the first of SCHEMA_FILE_NAMES
+                         found in the model folder
+            chunk_size: Characters read from the schema at a time
+            **kwargs: As for PowerBIModelExtractor
+        """
+        model_path = Path(model_path)
+        if schema_file is None and model_path.is_file():
+            schema_file, model_path = model_path, model_path.parent
+            if model_path.name == "DataModelSchema":
+                model_path = model_path.parent
+        super().__init__(model_path, **kwargs)
+        self.schema_file = Path(schema_file) if schema_file else find_schema_file(self.model_path)
+        if self.schema_file is None:
+            raise FileNotFoundError(f"No TMSL schema ({', '.join(SCHEMA_FILE_NAMES)}) in {self.model_path}")
+        self.chunk_size = chunk_size
+
+    def _stream(self, phase, paths):
+        """Events for paths of the schema, counting the file as read by phase"""
+        with open_schema(self.schema_file) as f:
+            reader = JsonEventReader(f, self.chunk_size)
+            yield from reader.events(paths)
+        self.stats.add(phase, files=1, bytesRead=self.schema_file.stat().st_size)
+
+    def iter_tables(self):
+        if not self.object_filter.wants_tables():
+            return
+        print("Extracting tables and columns...")
+        tables = (table for event, _, table in self._stream("tables", ["model.tables.item"]) if event == "value")
+        yield from self._filter_tables(tables, tmsl_table_info)
+
+    def iter_relationships(self):
+        if not self.object_filter.wants("relationships"):
+            return
+        print("Extracting relationships...")
+        events = self._stream("relationships", ["model.relationships.item"])
+        yield from self._filter_relationships(
+            tmsl_relationship_info(relationship) for event, _, relationship in events if event == "value"
+        )
+
+    def iter_queries(self):
+        if not self.object_filter.wants("queries"):
+            return
+        if (self.mashup_path / "Section1.m").is_file():
+            yield from super().iter_queries()
+            return
+
+        print("Extracting M/Power Query code...")
+        # Shared expressions come first whatever their position in the file; only the
+        # partitions of each table are decoded, not its columns and measures
+        expressions = []
+        partition_queries = []
+        table_name = None
+        table_partitions = []
+        events = self._stream(
+            "queries", ["model.expressions.item", "model.tables.item.name", "model.tables.item.partitions.item"]
+        )
+        for event, path, value in events:
+            if path == "model.expressions.item":
+                expressions.append(tmsl_expression_query(value))
+            elif path == "model.tables.item.name":
+                table_name = value
+            elif path == "model.tables.item.partitions.item":
+                table_partitions.append(value)
+            elif event == "end_map" and path == "model.tables.item":
+                partition_queries.extend(tmsl_partition_queries(table_name, table_partitions))
+                table_name = None
+                table_partitions = []
+        yield from expressions
+        yield from partition_queries
+
+
+def main(argv=None):
+    """Extract pbi_model_info.json from a TMSL schema"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not 1 <= len(argv) <= 2:
+        print("Usage: python tmsl_backend.py <model folder | model.json> [output.json]")
+        return 2
+
+    extractor = TmslModelExtractor(argv[0])
+    output_file = Path(argv[1]) if len(argv) == 2 else extractor.model_path / "pbi_model_info.json"
+    extractor.save(output_file)
+    print(f"Model information saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())